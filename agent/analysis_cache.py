@@ -0,0 +1,229 @@
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+import boto3
+from settings import get_settings
+
+logger = logging.getLogger("applyflow-agent")
+
+settings = get_settings()
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form for hashing: Unicode NFKC, case-folded, whitespace collapsed."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip().casefold()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def cache_key(namespace: str, version: str, *parts: str) -> str:
+    """Key for a computation: namespace, prompt/algorithm version and the hashes of its inputs."""
+    return hashlib.sha256("\x1f".join((namespace, version) + parts).encode("utf-8")).hexdigest()
+
+
+class SQLiteCacheBackend:
+    """Local on-disk cache with TTL expiry and LRU eviction past `max_entries`."""
+
+    def __init__(self, path: str, max_entries: int = 5000):
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_cache ("
+                " key TEXT PRIMARY KEY, tag TEXT NOT NULL, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, last_access REAL NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS analysis_cache_tag ON analysis_cache (tag)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS analysis_cache_lru ON analysis_cache (last_access)")
+
+    def get(self, tag: str, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM analysis_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM analysis_cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE analysis_cache SET last_access = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def put(self, tag: str, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analysis_cache (key, tag, value, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?)", (key, tag, json.dumps(value), now + ttl, now))
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM analysis_cache WHERE expires_at <= ?", (now,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM analysis_cache WHERE key IN ("
+                " SELECT key FROM analysis_cache ORDER BY last_access LIMIT ?)", (count - self.max_entries,))
+
+    async def get_or_compute_async(self, tag: str, key: str, compute: Callable[[], Awaitable[Any]],
+                                   ttl: Optional[float] = None) -> Any:
+        value = self.get(tag, key)
+        if value is None:
+            value = await compute()
+            self.put(tag, key, value, ttl)
+        return value
+
+    def invalidate(self, tag: str) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM analysis_cache WHERE tag = ?", (tag,)).rowcount
+
+
+class DynamoDBCacheBackend:
+    """
+    Shared cache in DynamoDB, partitioned by tag so a tag can be invalidated
+    with one Query. Expiry uses the table's native TTL on `expires_at`; reads
+    also check it because TTL deletion is lazy.
+    """
+
+    def __init__(self, table_name: str, region_name: Optional[str] = None):
+        self.table = boto3.resource("dynamodb", region_name=region_name).Table(table_name)
+
+    def get(self, tag: str, key: str) -> Optional[Any]:
+        item = self.table.get_item(Key={"tag": tag, "key": key}).get("Item")
+        if not item or int(item["expires_at"]) <= time.time():
+            return None
+        return json.loads(item["value"])
+
+    def put(self, tag: str, key: str, value: Any, ttl: float) -> None:
+        self.table.put_item(Item={
+            "tag": tag,
+            "key": key,
+            "value": json.dumps(value),
+            "expires_at": Decimal(int(time.time() + ttl)),
+        })
+
+    def invalidate(self, tag: str) -> int:
+        params = {"KeyConditionExpression": "#tag = :tag", "ProjectionExpression": "#key",
+                  "ExpressionAttributeNames": {"#tag": "tag", "#key": "key"},
+                  "ExpressionAttributeValues": {":tag": tag}}
+        deleted = 0
+        with self.table.batch_writer() as batch:
+            while True:
+                response = self.table.query(**params)
+                for item in response.get("Items", []):
+                    batch.delete_item(Key={"tag": tag, "key": item["key"]})
+                    deleted += 1
+                if "LastEvaluatedKey" not in response:
+                    break
+                params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        return deleted
+
+
+class AnalysisCache:
+    """
+    Content-addressed cache for resume and job-description analysis.
+
+    Keys are hashes of the normalized inputs plus a prompt/algorithm version,
+    so a changed resume, posting or prompt simply misses. Entries carry a tag
+    (the user they were computed for, where there is one) so everything
+    derived from a user's resumes can be dropped when they upload or rename
+    one. A small in-process LRU sits in front of the persistent backend.
+    """
+
+    def __init__(self, backend, ttl: float, memory_entries: int = 512):
+        self.backend = backend
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, Tuple[str, float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, tag: str, key: str, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._memory[key] = (tag, expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, tag: str, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[1] > time.time():
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+        value = self.backend.get(tag, key) if self.backend else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self._remember(tag, key, value, time.time() + self.ttl)
+        return value
+
+    def put(self, tag: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = ttl or self.ttl
+        self._remember(tag, key, value, time.time() + ttl)
+        if self.backend:
+            try:
+                self.backend.put(tag, key, value, ttl)
+            except Exception as e:
+                # The cache is an optimization; never fail the request over it
+                logger.error(f"Analysis cache write failed: {e}", exc_info=True)
+
+    def get_or_compute(self, tag: str, key: str, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        value = self.get(tag, key)
+        if value is None:
+            value = compute()
+            self.put(tag, key, value, ttl)
+        return value
+
+    async def get_or_compute_async(self, tag: str, key: str, compute: Callable[[], Awaitable[Any]],
+                                   ttl: Optional[float] = None) -> Any:
+        value = self.get(tag, key)
+        if value is None:
+            value = await compute()
+            self.put(tag, key, value, ttl)
+        return value
+
+    def invalidate(self, tag: str) -> int:
+        with self._lock:
+            for key in [k for k, (t, _, _) in self._memory.items() if t == tag]:
+                del self._memory[key]
+        return self.backend.invalidate(tag) if self.backend else 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"memory_entries": len(self._memory), "hits": self.hits, "misses": self.misses}
+
+
+_cache: Optional[AnalysisCache] = None
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """Process-wide cache built from settings; ANALYSIS_CACHE_BACKEND=none keeps only the memory tier."""
+    global _cache
+    if _cache is None:
+        if settings.ANALYSIS_CACHE_BACKEND == "dynamodb":
+            backend = DynamoDBCacheBackend(settings.ANALYSIS_CACHE_TABLE, settings.AWS_REGION)
+        elif settings.ANALYSIS_CACHE_BACKEND == "sqlite":
+            backend = SQLiteCacheBackend(settings.ANALYSIS_CACHE_PATH, settings.ANALYSIS_CACHE_MAX_ENTRIES)
+        else:
+            backend = None
+        _cache = AnalysisCache(backend, settings.ANALYSIS_CACHE_TTL_SECONDS, settings.ANALYSIS_CACHE_MEMORY_ENTRIES)
+    return _cache
@@ -0,0 +1,219 @@
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Tuple
+
+import boto3
+import numpy as np
+from boto3.dynamodb.conditions import Key
+from settings import get_settings
+
+logger = logging.getLogger("applyflow-agent")
+
+settings = get_settings()
+
+# Funnel stages in order; rejected is terminal and does not say how far it got
+FUNNEL_STAGES = ["applied", "interviewing", "offer", "accepted"]
+STATUSES = FUNNEL_STAGES + ["rejected"]
+SUCCESS_STATUSES = {"interviewing", "offer", "accepted"}
+LOADED_FIELDS = ["id", "company", "job_title", "status", "pay", "created_at", "updated_at"]
+PERCENTILES = [25, 50, 75, 90]
+# Users whose frames are kept in memory
+MAX_CACHED_USERS = 256
+
+
+def _epoch(value: Optional[str]) -> float:
+    if not value:
+        return np.nan
+    parsed = datetime.fromisoformat(value)
+    # Stored timestamps are naive UTC (datetime.utcnow()); don't read them in the host's zone
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class ApplicationFrame:
+    """Columnar view of one user's applications for vectorized metrics."""
+
+    def __init__(self, items: List[Dict[str, Any]]):
+        status_index = {s: i for i, s in enumerate(STATUSES)}
+        # Rows with a status outside the funnel would otherwise be miscounted as a stage
+        known = [i for i in items if i.get("status") in status_index]
+        if len(known) < len(items):
+            logger.warning(f"Skipping {len(items) - len(known)} applications with an unknown status")
+        items = known
+        self.size = len(items)
+        self.status = np.fromiter((status_index[i["status"]] for i in items),
+                                  dtype=np.int8, count=self.size)
+        self.companies, self.company = np.unique(
+            np.array([i.get("company") or "" for i in items], dtype=object), return_inverse=True)
+        self.pay = np.fromiter((float(i["pay"]) if i.get("pay") is not None else np.nan for i in items),
+                               dtype=np.float64, count=self.size)
+        self.created_at = np.fromiter((_epoch(i.get("created_at")) for i in items), dtype=np.float64, count=self.size)
+        self.updated_at = np.fromiter((_epoch(i.get("updated_at")) for i in items), dtype=np.float64, count=self.size)
+
+    def mask(self, status: Optional[str] = None, company: Optional[str] = None,
+             since: Optional[str] = None) -> np.ndarray:
+        """Boolean row mask for report filters."""
+        mask = np.ones(self.size, dtype=bool)
+        if status:
+            mask &= self.status == STATUSES.index(status)
+        if company:
+            matches = np.array([company.lower() in c.lower() for c in self.companies], dtype=bool)
+            mask &= matches[self.company]
+        if since:
+            mask &= self.created_at >= _epoch(since)
+        return mask
+
+
+def _percentiles(values: np.ndarray) -> Dict[str, Optional[float]]:
+    values = values[~np.isnan(values)]
+    if not values.size:
+        return {f"p{p}": None for p in PERCENTILES}
+    return {f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+
+def funnel(frame: ApplicationFrame, mask: np.ndarray) -> Dict[str, Any]:
+    """Applications that reached each stage, and stage-to-stage conversion."""
+    counts = np.bincount(frame.status[mask], minlength=len(STATUSES))
+    # An application at stage k has passed through every earlier stage
+    reached = np.cumsum(counts[:len(FUNNEL_STAGES)][::-1])[::-1]
+    reached[0] += counts[STATUSES.index("rejected")]
+    conversion = {}
+    for prev, stage, prev_n, n in zip(FUNNEL_STAGES, FUNNEL_STAGES[1:], reached, reached[1:]):
+        conversion[f"{prev}->{stage}"] = round(float(n / prev_n), 4) if prev_n else None
+    return {
+        "by_status": {s: int(c) for s, c in zip(STATUSES, counts)},
+        "reached": {s: int(n) for s, n in zip(FUNNEL_STAGES, reached)},
+        "conversion": conversion,
+    }
+
+
+def response_times(frame: ApplicationFrame, mask: np.ndarray) -> Dict[str, Any]:
+    """Days from created_at to the last status change, for applications that moved."""
+    moved = mask & (frame.status != STATUSES.index("applied"))
+    days = (frame.updated_at[moved] - frame.created_at[moved]) / 86400.0
+    days = days[~np.isnan(days)]
+    return {
+        "responded": int(days.size),
+        "mean_days": round(float(days.mean()), 2) if days.size else None,
+        "days": _percentiles(days),
+    }
+
+
+def pay_percentiles(frame: ApplicationFrame, mask: np.ndarray) -> Dict[str, Any]:
+    pay = frame.pay[mask]
+    return {"with_pay": int(np.count_nonzero(~np.isnan(pay))), "pay": _percentiles(pay)}
+
+
+def company_success(frame: ApplicationFrame, mask: np.ndarray, top: int = 10) -> List[Dict[str, Any]]:
+    """Per-company success rate (interviewing or better), busiest companies first."""
+    success_codes = np.array([STATUSES.index(s) for s in SUCCESS_STATUSES])
+    success = np.isin(frame.status, success_codes) & mask
+    totals = np.bincount(frame.company[mask], minlength=len(frame.companies))
+    wins = np.bincount(frame.company[success], minlength=len(frame.companies))
+    order = np.argsort(-totals, kind="stable")[:top]
+    return [
+        {"company": frame.companies[i] or "(unknown)", "applications": int(totals[i]),
+         "successes": int(wins[i]), "success_rate": round(float(wins[i] / totals[i]), 4)}
+        for i in order if totals[i]
+    ]
+
+
+METRICS = {
+    "funnel": funnel,
+    "response_times": response_times,
+    "pay": pay_percentiles,
+    "companies": company_success,
+}
+
+
+class AnalyticsEngine:
+    """
+    Loads a user's applications once into an ApplicationFrame and answers
+    metric queries from it. Frames and computed metrics are cached per user
+    and invalidated when the user's stats summary reports a newer update.
+    """
+
+    def __init__(self, applications_table: str = "applications", stats_table: str = "application_stats"):
+        dynamodb = boto3.resource("dynamodb", region_name=settings.AWS_REGION)
+        self.applications = dynamodb.Table(applications_table)
+        self.stats = dynamodb.Table(stats_table)
+        self._cache: "OrderedDict[str, Tuple[Optional[str], ApplicationFrame, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _version(self, user_id: str) -> Optional[str]:
+        """Latest update marker for a user, from the stream-maintained summary item."""
+        item = self.stats.get_item(
+            Key={"user_id": user_id, "sk": "summary"},
+            ProjectionExpression="updated_at").get("Item")
+        return item.get("updated_at") if item else None
+
+    def _load(self, user_id: str) -> ApplicationFrame:
+        params = {
+            "IndexName": "UserIndex",
+            "KeyConditionExpression": Key("user_id").eq(user_id),
+            "ProjectionExpression": ", ".join(f"#f{i}" for i in range(len(LOADED_FIELDS))),
+            "ExpressionAttributeNames": {f"#f{i}": f for i, f in enumerate(LOADED_FIELDS)},
+        }
+        items: List[Dict[str, Any]] = []
+        while True:
+            response = self.applications.query(**params)
+            items.extend(response.get("Items", []))
+            if "LastEvaluatedKey" not in response:
+                break
+            params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        logger.info(f"Loaded {len(items)} applications for analytics (user {user_id})")
+        return ApplicationFrame(items)
+
+    def frame(self, user_id: str) -> Tuple[ApplicationFrame, Dict[str, Any]]:
+        version = self._version(user_id)
+        with self._lock:
+            cached = self._cache.get(user_id)
+            if cached and version is not None and cached[0] == version:
+                self._cache.move_to_end(user_id)
+                return cached[1], cached[2]
+
+        frame = self._load(user_id)
+        results: Dict[str, Any] = {}
+        with self._lock:
+            self._cache[user_id] = (version, frame, results)
+            self._cache.move_to_end(user_id)
+            while len(self._cache) > MAX_CACHED_USERS:
+                self._cache.popitem(last=False)
+        return frame, results
+
+    @staticmethod
+    def _compute(frame: ApplicationFrame, results: Dict[str, Any], metric: str,
+                 filters: Optional[Dict[str, Any]]) -> Any:
+        filters = {k: v for k, v in (filters or {}).items() if k in ("status", "company", "since") and v}
+        cache_key = (metric, tuple(sorted(filters.items())))
+        if cache_key not in results:
+            results[cache_key] = METRICS[metric](frame, frame.mask(**filters))
+        return results[cache_key]
+
+    def metric(self, user_id: str, metric: str, filters: Optional[Dict[str, Any]] = None) -> Any:
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}'. Must be one of {', '.join(sorted(METRICS))}")
+        frame, results = self.frame(user_id)
+        return self._compute(frame, results, metric, filters)
+
+    def report(self, user_id: str, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        # One frame for the whole report, so every metric sees the same version of the data
+        frame, results = self.frame(user_id)
+        report = {"total_applications": frame.size}
+        for metric in METRICS:
+            report[metric] = self._compute(frame, results, metric, filters)
+        return report
+
+
+_engine: Optional[AnalyticsEngine] = None
+
+
+def get_analytics_engine() -> AnalyticsEngine:
+    """Process-wide engine so the frame cache survives across tool calls."""
+    global _engine
+    if _engine is None:
+        _engine = AnalyticsEngine(settings.APPLICATIONS_TABLE, settings.STATS_TABLE)
+    return _engine
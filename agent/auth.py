@@ -0,0 +1,50 @@
+import logging
+from functools import lru_cache
+
+import jwt
+from fastapi import HTTPException, Request
+from settings import get_settings
+
+logger = logging.getLogger("applyflow-agent")
+
+settings = get_settings()
+
+
+@lru_cache(maxsize=None)
+def _jwks_client() -> jwt.PyJWKClient:
+    """Auth0's signing keys, cached in-process and refetched when a token names an unknown key."""
+    return jwt.PyJWKClient(f"https://{settings.AUTH0_DOMAIN}/.well-known/jwks.json")
+
+
+def verify_token(token: str) -> dict:
+    signing_key = _jwks_client().get_signing_key_from_jwt(token)
+    return jwt.decode(
+        token,
+        signing_key.key,
+        algorithms=["RS256"],
+        audience=settings.AUTH0_AUDIENCE,
+        issuer=f"https://{settings.AUTH0_DOMAIN}/",
+        options={"require": ["exp", "sub"]},
+    )
+
+
+def authenticated_user_id(request: Request) -> str:
+    """
+    FastAPI dependency returning the `sub` of the request's Auth0 access token,
+    the same id the backend's JWT authorizer hands its Lambdas.
+
+    Data tools read the user from here (via the agent's invocation state),
+    never from arguments the model fills in.
+    """
+    if not settings.AUTH0_DOMAIN or not settings.AUTH0_AUDIENCE:
+        logger.error("AUTH0_DOMAIN and AUTH0_AUDIENCE must be set to authenticate agent requests")
+        raise HTTPException(status_code=500, detail="Authentication is not configured")
+
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Missing bearer token", headers={"WWW-Authenticate": "Bearer"})
+    try:
+        return verify_token(token)["sub"]
+    except jwt.PyJWTError as e:
+        logger.warning(f"Rejected access token: {e}")
+        raise HTTPException(status_code=401, detail="Invalid access token", headers={"WWW-Authenticate": "Bearer"})
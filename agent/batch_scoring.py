@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List
+
+import matching
+from postings import get_posting_fetcher, normalize_url
+from settings import get_settings
+
+logger = logging.getLogger("applyflow-agent")
+
+settings = get_settings()
+
+MAX_BATCH_LINKS = 50
+# Keyword lists sent along with each top posting
+DETAIL_KEYWORDS = 10
+
+
+def unique_links(links: List[str]) -> List[str]:
+    """Validate and de-duplicate links by normalized URL, keeping the first spelling and the order."""
+    if not links:
+        raise ValueError("At least one job link is required")
+    seen, unique = set(), []
+    for link in links:
+        normalized = normalize_url(link)
+        if normalized not in seen:
+            seen.add(normalized)
+            unique.append(link)
+    if len(unique) > MAX_BATCH_LINKS:
+        raise ValueError(f"At most {MAX_BATCH_LINKS} job links can be scored at once")
+    return unique
+
+
+async def _score_one(index: int, link: str, resume_text: str, slots: asyncio.Semaphore) -> Dict[str, Any]:
+    async with slots:
+        try:
+            posting = await asyncio.to_thread(get_posting_fetcher().fetch, link)
+        except Exception as e:
+            return {"index": index, "link": link, "error": str(e)}
+    result = matching.score(resume_text, posting["description"], posting["requirements"])
+    return {
+        "index": index,
+        "link": link,
+        "job_title": posting["job_title"],
+        "company": posting["company"],
+        **result,
+    }
+
+
+async def score_postings(resume_text: str, links: List[str],
+                         concurrency: int = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Fetch, parse and score every posting concurrently, yielding each result
+    as soon as it is ready. Fetches are bounded by `concurrency`; scoring is
+    local and needs no LLM.
+    """
+    slots = asyncio.Semaphore(concurrency or settings.POSTING_FETCH_CONCURRENCY)
+    tasks = [asyncio.create_task(_score_one(i, link, resume_text, slots)) for i, link in enumerate(links)]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def rank(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Scored postings best first; ties keep the order the links were given in."""
+    return sorted((r for r in results if "error" not in r), key=lambda r: (-r["score"], r["index"]))
+
+
+def summarize(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "link": result["link"],
+        "job_title": result["job_title"],
+        "company": result["company"],
+        "score": result["score"],
+        "skill_coverage": result["skill_coverage"],
+        "similarity": result["similarity"],
+        "matched_skills": result["matched_skills"][:DETAIL_KEYWORDS],
+        "missing_skills": result["missing_skills"][:DETAIL_KEYWORDS],
+        "missing_keywords": result["missing_keywords"][:DETAIL_KEYWORDS],
+    }
+
+
+def feedback_prompt(top: List[Dict[str, Any]]) -> str:
+    """Compact brief for the LLM: only the top postings and their computed numbers."""
+    lines = ["These job postings scored best against the user's resume on local skill and keyword matching.",
+             "For each, explain briefly why it fits and what to emphasize or add to the resume.",
+             "Use the scores and keywords given; do not invent numbers.", ""]
+    for rank_number, result in enumerate(top, 1):
+        lines.append(f"{rank_number}. {result['job_title']} at {result['company']} ({result['link']}): "
+                     f"score {result['score']}/100, skill coverage {result['skill_coverage']:.0%}; "
+                     f"matched skills: {', '.join(result['matched_skills']) or 'none'}; "
+                     f"missing skills: {', '.join(result['missing_skills']) or 'none'}; "
+                     f"missing keywords: {', '.join(result['missing_keywords']) or 'none'}")
+    return "\n".join(lines)
@@ -0,0 +1,86 @@
+"""
+Load test for the /agent endpoint.
+
+Fires prompts from many independent sessions at increasing client
+concurrency and reports throughput, plus /health latency measured while the
+agent requests are in flight. With a non-blocking endpoint, throughput should
+grow with concurrency up to AGENT_MAX_CONCURRENCY and /health should stay fast.
+
+The endpoint requires an Auth0 access token for the API audience; pass one
+with --token or AGENT_ACCESS_TOKEN.
+
+    uvicorn main:app --port 8000 &
+    python benchmarks/agent_load.py --url http://localhost:8000 --token "$TOKEN" --levels 1 2 4 8
+"""
+import os
+import time
+import uuid
+import asyncio
+import argparse
+import statistics
+from typing import List
+
+import httpx
+
+
+async def one_turn(client: httpx.AsyncClient, url: str, prompt: str) -> float:
+    start = time.perf_counter()
+    response = await client.post(f"{url}/agent", json={"prompt": prompt, "session_id": f"load-{uuid.uuid4()}"})
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def probe_health(client: httpx.AsyncClient, url: str, stop: asyncio.Event, samples: List[float]) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get(f"{url}/health")
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.2)
+
+
+async def run_level(url: str, token: str, concurrency: int, requests: int, prompt: str) -> dict:
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(timeout=300, limits=limits, headers=headers) as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        stop = asyncio.Event()
+        health: List[float] = []
+
+        async def bounded() -> float:
+            async with semaphore:
+                return await one_turn(client, url, prompt)
+
+        prober = asyncio.create_task(probe_health(client, url, stop, health))
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(bounded() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await prober
+
+    return {
+        "concurrency": concurrency,
+        "throughput_rps": round(requests / elapsed, 3),
+        "turn_p50_s": round(statistics.median(latencies), 2),
+        "health_p50_ms": round(statistics.median(health), 1) if health else None,
+        "health_max_ms": round(max(health), 1) if health else None,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent /agent load test")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--token", default=os.environ.get("AGENT_ACCESS_TOKEN"),
+                        help="Auth0 access token sent as a bearer token")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--requests-per-level", type=int, default=16)
+    parser.add_argument("--prompt", default="Hi! What can you help me with?")
+    args = parser.parse_args()
+    if not args.token:
+        parser.error("an access token is required: pass --token or set AGENT_ACCESS_TOKEN")
+
+    for level in args.levels:
+        print(await run_level(args.url, args.token, level, args.requests_per_level, args.prompt))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+"""
+Micro-benchmark for the local resume/posting matching engine. Times scoring
+one resume against a posting with the resume profile already cached (the
+batch-scoring case) and with a cold profile (a new resume every call).
+
+    cd agent && uv run python benchmarks/matching_speed.py --pairs 5000
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matching import MatchingEngine  # noqa: E402
+
+RESUME = """
+Senior backend engineer with 7 years of experience. Python, FastAPI, Django and Go.
+Designed REST APIs and event-driven microservices on AWS (Lambda, DynamoDB, S3, SQS).
+Containerized services with Docker and deployed on Kubernetes; infrastructure as code with Terraform.
+Built data pipelines with Airflow and Spark feeding a Snowflake warehouse. PostgreSQL and Redis tuning.
+CI/CD with GitHub Actions, observability with Prometheus and Grafana. Mentoring and leading a team of 4.
+""" * 3
+
+POSTING = """
+We are looking for a Staff Software Engineer to lead the design of our distributed payments platform.
+You will build highly available services, own system design reviews, and mentor engineers across teams.
+Our stack: Java and Kotlin on Spring Boot, Kafka, PostgreSQL, Redis, Kubernetes on GCP. Strong
+communication with stakeholders and cross-functional partners is essential.
+""" * 2
+REQUIREMENTS = [
+    "8+ years building backend systems in Java, Kotlin or Go",
+    "Experience with Kafka or other event streaming platforms",
+    "Production experience with Kubernetes and Terraform",
+    "Deep knowledge of PostgreSQL performance tuning",
+]
+
+
+def timed(fn, iterations: int) -> dict:
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return {"p50_us": round(statistics.median(samples), 1), "p99_us": round(samples[int(len(samples) * 0.99)], 1)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Matching engine micro-benchmark")
+    parser.add_argument("--pairs", type=int, default=5000)
+    args = parser.parse_args()
+
+    engine = MatchingEngine()
+    print("result:", engine.score(RESUME, POSTING, REQUIREMENTS))
+    print("cached resume profile:", timed(lambda i: engine.score(RESUME, POSTING, REQUIREMENTS), args.pairs))
+    print("cold resume profile:  ", timed(lambda i: engine.score(f"{RESUME} {i}", POSTING, REQUIREMENTS), args.pairs))
+
+
+if __name__ == "__main__":
+    main()
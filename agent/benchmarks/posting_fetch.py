@@ -0,0 +1,99 @@
+"""
+Exercise the job-posting fetcher against a local HTTP stub server: a cold
+fetch and parse, a fresh cache hit, an ETag revalidation answered with 304,
+and a size-limit rejection. Reports latency and how many bytes the stub sent.
+
+    cd agent && uv run python benchmarks/posting_fetch.py --iterations 50
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis_cache import AnalysisCache  # noqa: E402
+from postings import PostingFetcher  # noqa: E402
+
+POSTING = b"""<html><head><title>Careers | Initech</title>
+<meta property="og:site_name" content="Initech"></head><body>
+<header><h1>Senior Backend Engineer</h1></header>
+<p>Initech is hiring a backend engineer to build our billing platform.</p>
+<h2>Requirements</h2><ul><li>5+ years of Python</li><li>AWS and DynamoDB</li><li>REST API design</li></ul>
+<h2>Benefits</h2><ul><li>Remote friendly</li></ul>
+</body></html>""" + b"<!-- padding -->" * 4000
+ETAG = '"posting-v1"'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    bytes_sent = 0
+
+    def do_GET(self):
+        if self.path.startswith("/huge"):
+            body = b"<html>" + b"x" * (3 * 1024 * 1024)
+        elif self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.end_headers()
+            return
+        else:
+            body = POSTING
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", ETAG)
+        self.end_headers()
+        self.wfile.write(body)
+        StubHandler.bytes_sent += len(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def timed(fn, iterations: int) -> dict:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"p50_ms": round(statistics.median(samples), 3), "max_ms": round(max(samples), 3)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Job posting fetcher benchmark")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    cold = PostingFetcher(AnalysisCache(None, ttl=3600), allow_private_hosts=True)
+    fresh = PostingFetcher(AnalysisCache(None, ttl=3600), allow_private_hosts=True)
+    stale = PostingFetcher(AnalysisCache(None, ttl=3600), fresh_seconds=0, allow_private_hosts=True)
+
+    counter = iter(range(10 ** 9))
+    print("parsed:", fresh.fetch(f"{base}/jobs/1?utm_source=benchmark"))
+    stale.fetch(f"{base}/jobs/1")
+
+    sent = StubHandler.bytes_sent
+    print("cold fetch + parse:", timed(lambda: cold.fetch(f"{base}/jobs/{next(counter)}"), args.iterations),
+          f"{(StubHandler.bytes_sent - sent) // args.iterations} bytes/request")
+    sent = StubHandler.bytes_sent
+    print("fresh cache hit:", timed(lambda: fresh.fetch(f"{base}/jobs/1"), args.iterations),
+          f"{(StubHandler.bytes_sent - sent) // args.iterations} bytes/request")
+    sent = StubHandler.bytes_sent
+    print("304 revalidation:", timed(lambda: stale.fetch(f"{base}/jobs/1"), args.iterations),
+          f"{(StubHandler.bytes_sent - sent) // args.iterations} bytes/request", stale.stats())
+
+    try:
+        cold.fetch(f"{base}/huge")
+    except ValueError as e:
+        print("size limit:", e)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Measure per-delegation overhead of the sub-agents against a local stub of
+the OpenAI chat completions API: a fresh model + Agent on every call (the
+old behaviour) versus a warm SubAgentPool instance on the shared model,
+whose requests reuse one HTTP client. Each delegation is a real
+invoke_async round trip; the stub charges `--handshake-ms` for every new
+connection, standing in for TCP and TLS setup to the real API.
+
+    cd agent && uv run python benchmarks/subagent_overhead.py --iterations 50
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from strands import Agent  # noqa: E402
+from strands.models.openai import OpenAIModel  # noqa: E402
+from subagents.factory import SharedClientOpenAIModel, SubAgentPool  # noqa: E402
+from subagents.resume_agent import RESUME_PROMPT, analyze_resume, read_job_application_link  # noqa: E402
+
+MODEL_ID = "gpt-5-mini"
+
+
+def chunk(delta: dict, finish_reason=None, usage=None) -> bytes:
+    body = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": 0, "model": MODEL_ID,
+            "choices": [] if usage else [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+    if usage:
+        body["usage"] = usage
+    return f"data: {json.dumps(body)}\n\n".encode("utf-8")
+
+
+COMPLETION = b"".join([
+    chunk({"role": "assistant", "content": "Lead with your Python and AWS work."}),
+    chunk({}, finish_reason="stop"),
+    chunk({}, usage={"prompt_tokens": 200, "completion_tokens": 10, "total_tokens": 210}),
+    b"data: [DONE]\n\n",
+])
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so a client that reuses its connection skips the handshake
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+        time.sleep(self.server.handshake_seconds)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(COMPLETION)))
+        self.end_headers()
+        self.wfile.write(COMPLETION)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub(handshake_ms: float) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.connections = 0
+    server.handshake_seconds = handshake_ms / 1000
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def tools():
+    return [read_job_application_link, analyze_resume]
+
+
+async def measure(delegate, iterations: int, server: ThreadingHTTPServer) -> dict:
+    connections = server.connections
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await delegate("How should I tailor my resume for a backend role?")
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "mean_ms": round(statistics.mean(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 3),
+        "connections": server.connections - connections,
+    }
+
+
+async def run(iterations: int, handshake_ms: float) -> None:
+    server = start_stub(handshake_ms)
+    client_args = {"api_key": "stub", "base_url": f"http://127.0.0.1:{server.server_port}/v1"}
+
+    async def fresh_delegation(query: str) -> str:
+        model = OpenAIModel(client_args=client_args, model_id=MODEL_ID)
+        agent = Agent(model=model, system_prompt=RESUME_PROMPT, tools=tools(), callback_handler=None)
+        return str(await agent.invoke_async(query))
+
+    shared = SharedClientOpenAIModel(client_args=client_args, model_id=MODEL_ID)
+    pool = SubAgentPool(name="resume", system_prompt=RESUME_PROMPT, tools=tools)
+    # The pool builds its instances from get_model; point them at the stub's shared model instead
+    pool._build = lambda: Agent(model=shared, system_prompt=RESUME_PROMPT, tools=tools(), callback_handler=None)
+
+    try:
+        print(f"fresh model + Agent per call: {await measure(fresh_delegation, iterations, server)}")
+        print(f"pooled Agent, shared client:  {await measure(pool.invoke_async, iterations, server)}")
+    finally:
+        await shared.aclose()
+        server.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sub-agent delegation overhead against a stub OpenAI API")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--handshake-ms", type=float, default=30,
+                        help="Delay the stub adds to every new connection")
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations, args.handshake_ms))
+
+
+if __name__ == "__main__":
+    main()
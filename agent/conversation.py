@@ -0,0 +1,239 @@
+import math
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from strands import Agent
+from strands.agent.conversation_manager import ConversationManager
+from strands.types.content import Message, Messages
+from strands.types.exceptions import ContextWindowOverflowException
+
+logger = logging.getLogger("applyflow-agent")
+
+# Rough tokenizer-free estimate; good enough to budget against, and the real
+# per-turn usage reported by the model is exposed alongside it
+CHARS_PER_TOKEN = 4
+# Flat cost for non-text blocks (images, documents)
+BINARY_BLOCK_TOKENS = 1000
+SUMMARY_HEADER = "Summary of the earlier conversation:"
+TOOL_RESULT_PREVIEW_CHARS = 400
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a job seeker and the ApplyFlow assistant.
+You are given the previous summary (if any) and the turns that are being dropped from the assistant's context.
+Return an updated summary that keeps every fact the assistant may need later: the user's goals and preferences,
+companies, job titles, application and resume ids, decisions made, and open questions.
+Be terse. Use short bullet points. Do not add anything that is not in the input."""
+
+
+def estimate_text_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _block_text(block: Dict[str, Any]) -> str:
+    if "text" in block:
+        return block["text"]
+    if "toolUse" in block:
+        return f"{block['toolUse'].get('name')} {block['toolUse'].get('input')}"
+    if "toolResult" in block:
+        return "".join(_block_text(c) for c in block["toolResult"].get("content", []))
+    if "json" in block:
+        return str(block["json"])
+    return ""
+
+
+def estimate_message_tokens(message: Message) -> int:
+    tokens = 0
+    for block in message.get("content", []):
+        if any(k in block for k in ("image", "document", "video")):
+            tokens += BINARY_BLOCK_TOKENS
+        else:
+            tokens += estimate_text_tokens(_block_text(block))
+    return tokens
+
+
+def estimate_tokens(messages: Messages) -> int:
+    return sum(estimate_message_tokens(m) for m in messages)
+
+
+def _is_summary(message: Message) -> bool:
+    content = message.get("content", [])
+    return bool(content) and content[0].get("text", "").startswith(SUMMARY_HEADER)
+
+
+def _is_turn_start(message: Message) -> bool:
+    """A user prompt, as opposed to a user message carrying tool results."""
+    return message["role"] == "user" and not any("toolResult" in b for b in message.get("content", []))
+
+
+def render_transcript(messages: Messages) -> str:
+    """Plain-text rendering of messages for the summarizer."""
+    lines = []
+    for message in messages:
+        for block in message.get("content", []):
+            if "text" in block:
+                lines.append(f"{message['role']}: {block['text']}")
+            elif "toolUse" in block:
+                lines.append(f"assistant called {block['toolUse'].get('name')} with {block['toolUse'].get('input')}")
+            elif "toolResult" in block:
+                text = _block_text(block)[:TOOL_RESULT_PREVIEW_CHARS]
+                lines.append(f"tool result: {text}")
+    return "\n".join(lines)
+
+
+class ModelSummarizer:
+    """Folds evicted turns into the rolling summary with a tool-less agent on a shared model."""
+
+    def __init__(self, model):
+        self.model = model
+
+    async def __call__(self, previous_summary: Optional[str], messages: Messages) -> str:
+        prompt = (f"Previous summary:\n{previous_summary or '(none)'}\n\n"
+                  f"Turns being dropped:\n{render_transcript(messages)}")
+        agent = Agent(model=self.model, system_prompt=SUMMARY_PROMPT, callback_handler=None)
+        return str(await agent.invoke_async(prompt)).strip()
+
+
+class TokenBudgetConversationManager(ConversationManager):
+    """
+    Keeps the prompt under a token budget instead of a fixed message count.
+
+    After every turn, large tool results outside the most recent messages are
+    collapsed into a short preview. If the conversation is still over budget
+    (or over `max_messages`), the oldest whole turns are evicted down to
+    `low_water_ratio` of the budget and queued for the rolling summary that
+    stays at the head of the conversation.
+
+    strands calls apply_management from inside the agent's event loop, so no
+    model call happens there: the caller awaits summarize_pending between
+    turns. Evicting to a low-water mark means that runs once every few turns
+    rather than on every turn.
+    """
+
+    def __init__(self, max_prompt_tokens: int = 12000, max_messages: Optional[int] = None,
+                 preserve_recent_messages: int = 6, tool_result_max_tokens: int = 800,
+                 collapse_tool_results: bool = True, low_water_ratio: float = 0.6,
+                 summarizer: Optional[Callable[[Optional[str], Messages], Awaitable[str]]] = None):
+        super().__init__()
+        self.max_prompt_tokens = max_prompt_tokens
+        self.max_messages = max_messages
+        self.preserve_recent_messages = preserve_recent_messages
+        self.tool_result_max_tokens = tool_result_max_tokens
+        self.collapse_tool_results = collapse_tool_results
+        self.low_water_ratio = low_water_ratio
+        self.summarizer = summarizer
+        self.summary: Optional[str] = None
+        # Evicted messages not yet folded into the summary
+        self.pending_summary: Messages = []
+        self.last_turn: Dict[str, int] = {}
+
+    def get_state(self) -> Dict[str, Any]:
+        state = super().get_state()
+        state["summary"] = self.summary
+        return state
+
+    def restore_from_session(self, state: Dict[str, Any]) -> Optional[List[Message]]:
+        if state.get("__name__") == "SlidingWindowConversationManager":
+            # Sessions created before token budgeting: keep their offset, start without a summary
+            self.removed_message_count = state.get("removed_message_count", 0)
+            return None
+        super().restore_from_session(state)
+        self.summary = state.get("summary")
+        return [self._summary_message()] if self.summary else None
+
+    def _summary_message(self) -> Message:
+        return {"role": "user", "content": [{"text": f"{SUMMARY_HEADER}\n{self.summary}"}]}
+
+    def _collapse(self, messages: Messages) -> int:
+        collapsed = 0
+        for position, message in enumerate(messages[:-self.preserve_recent_messages or None]):
+            content = []
+            for block in message.get("content", []):
+                text = _block_text(block) if "toolResult" in block else ""
+                tokens = estimate_text_tokens(text)
+                if tokens > self.tool_result_max_tokens:
+                    block = {"toolResult": {**block["toolResult"], "content": [{"text": (
+                        f"{text[:TOOL_RESULT_PREVIEW_CHARS]}\n[... {tokens} tokens of tool output collapsed]")}]}}
+                    collapsed += 1
+                content.append(block)
+            if content != message.get("content"):
+                # New message object: the stored original may still be queued for persistence
+                messages[position] = {**message, "content": content}
+        return collapsed
+
+    def _split_point(self, messages: Messages, target_tokens: int, force: bool) -> int:
+        """
+        First message to keep: the earliest turn start such that the kept
+        messages fit `target_tokens` (and `max_messages`), never cutting into
+        the preserved tail unless `force` is set.
+        """
+        start = 1 if messages and _is_summary(messages[0]) else 0
+        last_allowed = len(messages) - (1 if force else self.preserve_recent_messages)
+        candidates = [i for i in range(start + 1, max(last_allowed, start) + 1)
+                      if i < len(messages) and _is_turn_start(messages[i])]
+        for i in candidates:
+            kept = messages[i:]
+            if estimate_tokens(kept) <= target_tokens and (not self.max_messages or len(kept) <= self.max_messages):
+                return i
+        return candidates[-1] if candidates else start
+
+    def _evict(self, agent: Agent, target_tokens: int, force: bool = False) -> int:
+        messages = agent.messages
+        start = 1 if messages and _is_summary(messages[0]) else 0
+        split = self._split_point(messages, target_tokens, force)
+        if split <= start:
+            return 0
+
+        evicted = messages[start:split]
+        if self.summarizer:
+            self.pending_summary.extend(evicted)
+        # Only messages that exist in session storage count towards the offset
+        self.removed_message_count += len(evicted)
+        head = [self._summary_message()] if self.summary else []
+        messages[:] = head + messages[split:]
+        return len(evicted)
+
+    async def summarize_pending(self, agent: Agent) -> bool:
+        """
+        Fold the messages evicted since the last call into the rolling summary
+        and refresh the summary at the head of the conversation. The caller
+        must hold the session's turn lock. Returns whether the summary changed.
+        """
+        if not (self.summarizer and self.pending_summary):
+            return False
+        evicted, self.pending_summary = self.pending_summary, []
+        try:
+            self.summary = await self.summarizer(self.summary, evicted)
+        except Exception as e:
+            logger.error(f"Conversation summary failed, dropping {len(evicted)} messages unsummarized: {e}",
+                         exc_info=True)
+            return False
+        messages = agent.messages
+        if messages and _is_summary(messages[0]):
+            messages[0] = self._summary_message()
+        else:
+            messages.insert(0, self._summary_message())
+        return True
+
+    def _over_budget(self, messages: Messages) -> bool:
+        return (estimate_tokens(messages) > self.max_prompt_tokens
+                or bool(self.max_messages and len(messages) > self.max_messages))
+
+    def apply_management(self, agent: Agent, **kwargs: Any) -> None:
+        collapsed = self._collapse(agent.messages) if self.collapse_tool_results else 0
+        evicted = 0
+        if self._over_budget(agent.messages):
+            evicted = self._evict(agent, int(self.max_prompt_tokens * self.low_water_ratio))
+        self.last_turn = {
+            "context_tokens": estimate_tokens(agent.messages),
+            "messages": len(agent.messages),
+            "collapsed_tool_results": collapsed,
+            "evicted_messages": evicted,
+        }
+        if collapsed or evicted:
+            logger.info(f"Conversation compacted: {self.last_turn}")
+
+    def reduce_context(self, agent: Agent, e: Optional[Exception] = None, **kwargs: Any) -> None:
+        """Called when the model rejects the prompt as too large; compact harder or give up."""
+        collapsed = self._collapse(agent.messages)
+        evicted = self._evict(agent, int(self.max_prompt_tokens * self.low_water_ratio), force=True)
+        if not (collapsed or evicted):
+            raise ContextWindowOverflowException("Unable to reduce conversation context further") from e
@@ -0,0 +1,340 @@
+import os
+import json
+import time
+import zlib
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import boto3
+import numpy as np
+from boto3.dynamodb.conditions import Attr, Key
+from matching import extract, term_weight
+from settings import get_settings
+from skills import SKILLS
+
+logger = logging.getLogger("applyflow-agent")
+
+settings = get_settings()
+
+DIMENSIONS = 512
+INITIAL_CAPACITY = 64
+# Random-hyperplane LSH used when a user's index is large enough to benefit
+ANN_MIN_ITEMS = 2000
+ANN_BITS = 10
+ANN_SEED = 7
+MAX_OPEN_INDEXES = 128
+# DynamoDB's BatchGetItem limit
+BATCH_GET_KEYS = 100
+# Incremental syncs re-read this far behind the cursor so writes stamped by a
+# slightly slower clock, or still in flight at the last sync, are not missed
+CURSOR_OVERLAP = timedelta(minutes=5)
+
+
+def embed(text: str) -> np.ndarray:
+    """
+    Hashed-feature embedding: skills and content terms (as extracted by the
+    matching engine) are hashed into a fixed number of signed dimensions with
+    the same weights, then L2-normalized. CPU-only, deterministic, no model.
+    """
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+    skills, terms = extract(text)
+    features = [(f"s:{s}", (1 + np.log(c)) * SKILLS[s][0]) for s, c in skills.items()]
+    features += [(f"t:{t}", (1 + np.log(c)) * term_weight(t)) for t, c in terms.items()]
+    for name, weight in features:
+        h = zlib.crc32(name.encode("utf-8"))
+        vector[h % DIMENSIONS] += weight if (h >> 31) & 1 else -weight
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class UserEmbeddingIndex:
+    """
+    One user's vectors as a memory-mapped float32 matrix plus a small JSON
+    manifest (item ids, kinds, labels, source versions and free slots).
+
+    Rows are updated in place: adds fill a free slot or append (the file
+    doubles when full), deletes zero the row and free its slot, so changes
+    never rewrite the whole index. Search is an exact matrix-vector product;
+    past ANN_MIN_ITEMS a random-hyperplane LSH layer narrows the candidates
+    first and the survivors are re-ranked exactly.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._manifest_path = os.path.join(directory, "manifest.json")
+        self._matrix_path = os.path.join(directory, "vectors.f32")
+        if os.path.exists(self._manifest_path):
+            with open(self._manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {"capacity": 0, "rows": 0, "free": [], "items": {}, "synced_at": 0,
+                             "reconciled_at": 0, "cursor": None}
+        self._matrix: Optional[np.memmap] = None
+        self._ann: Optional[Tuple[np.ndarray, Dict[int, np.ndarray]]] = None
+        self.lock = threading.Lock()
+        if self.manifest["capacity"]:
+            self._open(self.manifest["capacity"])
+
+    def _open(self, capacity: int) -> None:
+        mode = "r+" if os.path.exists(self._matrix_path) else "w+"
+        self._matrix = np.memmap(self._matrix_path, dtype=np.float32, mode=mode, shape=(capacity, DIMENSIONS))
+
+    def _grow(self) -> None:
+        capacity = max(INITIAL_CAPACITY, self.manifest["capacity"] * 2)
+        if self._matrix is not None:
+            self._matrix.flush()
+            del self._matrix
+        with open(self._matrix_path, "ab") as f:
+            f.truncate(capacity * DIMENSIONS * 4)
+        self.manifest["capacity"] = capacity
+        self._open(capacity)
+
+    def save(self) -> None:
+        if self._matrix is not None:
+            self._matrix.flush()
+        tmp = self._manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp, self._manifest_path)
+        self._ann = None
+
+    def versions(self) -> Dict[str, str]:
+        return {item_id: item["version"] for item_id, item in self.manifest["items"].items()}
+
+    def upsert(self, entries: Iterable[Tuple[str, str, str, str, str]]) -> int:
+        """Add or replace (item_id, kind, label, version, text) entries; identical texts are embedded once."""
+        count = 0
+        vectors: Dict[str, np.ndarray] = {}
+        for item_id, kind, label, version, text in entries:
+            item = self.manifest["items"].get(item_id)
+            if item:
+                row = item["row"]
+            elif self.manifest["free"]:
+                row = self.manifest["free"].pop()
+            else:
+                if self.manifest["rows"] >= self.manifest["capacity"]:
+                    self._grow()
+                row = self.manifest["rows"]
+                self.manifest["rows"] += 1
+            if text not in vectors:
+                vectors[text] = embed(text)
+            self._matrix[row] = vectors[text]
+            self.manifest["items"][item_id] = {"row": row, "kind": kind, "label": label, "version": version}
+            count += 1
+        return count
+
+    def delete(self, item_ids: Iterable[str]) -> int:
+        count = 0
+        for item_id in item_ids:
+            item = self.manifest["items"].pop(item_id, None)
+            if item:
+                self._matrix[item["row"]] = 0
+                self.manifest["free"].append(item["row"])
+                count += 1
+        return count
+
+    def _ann_candidates(self, query: np.ndarray) -> np.ndarray:
+        """Rows in the query's LSH bucket or one bit away, built over every live row."""
+        if self._ann is None:
+            live_rows = np.fromiter((item["row"] for item in self.manifest["items"].values()), dtype=np.int64)
+            planes = np.random.default_rng(ANN_SEED).standard_normal((ANN_BITS, DIMENSIONS)).astype(np.float32)
+            codes = (self._matrix[live_rows] @ planes.T > 0) @ (1 << np.arange(ANN_BITS))
+            buckets: Dict[int, np.ndarray] = {}
+            for code in np.unique(codes):
+                buckets[int(code)] = live_rows[codes == code]
+            self._ann = (planes, buckets)
+        planes, buckets = self._ann
+        code = int((planes @ query > 0) @ (1 << np.arange(ANN_BITS)))
+        # Probe the query's bucket and every bucket one bit away
+        probes = [code] + [code ^ (1 << b) for b in range(ANN_BITS)]
+        found = [buckets[p] for p in probes if p in buckets]
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+    def search(self, text: str, kind: Optional[str] = None, top_k: int = 5,
+               use_ann: Optional[bool] = None) -> List[Dict[str, Any]]:
+        items = [(item_id, item) for item_id, item in self.manifest["items"].items()
+                 if kind is None or item["kind"] == kind]
+        if not items:
+            return []
+        by_row = {item["row"]: (item_id, item) for item_id, item in items}
+        rows = np.fromiter(by_row, dtype=np.int64, count=len(by_row))
+        query = embed(text)
+        if use_ann if use_ann is not None else len(rows) >= ANN_MIN_ITEMS:
+            candidates = self._ann_candidates(query)
+            candidates = candidates[np.isin(candidates, rows)]
+            # Too few neighbours in the probed buckets: fall back to the exact scan
+            if len(candidates) >= top_k:
+                rows = candidates
+        scores = self._matrix[rows] @ query
+        k = min(top_k, len(rows))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        results = []
+        for i in best:
+            item_id, item = by_row[int(rows[i])]
+            results.append({"id": item_id, "kind": item["kind"], "label": item["label"],
+                            "similarity": round(float(scores[i]), 4)})
+        return results
+
+
+class EmbeddingIndexManager:
+    """
+    Opens per-user indexes on demand and keeps them in step with DynamoDB.
+
+    Each index records a cursor: the newest `updated_at` (or `created_at`) it
+    has seen. `sync` only returns resumes and applications written since then,
+    compares their versions with the index and re-embeds what changed. The
+    cursor is applied as a FilterExpression on UserIndex, so each sync still
+    reads (and pays read capacity for) the user's whole partition; what it
+    saves is the embedding work and the data sent back. Hard
+    deletes leave nothing behind for the cursor to find, so every
+    `reconcile_interval` seconds a key-only listing drops the ids that are
+    gone. Syncs run at most once per `sync_interval` seconds per user, right
+    before a query.
+    """
+
+    def __init__(self, root: str, resumes_table: str, resume_contents_table: str, applications_table: str,
+                 sync_interval: float = 60, reconcile_interval: float = 900):
+        self.root = root
+        self.sync_interval = sync_interval
+        self.reconcile_interval = reconcile_interval
+        self.dynamodb = boto3.resource("dynamodb", region_name=settings.AWS_REGION)
+        self.resumes = self.dynamodb.Table(resumes_table)
+        self.resume_contents_table = resume_contents_table
+        self.applications = self.dynamodb.Table(applications_table)
+        self._indexes: "OrderedDict[str, UserEmbeddingIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def index(self, user_id: str) -> UserEmbeddingIndex:
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is None:
+                # One directory per user, named by a hash so distinct ids never share one
+                directory = hashlib.sha256(user_id.encode("utf-8")).hexdigest()
+                index = self._indexes[user_id] = UserEmbeddingIndex(os.path.join(self.root, directory))
+                while len(self._indexes) > MAX_OPEN_INDEXES:
+                    self._indexes.popitem(last=False)
+            self._indexes.move_to_end(user_id)
+            return index
+
+    def _query_all(self, table, user_id: str, since: Optional[str] = None,
+                   projection: Optional[str] = None) -> List[Dict[str, Any]]:
+        params = {"IndexName": "UserIndex", "KeyConditionExpression": Key("user_id").eq(user_id)}
+        if since:
+            # UserIndex has no sort key on the write time, so this narrows the result, not the read
+            params["FilterExpression"] = Attr("updated_at").gt(since) | Attr("created_at").gt(since)
+        if projection:
+            params["ProjectionExpression"] = projection
+        items = []
+        while True:
+            response = table.query(**params)
+            items.extend(response.get("Items", []))
+            if "LastEvaluatedKey" not in response:
+                return items
+            params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def _content_texts(self, user_id: str, hashes: List[str]) -> Dict[str, str]:
+        """Extracted text of content-addressed resumes, by SHA-256."""
+        texts = {}
+        keys = [{"user_id": user_id, "sha256": h} for h in dict.fromkeys(hashes)]
+        for start in range(0, len(keys), BATCH_GET_KEYS):
+            request = {self.resume_contents_table: {"Keys": keys[start:start + BATCH_GET_KEYS],
+                                                    "ProjectionExpression": "sha256, #text",
+                                                    "ExpressionAttributeNames": {"#text": "text"}}}
+            while request:
+                response = self.dynamodb.batch_get_item(RequestItems=request)
+                for item in response["Responses"].get(self.resume_contents_table, []):
+                    texts[item["sha256"]] = item.get("text", "")
+                request = response.get("UnprocessedKeys")
+        return texts
+
+    def _changes(self, user_id: str, since: Optional[str]
+                 ) -> Tuple[Dict[str, Tuple[str, str, str, str, str]], Set[str], Optional[str]]:
+        """
+        Index entries for records written after `since` (everything when None),
+        the ids of changed resumes that are no longer indexable, and the newest
+        write time seen.
+        """
+        fetched = self._query_all(self.resumes, user_id, since)
+        applications = self._query_all(self.applications, user_id, since)
+        newest = max((str(item.get("updated_at") or item.get("created_at") or "")
+                      for item in fetched + applications), default="")
+        resumes = [r for r in fetched if r.get("upload_status") == "completed"]
+        unindexed = {f"resume#{r['id']}" for r in fetched if r.get("upload_status") != "completed"}
+        sources = {}
+        # Resumes uploaded with a content hash keep their text on the shared content record
+        texts = self._content_texts(user_id, [r["content_hash"] for r in resumes if r.get("content_hash")])
+        for resume in resumes:
+            file_name = resume.get("file_name", "")
+            if resume.get("content_hash"):
+                text = texts.get(resume["content_hash"]) or file_name
+                version = f"{resume['content_hash']}|{file_name}"
+            else:
+                text = resume.get("text") or file_name
+                version = str(resume.get("updated_at"))
+            sources[f"resume#{resume['id']}"] = (f"resume#{resume['id']}", "resume", file_name, version, text)
+        for app in applications:
+            label = f"{app.get('job_title') or ''} at {app.get('company') or ''}".strip()
+            text = " ".join(str(app.get(f) or "") for f in ("job_title", "company", "location"))
+            sources[f"application#{app['id']}"] = (
+                f"application#{app['id']}", "application", f"{label} ({app.get('status')})",
+                f"{app.get('updated_at')}|{app.get('status')}", text)
+        return sources, unindexed, newest or None
+
+    def _live_ids(self, user_id: str) -> Set[str]:
+        """Ids of every indexable record, read with key-only projections."""
+        live = {f"resume#{r['id']}" for r in self._query_all(self.resumes, user_id, projection="id, upload_status")
+                if r.get("upload_status") == "completed"}
+        live.update(f"application#{a['id']}" for a in self._query_all(self.applications, user_id, projection="id"))
+        return live
+
+    def sync(self, user_id: str, force: bool = False) -> UserEmbeddingIndex:
+        index = self.index(user_id)
+        with index.lock:
+            now = time.time()
+            manifest = index.manifest
+            if not force and now - manifest["synced_at"] < self.sync_interval:
+                return index
+            cursor = manifest.get("cursor")
+            since = (datetime.fromisoformat(cursor) - CURSOR_OVERLAP).isoformat() if cursor else None
+            sources, unindexed, newest = self._changes(user_id, since)
+            known = index.versions()
+            changed = [entry for item_id, entry in sources.items() if known.get(item_id) != entry[3]]
+            removed = unindexed & known.keys()
+            if since is None:
+                # A full read is complete on its own
+                removed |= known.keys() - sources.keys()
+                manifest["reconciled_at"] = now
+            elif now - manifest.get("reconciled_at", 0) >= self.reconcile_interval:
+                removed |= known.keys() - self._live_ids(user_id) - sources.keys()
+                manifest["reconciled_at"] = now
+            added = index.upsert(changed)
+            deleted = index.delete(removed)
+            manifest["cursor"] = max(cursor or "", newest or "") or None
+            manifest["synced_at"] = now
+            index.save()
+            if added or deleted:
+                logger.info(f"Embedding index synced for user {user_id}: {added} upserted, {deleted} deleted")
+        return index
+
+    def search(self, user_id: str, text: str, kind: Optional[str] = None, top_k: int = 5) -> List[Dict[str, Any]]:
+        index = self.sync(user_id)
+        with index.lock:
+            return index.search(text, kind=kind, top_k=top_k)
+
+
+_manager: Optional[EmbeddingIndexManager] = None
+
+
+def get_embedding_index() -> EmbeddingIndexManager:
+    """Process-wide manager so open indexes and sync timestamps are shared across tool calls."""
+    global _manager
+    if _manager is None:
+        _manager = EmbeddingIndexManager(settings.EMBEDDING_INDEX_DIR, settings.RESUMES_TABLE,
+                                         settings.RESUME_CONTENTS_TABLE, settings.APPLICATIONS_TABLE)
+    return _manager
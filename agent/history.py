@@ -0,0 +1,120 @@
+import os
+import json
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import boto3
+from strands.session.file_session_manager import AGENT_PREFIX, MESSAGE_PREFIX, SESSION_PREFIX
+
+logger = logging.getLogger("applyflow-agent")
+
+DEFAULT_AGENT_ID = "default"
+MAX_PAGE_SIZE = 100
+# Concurrent object reads when fetching one page of messages from S3
+MAX_PARALLEL_READS = 16
+
+
+def _message_dir(session_id: str, agent_id: str) -> str:
+    return f"{SESSION_PREFIX}{session_id}/agents/{AGENT_PREFIX}{agent_id}/messages/"
+
+
+def _message_index(name: str) -> int:
+    return int(name.rsplit("/", 1)[-1][len(MESSAGE_PREFIX):-len(".json")])
+
+
+def to_chat_message(index: int, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Project a stored message onto what the chat UI renders.
+
+    Only text blocks are kept; messages that are purely tool calls or tool
+    results have nothing to show and are dropped.
+    """
+    text = "".join(block["text"] for block in message.get("content", []) if "text" in block)
+    if not text:
+        return None
+    return {"index": index, "role": message.get("role"), "content": text}
+
+
+def page_bounds(indices: List[int], before: Optional[int], limit: int) -> List[int]:
+    """Indices of the `limit` newest messages strictly older than `before`."""
+    candidates = [i for i in indices if before is None or i < before]
+    return candidates[-limit:]
+
+
+class ConversationHistoryReader:
+    """
+    Read-only view of persisted conversations that talks to the session store
+    directly, without building an agent, model client or tools.
+
+    Uses the same storage layout as strands' FileSessionManager and
+    S3SessionManager.
+    """
+
+    def __init__(self, use_s3: bool, bucket: Optional[str] = None, prefix: str = "",
+                 region_name: Optional[str] = None, storage_dir: Optional[str] = None):
+        self.use_s3 = use_s3
+        self.bucket = bucket
+        self.prefix = prefix
+        self.storage_dir = storage_dir or os.path.join(tempfile.gettempdir(), "strands/sessions")
+        self._s3 = boto3.Session(region_name=region_name).client("s3") if use_s3 else None
+        self._pool = ThreadPoolExecutor(max_workers=MAX_PARALLEL_READS) if use_s3 else None
+
+    def _list_indices(self, directory: str) -> List[int]:
+        if not self.use_s3:
+            path = os.path.join(self.storage_dir, directory)
+            if not os.path.isdir(path):
+                return []
+            names = [n for n in os.listdir(path) if n.startswith(MESSAGE_PREFIX) and n.endswith(".json")]
+            return sorted(_message_index(n) for n in names)
+
+        indices = []
+        paginator = self._s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix + directory):
+            indices.extend(_message_index(obj["Key"]) for obj in page.get("Contents", [])
+                           if obj["Key"].endswith(".json"))
+        return sorted(indices)
+
+    def _read(self, directory: str, index: int) -> Optional[Dict[str, Any]]:
+        name = f"{MESSAGE_PREFIX}{index}.json"
+        if not self.use_s3:
+            try:
+                with open(os.path.join(self.storage_dir, directory, name), encoding="utf-8") as f:
+                    return json.load(f)
+            except FileNotFoundError:
+                return None
+        try:
+            body = self._s3.get_object(Bucket=self.bucket, Key=self.prefix + directory + name)["Body"]
+        except self._s3.exceptions.NoSuchKey:
+            return None
+        return json.loads(body.read())
+
+    def page(self, session_id: str, before: Optional[int] = None, limit: int = 50,
+             agent_id: str = DEFAULT_AGENT_ID) -> Dict[str, Any]:
+        """
+        Return one page of chat messages, newest page first.
+
+        `before` is the `next_before` value of the previous page; pass nothing
+        for the latest messages. Only the messages on the page are read.
+
+        Message ids are assigned contiguously from 0, so only the first page
+        lists the session to find the newest message (one LIST request per
+        1000 messages on S3); older pages know their range from `before` and
+        cost just the reads of their own messages.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        directory = _message_dir(session_id, agent_id)
+        if before is None:
+            selected = page_bounds(self._list_indices(directory), None, limit)
+        else:
+            selected = list(range(max(0, before - limit), max(0, before)))
+
+        if self._pool:
+            stored = list(self._pool.map(lambda i: self._read(directory, i), selected))
+        else:
+            stored = [self._read(directory, i) for i in selected]
+
+        messages = [m for m in (to_chat_message(i, s["message"]) for i, s in zip(selected, stored) if s) if m]
+        has_more = bool(selected) and selected[0] > 0
+        return {"messages": messages, "next_before": selected[0] if has_more else None}
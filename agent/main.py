@@ -1,18 +1,30 @@
+import gzip
+import json
+import asyncio
+import hashlib
 import logging
+import weakref
 import boto3
+from contextlib import asynccontextmanager
+from typing import List, Optional
 
 from strands import Agent, tool
 from strands.models.gemini import GeminiModel
-from strands.models.openai import OpenAIModel
 from subagents.analytics_agent import job_analytics_assistant
 from subagents.application_management_agent import application_management_assistant
-from subagents.resume_agent import resume_assistant
+from subagents.resume_agent import assistant_cache_tag, resume_assistant, resume_pool
+from subagents.factory import OrderedConcurrentToolExecutor, get_model
 from strands.session.file_session_manager import FileSessionManager
-from strands.session.s3_session_manager import S3SessionManager
-from strands.agent.conversation_manager import SlidingWindowConversationManager
-from fastapi import FastAPI, HTTPException
+from auth import authenticated_user_id
+from history import ConversationHistoryReader
+from router import IntentRouter, RouteDecision
+from analysis_cache import get_analysis_cache
+from batch_scoring import feedback_prompt, rank, score_postings, summarize, unique_links
+from session_cache import SessionAgentCache, WriteBehindQueue, WriteBehindS3SessionManager
+from conversation import ModelSummarizer, TokenBudgetConversationManager
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from strands_tools import http_request
 from settings import get_settings
@@ -43,7 +55,9 @@ Route queries to the appropriate specialized agent:
 - For simple greetings or questions not requiring specialized knowledge → Answer directly
 
 Always select the most appropriate tool based on the user's query to provide
-the best possible assistance.
+the best possible assistance. When a request spans several areas, call every
+relevant assistant in the same step rather than one after another; they run
+in parallel.
 """
 
 
@@ -54,30 +68,86 @@ the best possible assistance.
 #     model_id="gemini-2.5-flash-lite",
 # )
 
-model = OpenAIModel(
-    client_args={
-        "api_key":  settings.OPENAI_API_KEY,
-    },
-    # **model_config
-    model_id="gpt-5-mini",
-)
+# Shared with the sub-agents so every agent reuses one model per model id
+model = get_model("gpt-5-mini")
+
+# Folds turns evicted from a session's context into its rolling summary
+summarizer = ModelSummarizer(model)
+
+# Local fast path: confident single-intent requests skip the orchestrator LLM
+intent_router = IntentRouter.from_fixtures(
+    threshold=settings.ROUTER_CONFIDENCE_THRESHOLD) if settings.ROUTER_ENABLED else None
 
-conversation_manager = SlidingWindowConversationManager(
-    window_size=20,  # Maximum number of messages to keep
-    # Enable truncating the tool result when a message is too large for the model's context window
-    should_truncate_results=True,
+# Hydrated session agents stay live between turns; S3 writes happen off the request path
+session_writer = WriteBehindQueue() if settings.USE_S3_SESSION_STORAGE else None
+session_cache = SessionAgentCache(
+    max_entries=settings.SESSION_CACHE_MAX_ENTRIES,
+    idle_ttl=settings.SESSION_CACHE_IDLE_TTL_SECONDS,
+    max_total_messages=settings.SESSION_CACHE_MAX_TOTAL_MESSAGES,
+    writer=session_writer,
 )
+boto_session = boto3.Session(region_name=settings.AWS_REGION) if settings.USE_S3_SESSION_STORAGE else None
+history_reader = ConversationHistoryReader(
+    use_s3=settings.USE_S3_SESSION_STORAGE,
+    bucket=settings.S3_SESSION_BUCKET,
+    region_name=settings.AWS_REGION,
+)
+
+
+# Bounds concurrent agent turns so LLM round trips cannot starve the process
+agent_slots = asyncio.Semaphore(settings.AGENT_MAX_CONCURRENCY)
+# One lock per live session; entries disappear once no turn holds them
+session_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+# Conversation summaries run after the response; the event loop only keeps weak task references
+summary_tasks: "set[asyncio.Task]" = set()
+
+
+def owned_session_id(user_id: str, session_id: str) -> str:
+    """
+    Storage id of one of the caller's sessions.
+
+    Client session ids are only names within the caller's own namespace: the
+    stored id is prefixed with a fixed-length hash of the authenticated user,
+    so no choice of session_id reaches another user's conversation.
+    """
+    if not session_id or "/" in session_id or "\\" in session_id:
+        raise HTTPException(status_code=400, detail="Invalid session_id")
+    return f"{hashlib.sha256(user_id.encode('utf-8')).hexdigest()}:{session_id}"
+
+
+@asynccontextmanager
+async def session_lock(session_id: str):
+    """Hold a session's lock; every turn and every hydration of the session runs under it."""
+    lock = session_locks.get(session_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        session_locks[session_id] = lock
+    async with lock:
+        yield
+
+
+@asynccontextmanager
+async def session_turn(session_id: str):
+    """
+    Serialize turns within a session and cap turns across sessions.
+
+    The session lock is taken first so requests queued behind a busy session
+    do not hold one of the global slots while they wait.
+    """
+    async with session_lock(session_id):
+        async with agent_slots:
+            yield
 
 
 def get_session_manager(session_id: str):
     """
     Get the appropriate session manager based on settings.
 
-    Returns FileSessionManager in dev mode, S3SessionManager in production.
+    Returns FileSessionManager in dev mode, a write-behind S3SessionManager in production.
     """
     if settings.USE_S3_SESSION_STORAGE:
-        boto_session = boto3.Session(region_name=settings.AWS_REGION)
-        return S3SessionManager(
+        return WriteBehindS3SessionManager(
+            writer=session_writer,
             session_id=session_id,
             bucket=settings.S3_SESSION_BUCKET,
             boto_session=boto_session,
@@ -108,12 +178,97 @@ class ApplyFlowAgent(Agent):
                 http_request,
             ],
             session_manager=session_manager,
-            conversation_manager=conversation_manager,
+            # Independent delegations in one response run concurrently, results in request order
+            tool_executor=OrderedConcurrentToolExecutor(),
+            # Per instance: the manager tracks state for the conversation it trims
+            conversation_manager=TokenBudgetConversationManager(
+                max_prompt_tokens=settings.CONVERSATION_MAX_PROMPT_TOKENS,
+                max_messages=settings.CONVERSATION_WINDOW_SIZE,
+                preserve_recent_messages=settings.CONVERSATION_PRESERVE_RECENT_MESSAGES,
+                tool_result_max_tokens=settings.CONVERSATION_TOOL_RESULT_MAX_TOKENS,
+                collapse_tool_results=settings.SHOULD_TRUNCATE_RESULTS,
+                summarizer=summarizer,
+            ),
         )
         self.session_id = session_id
+        self.session_manager = session_manager
+
+    def turn_usage(self, usage_before: dict) -> dict:
+        """Token counts for the turn that just ran: real model usage and the compacted context size."""
+        usage = self.event_loop_metrics.accumulated_usage
+        return {
+            "input_tokens": usage["inputTokens"] - usage_before.get("inputTokens", 0),
+            "output_tokens": usage["outputTokens"] - usage_before.get("outputTokens", 0),
+            **self.conversation_manager.last_turn,
+        }
+
 
+def dispatch_direct(agent: ApplyFlowAgent, decision: RouteDecision, prompt: str, user_id: str) -> str:
+    """
+    Call the routed sub-agent tool directly on the session agent.
+
+    Direct tool calls are recorded in the conversation like any other tool
+    use, so the orchestrator still sees them on later turns. Keyword
+    arguments double as the call's invocation state, which is how the
+    authenticated user reaches the sub-agent's tools.
+    """
+    result = getattr(agent.tool, decision.tool_name)(query=prompt, user_id=user_id)
+    return "".join(block.get("text", "") for block in result.get("content", []))
+
+
+async def summarize_session(session_id: str, agent: ApplyFlowAgent) -> None:
+    """Fold the turns evicted from a session's context into its summary, as a turn of its own."""
+    try:
+        async with session_turn(session_id):
+            if await agent.conversation_manager.summarize_pending(agent):
+                # Persist the new summary with the rest of the conversation manager state
+                await asyncio.to_thread(agent.session_manager.sync_agent, agent)
+    except Exception as e:
+        logger.error(f"Conversation summary failed (session {session_id}): {str(e)}", exc_info=True)
+
+
+def schedule_summary(session_id: str, agent: ApplyFlowAgent) -> None:
+    """
+    Summarize evicted turns in the background so the response does not wait
+    on the summarizer's LLM call; the next turn queues behind it on the
+    session lock.
+    """
+    if agent.conversation_manager.pending_summary:
+        task = asyncio.create_task(summarize_session(session_id, agent))
+        summary_tasks.add(task)
+        task.add_done_callback(summary_tasks.discard)
+
+
+def route(prompt: str) -> Optional[RouteDecision]:
+    if not intent_router:
+        return None
+    decision = intent_router.route(prompt)
+    logger.info(f"Routed to {decision.intent} ({decision.source}, {decision.confidence:.2f}) {decision.reason}")
+    return decision if decision.is_fast_path else None
+
+
+def get_session_agent(session_id: str) -> ApplyFlowAgent:
+    """Return the live agent for a session, hydrating it from storage on a cache miss."""
+    return session_cache.get(session_id, lambda: ApplyFlowAgent(
+        model=model,
+        system_prompt=ORCHESTRATOR_PROMPT,
+        session_manager=get_session_manager(session_id=session_id),
+        session_id=session_id
+    ))
 
-app = FastAPI(title="ApplyFlow API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    if summary_tasks:
+        await asyncio.wait(summary_tasks, timeout=30)
+    if session_writer:
+        # Don't lose queued session writes on shutdown
+        await asyncio.to_thread(session_writer.flush, None, 30)
+    await model.aclose()
+
+
+app = FastAPI(title="ApplyFlow API", lifespan=lifespan)
 
 origins = [
     "*"
@@ -125,6 +280,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Route", "X-Input-Tokens", "X-Output-Tokens", "X-Context-Tokens"],
 )
 
 
@@ -134,27 +290,36 @@ class PromptRequest(BaseModel):
 
 
 @app.post('/agent')
-async def run_agent(request: PromptRequest):
+async def run_agent(request: PromptRequest, user_id: str = Depends(authenticated_user_id)):
     """Endpoint to interact with the ApplyFlow agent."""
     logger.info(f"POST /agent - session: {request.session_id}")
 
     prompt = request.prompt
-    session_id = request.session_id
+    session_id = owned_session_id(user_id, request.session_id)
 
     if not prompt:
         raise HTTPException(status_code=400, detail="No prompt provided")
 
     try:
-        session_manager = get_session_manager(session_id=session_id)
-        agent = ApplyFlowAgent(
-            model=model,
-            system_prompt=ORCHESTRATOR_PROMPT,
-            session_manager=session_manager,
-            session_id=session_id
-        )
-
-        response = agent(prompt)
-        return PlainTextResponse(content=str(response))
+        async with session_turn(session_id):
+            agent = await asyncio.to_thread(get_session_agent, session_id)
+
+            usage_before = dict(agent.event_loop_metrics.accumulated_usage)
+            decision = route(prompt)
+            if decision:
+                response = await asyncio.to_thread(dispatch_direct, agent, decision, prompt, user_id)
+            else:
+                # invoke_async keeps the event loop free during the LLM round trip
+                response = await agent.invoke_async(prompt, invocation_state={"user_id": user_id})
+            usage = agent.turn_usage(usage_before)
+        schedule_summary(session_id, agent)
+        logger.info(f"Turn usage (session {session_id}): {usage}")
+        return PlainTextResponse(content=str(response), headers={
+            "X-Route": decision.intent if decision else "orchestrator",
+            "X-Input-Tokens": str(usage["input_tokens"]),
+            "X-Output-Tokens": str(usage["output_tokens"]),
+            "X-Context-Tokens": str(usage.get("context_tokens", "")),
+        })
     except HTTPException:
         raise
     except Exception as e:
@@ -163,24 +328,22 @@ async def run_agent(request: PromptRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def run_agent_and_stream_response(prompt: str, session_id: str):
+async def run_agent_and_stream_response(prompt: str, session_id: str, user_id: str):
     """Stream agent responses back to the client."""
     try:
-        session_manager = get_session_manager(session_id=session_id)
-        orchestrator = Agent(
-            model=model,
-            system_prompt=ORCHESTRATOR_PROMPT,
-            tools=[
-                job_analytics_assistant,
-                application_management_assistant,
-                resume_assistant],
-            session_manager=session_manager,
-            conversation_manager=conversation_manager
-        )
-
-        async for item in orchestrator.stream_async(prompt):
-            if "data" in item:
-                yield item['data']
+        async with session_turn(session_id):
+            orchestrator = await asyncio.to_thread(get_session_agent, session_id)
+
+            usage_before = dict(orchestrator.event_loop_metrics.accumulated_usage)
+            decision = route(prompt)
+            if decision:
+                yield await asyncio.to_thread(dispatch_direct, orchestrator, decision, prompt, user_id)
+            else:
+                async for item in orchestrator.stream_async(prompt, invocation_state={"user_id": user_id}):
+                    if "data" in item:
+                        yield item['data']
+            logger.info(f"Turn usage (session {session_id}): {orchestrator.turn_usage(usage_before)}")
+        schedule_summary(session_id, orchestrator)
 
     except Exception as e:
         logger.error(
@@ -189,19 +352,19 @@ async def run_agent_and_stream_response(prompt: str, session_id: str):
 
 
 @app.post('/agent-streaming')
-async def run_agent_streaming(request: PromptRequest):
+async def run_agent_streaming(request: PromptRequest, user_id: str = Depends(authenticated_user_id)):
     """Endpoint to interact with the ApplyFlow agent with streaming responses."""
     logger.info(f"POST /agent-streaming - session: {request.session_id}")
 
     try:
         prompt = request.prompt
-        session_id = request.session_id
+        session_id = owned_session_id(user_id, request.session_id)
 
         if not prompt:
             raise HTTPException(status_code=400, detail="No prompt provided")
 
         return StreamingResponse(
-            run_agent_and_stream_response(prompt, session_id),
+            run_agent_and_stream_response(prompt, session_id, user_id),
             media_type="text/plain"
         )
     except HTTPException:
@@ -213,19 +376,18 @@ async def run_agent_streaming(request: PromptRequest):
 
 
 @app.get("/get_conversations")
-def get_conversations(session_id: str):
-    """Get conversation history for a session."""
+async def get_conversations(session_id: str, user_id: str = Depends(authenticated_user_id)):
+    """Get conversation history for one of the caller's sessions."""
     logger.info(f"GET /get_conversations - session: {session_id}")
+    session_id = owned_session_id(user_id, session_id)
 
     try:
-        session_manager = get_session_manager(session_id=session_id)
-        agent = ApplyFlowAgent(
-            model=model,
-            system_prompt=ORCHESTRATOR_PROMPT,
-            session_manager=session_manager,
-            session_id=session_id
-        )
-
+        agent = session_cache.peek(session_id)
+        if agent is None:
+            # Hydrate under the session lock, like a turn, so a concurrent miss
+            # cannot replace the agent a running turn is using
+            async with session_lock(session_id):
+                agent = await asyncio.to_thread(get_session_agent, session_id)
         return {"messages": agent.messages}
     except Exception as e:
         logger.error(
@@ -235,13 +397,99 @@ def get_conversations(session_id: str):
         )
 
 
+@app.get("/conversations")
+def list_conversation_messages(session_id: str, request: Request, before: Optional[int] = None, limit: int = 50,
+                               user_id: str = Depends(authenticated_user_id)):
+    """
+    Paginated, read-only conversation history for the chat UI.
+
+    Reads the session store directly instead of hydrating an agent, and only
+    the messages on the requested page. Only the caller's own sessions are
+    visible.
+    """
+    logger.info(f"GET /conversations - session: {session_id}, before: {before}, limit: {limit}")
+    session_id = owned_session_id(user_id, session_id)
+
+    try:
+        if session_writer:
+            # Make sure queued writes for a live session are visible in storage
+            session_writer.flush(session_id)
+        page = history_reader.page(session_id, before=before, limit=limit)
+        body = json.dumps(page).encode("utf-8")
+        if len(body) >= 1024 and "gzip" in request.headers.get("accept-encoding", ""):
+            return Response(content=gzip.compress(body), media_type="application/json",
+                            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+        return Response(content=body, media_type="application/json")
+    except Exception as e:
+        logger.error(
+            f"Error in /conversations (session {session_id}): {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500, detail=f"Error getting conversations: {str(e)}"
+        )
+
+
+class ScorePostingsRequest(BaseModel):
+    resume_text: str
+    job_links: List[str]
+    top_n: int = 5
+    feedback: bool = True
+
+
+async def stream_posting_scores(request: ScorePostingsRequest, links: List[str], user_id: str):
+    """NDJSON events: one per posting as it is scored, then the ranking, then LLM feedback on the top N."""
+    results = []
+    async for result in score_postings(request.resume_text, links):
+        results.append(result)
+        yield json.dumps({"type": "error" if "error" in result else "posting", **result}) + "\n"
+
+    top = [summarize(r) for r in rank(results)[:max(request.top_n, 0)]]
+    yield json.dumps({"type": "ranking", "top": top}) + "\n"
+
+    if request.feedback and top:
+        try:
+            text = await resume_pool.invoke_async(feedback_prompt(top), user_id)
+            yield json.dumps({"type": "feedback", "text": text}) + "\n"
+        except Exception as e:
+            logger.error(f"Posting feedback failed: {str(e)}", exc_info=True)
+            yield json.dumps({"type": "feedback_error", "error": str(e)}) + "\n"
+
+
+@app.post("/postings/score")
+async def score_job_postings(request: ScorePostingsRequest, user_id: str = Depends(authenticated_user_id)):
+    """
+    Triage many job links against one resume: fetch and score them all
+    locally, streaming results as they arrive, and spend one LLM call on
+    the best matches only.
+    """
+    logger.info(f"POST /postings/score - {len(request.job_links)} links")
+    try:
+        links = unique_links(request.job_links)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(stream_posting_scores(request, links, user_id), media_type="application/x-ndjson")
+
+
+@app.post("/analysis-cache/invalidate")
+def invalidate_resume_analysis(user_id: str = Depends(authenticated_user_id)):
+    """
+    Drop the caller's cached resume assistant answers. The resumes service
+    does this itself when a resume is uploaded or renamed; cached answers are
+    also keyed on the user's resumes, so this only frees space early.
+    """
+    removed = get_analysis_cache().invalidate(assistant_cache_tag(user_id))
+    logger.info(f"Invalidated {removed} cached analysis entries")
+    return {"removed": removed}
+
+
 @app.get("/health")
 def health_check():
     """Health check endpoint."""
     return {
         "status": "healthy",
         "service": "ApplyFlow Agent",
-        "session_storage": "s3" if settings.USE_S3_SESSION_STORAGE else "local_file"
+        "session_storage": "s3" if settings.USE_S3_SESSION_STORAGE else "local_file",
+        "session_cache": session_cache.stats(),
+        "analysis_cache": get_analysis_cache().stats(),
     }
 
 
@@ -0,0 +1,157 @@
+import re
+import math
+import zlib
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from analysis_cache import content_hash
+from skills import GENERIC_TERMS, IMPLIED_SKILLS, SKILLS
+
+# Feature space for hashed term ids; collisions are negligible at resume/posting sizes
+FEATURE_BITS = 20
+GENERIC_WEIGHT = 0.3
+REQUIREMENT_BOOST = 2.0
+MAX_MISSING_KEYWORDS = 15
+# Weight of skill coverage vs. overall text similarity in the 0-100 score
+SKILL_COVERAGE_WEIGHT = 0.6
+MAX_CACHED_RESUMES = 256
+
+_TOKEN = re.compile(r"[a-z][a-z0-9+#.]*[a-z0-9+#]|[a-z]")
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could do does for from
+had has have having how i if in into is it its just may more most must need no not of on or our out over
+own per role same should so some such than that the their them then there these they this those through
+to too under up very was we were what when where which while who will with within would you your
+experience team work working years year strong ability skills knowledge including job position candidate
+""".split())
+
+# One alternation over every alias, longest first so "aws lambda" wins over "aws"
+_ALIASES = {alias: skill for skill, (_, aliases) in SKILLS.items() for alias in aliases}
+_SKILL_PATTERN = re.compile(
+    r"(?<![a-z0-9+#])(" + "|".join(re.escape(a) for a in sorted(_ALIASES, key=len, reverse=True)) + r")(?![a-z0-9+#])")
+
+
+def _stem(term: str) -> str:
+    if len(term) > 3 and term.endswith("s") and not term.endswith(("ss", "us")):
+        return term[:-1]
+    return term
+
+
+def extract(text: str) -> Tuple[Counter, Counter]:
+    """Canonical skill counts and remaining content-term counts for a text."""
+    text = text.lower()
+    skills = Counter(_ALIASES[m.group(1)] for m in _SKILL_PATTERN.finditer(text))
+    for skill in list(skills):
+        for implied in IMPLIED_SKILLS.get(skill, ()):
+            skills[implied] = skills[implied] or 1
+    remainder = _SKILL_PATTERN.sub(" ", text)
+    terms = Counter(_stem(t) for t in _TOKEN.findall(remainder) if t not in STOPWORDS and len(t) > 1)
+    return skills, terms
+
+
+def _feature(kind: str, name: str) -> int:
+    return zlib.crc32(f"{kind}:{name}".encode("utf-8")) & ((1 << FEATURE_BITS) - 1)
+
+
+def term_weight(term: str) -> float:
+    return GENERIC_WEIGHT if term in GENERIC_TERMS else 1.0
+
+
+def vectorize(skills: Counter, terms: Counter) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    L2-normalized sparse vector as (sorted feature ids, weights). Weights are
+    sublinear term frequency times the term's prior: the vocabulary weight for
+    skills, a down-weight for generic job-ad words.
+    """
+    features = [(_feature("s", s), (1 + math.log(c)) * SKILLS[s][0]) for s, c in skills.items()]
+    features += [(_feature("t", t), (1 + math.log(c)) * term_weight(t)) for t, c in terms.items()]
+    if not features:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    ids = np.fromiter((f for f, _ in features), dtype=np.int64, count=len(features))
+    weights = np.fromiter((w for _, w in features), dtype=np.float32, count=len(features))
+    ids, inverse = np.unique(ids, return_inverse=True)
+    weights = np.bincount(inverse, weights=weights).astype(np.float32)
+    return ids, weights / np.linalg.norm(weights)
+
+
+def cosine(a: Tuple[np.ndarray, np.ndarray], b: Tuple[np.ndarray, np.ndarray]) -> float:
+    _, ia, ib = np.intersect1d(a[0], b[0], assume_unique=True, return_indices=True)
+    return float(np.dot(a[1][ia], b[1][ib]))
+
+
+class ResumeProfile:
+    """Everything scoring needs from one resume, computed once per resume."""
+
+    def __init__(self, resume_text: str):
+        self.skills, self.terms = extract(resume_text)
+        self.vector = vectorize(self.skills, self.terms)
+
+
+class MatchingEngine:
+    """
+    Deterministic resume/posting matcher.
+
+    Scores combine weighted skill coverage (how much of the posting's skill
+    weight the resume covers) with cosine similarity of the weighted term
+    vectors. Resume profiles are kept in an LRU keyed by content hash, so
+    scoring one resume against many postings only processes the resume once.
+    """
+
+    def __init__(self, max_cached_resumes: int = MAX_CACHED_RESUMES):
+        self.max_cached_resumes = max_cached_resumes
+        self._profiles: "OrderedDict[str, ResumeProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def profile(self, resume_text: str) -> ResumeProfile:
+        key = content_hash(resume_text)
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is not None:
+                self._profiles.move_to_end(key)
+                return profile
+        profile = ResumeProfile(resume_text)
+        with self._lock:
+            self._profiles[key] = profile
+            while len(self._profiles) > self.max_cached_resumes:
+                self._profiles.popitem(last=False)
+        return profile
+
+    def score(self, resume_text: str, job_description: str, requirements: Sequence[str] = ()) -> Dict[str, Any]:
+        resume = self.profile(resume_text)
+        skills, terms = extract(job_description)
+        for line in requirements:
+            line_skills, line_terms = extract(line)
+            # Requirement lines say what actually matters; count them extra
+            skills.update({s: c * REQUIREMENT_BOOST for s, c in line_skills.items()})
+            terms.update({t: c * REQUIREMENT_BOOST for t, c in line_terms.items()})
+        posting = vectorize(skills, terms)
+
+        skill_weights = {s: SKILLS[s][0] for s in skills}
+        matched = sorted((s for s in skill_weights if s in resume.skills), key=lambda s: (-skill_weights[s], s))
+        missing = sorted((s for s in skill_weights if s not in resume.skills), key=lambda s: (-skill_weights[s], s))
+        total = sum(skill_weights.values())
+        coverage = sum(skill_weights[s] for s in matched) / total if total else 0.0
+        similarity = cosine(resume.vector, posting)
+
+        missing_terms = sorted(
+            (t for t in terms if t not in resume.terms and t not in GENERIC_TERMS),
+            key=lambda t: (-terms[t], t))
+        score = 100 * (SKILL_COVERAGE_WEIGHT * coverage + (1 - SKILL_COVERAGE_WEIGHT) * similarity) \
+            if total else 100 * similarity
+        return {
+            "score": round(score, 1),
+            "skill_coverage": round(coverage, 4),
+            "similarity": round(similarity, 4),
+            "matched_skills": matched,
+            "missing_skills": missing,
+            "missing_keywords": missing_terms[:MAX_MISSING_KEYWORDS],
+        }
+
+
+_engine = MatchingEngine()
+
+
+def score(resume_text: str, job_description: str, requirements: Sequence[str] = ()) -> Dict[str, Any]:
+    return _engine.score(resume_text, job_description, requirements)
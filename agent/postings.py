@@ -0,0 +1,321 @@
+import re
+import json
+import time
+import socket
+import logging
+import ipaddress
+import threading
+from html import unescape
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpcore
+import httpx
+from analysis_cache import AnalysisCache, cache_key, get_analysis_cache
+
+logger = logging.getLogger("applyflow-agent")
+
+# Bump when the extraction below changes so cached postings are re-parsed
+PARSER_VERSION = "1"
+POSTING_CACHE_TAG = "posting"
+MAX_POSTING_BYTES = 2 * 1024 * 1024
+# Cached postings younger than this are served without contacting the origin
+FRESH_SECONDS = 3600
+USER_AGENT = "ApplyFlowBot/1.0 (+job posting reader)"
+TRACKING_PARAMS = {"gclid", "fbclid", "mc_cid", "mc_eid", "ref", "referrer", "source", "trk"}
+REQUIREMENT_HEADINGS = re.compile(
+    r"requirement|qualification|what you.?ll need|what we.?re looking for|skills|you have|must have", re.IGNORECASE)
+MAX_REQUIREMENTS = 30
+MAX_DESCRIPTION_CHARS = 20000
+
+
+def normalize_url(url: str) -> str:
+    """Canonical URL for cache keys: lower-cased host, no fragment, default port or tracking params."""
+    parts = urlsplit(url.strip())
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"Unsupported job link: {url}")
+    host = parts.hostname.lower()
+    if parts.port and parts.port != {"http": 80, "https": 443}[parts.scheme]:
+        host = f"{host}:{parts.port}"
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS)
+    return urlunsplit((parts.scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def _is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address)
+    return not (ip.is_private or ip.is_loopback or ip.is_link_local or ip.is_reserved)
+
+
+def _resolve_public_host(host: str, port: int) -> List[Tuple[Any, ...]]:
+    """Resolve `host` once, refusing it if any address is loopback, private, link-local or reserved."""
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        raise httpcore.ConnectError(str(e))
+    for info in infos:
+        if not _is_public_address(info[4][0]):
+            raise ValueError(f"Job link host is not publicly routable: {host}")
+    return [info[4] for info in infos]
+
+
+class _PublicOnlyBackend(httpcore.SyncBackend):
+    """
+    Opens every connection to an address that passed the public-host check.
+    Checking in a request hook and letting the socket resolve the name again
+    leaves a window in which a rebinding DNS server can swap in an internal
+    address; here the checked address is the one connected to, and TLS is
+    still verified against the original host name.
+    """
+
+    def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        error = None
+        for address in _resolve_public_host(host, port):
+            try:
+                return super().connect_tcp(address[0], port, timeout, local_address, socket_options)
+            except httpcore.ConnectError as e:
+                error = e
+        raise error
+
+
+class _PublicOnlyTransport(httpx.HTTPTransport):
+    def __init__(self, limits: httpx.Limits):
+        super().__init__(limits=limits)
+        self._pool = httpcore.ConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            network_backend=_PublicOnlyBackend(),
+        )
+
+
+class _PostingHTMLParser(HTMLParser):
+    """Single pass over the page collecting JSON-LD, meta tags, headings, paragraphs and list items."""
+
+    SKIP = {"script", "style", "noscript", "svg", "nav", "footer", "form"}
+    BLOCKS = {"p", "li", "h1", "h2", "h3", "h4", "div", "section", "br", "td"}
+    VOID = {"br", "hr", "img", "input", "link", "source", "wbr"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.json_ld: List[str] = []
+        self.meta: Dict[str, str] = {}
+        self.title = ""
+        # (tag, text) for headings, paragraphs and list items in document order
+        self.blocks: List[tuple] = []
+        self._stack: List[str] = []
+        self._skip_depth = 0
+        self._in_json_ld = False
+        self._ld_buffer: List[str] = []
+        self._buffer: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "script" and (attrs.get("type") or "").lower() == "application/ld+json":
+            self._in_json_ld = True
+            self._ld_buffer = []
+            return
+        if tag == "meta":
+            name = (attrs.get("property") or attrs.get("name") or "").lower()
+            if name and attrs.get("content"):
+                self.meta[name] = attrs["content"]
+            return
+        if tag in self.SKIP:
+            self._skip_depth += 1
+        if tag in self.BLOCKS:
+            self._flush()
+        if tag not in self.VOID:
+            self._stack.append(tag)
+
+    def handle_endtag(self, tag):
+        if self._in_json_ld and tag == "script":
+            self.json_ld.append("".join(self._ld_buffer))
+            self._in_json_ld = False
+            return
+        if tag in self.BLOCKS:
+            self._flush()
+        if tag in self.SKIP and self._skip_depth:
+            self._skip_depth -= 1
+        if tag in self._stack:
+            while self._stack and self._stack.pop() != tag:
+                pass
+
+    def handle_data(self, data):
+        if self._in_json_ld:
+            self._ld_buffer.append(data)
+        elif self._stack and self._stack[-1] == "title":
+            self.title += data
+        elif not self._skip_depth:
+            self._buffer.append(data)
+
+    def _flush(self):
+        text = re.sub(r"\s+", " ", "".join(self._buffer)).strip()
+        self._buffer = []
+        if text:
+            block = next((t for t in reversed(self._stack) if t in ("h1", "h2", "h3", "h4", "li")), "p")
+            self.blocks.append((block, text))
+
+
+def _parse_html(html: str) -> _PostingHTMLParser:
+    parser = _PostingHTMLParser()
+    parser.feed(html)
+    parser.close()
+    parser._flush()
+    return parser
+
+
+def _strip_html(text: str) -> str:
+    # JSON-LD descriptions are often entity-escaped HTML
+    text = re.sub(r"<\s*(br|/p|/li|/h\d)\s*/?>", "\n", unescape(text or ""), flags=re.IGNORECASE)
+    return re.sub(r"[ \t]+", " ", re.sub(r"<[^>]+>", "", text)).strip()
+
+
+def _job_posting_ld(scripts: List[str]) -> Optional[Dict[str, Any]]:
+    """The first schema.org JobPosting among the page's JSON-LD blocks, if any."""
+    for raw in scripts:
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            continue
+        candidates = data if isinstance(data, list) else data.get("@graph", [data]) if isinstance(data, dict) else []
+        for item in candidates:
+            types = item.get("@type") if isinstance(item, dict) else None
+            if types == "JobPosting" or (isinstance(types, list) and "JobPosting" in types):
+                return item
+    return None
+
+
+def _requirements_from_blocks(blocks: List[tuple]) -> List[str]:
+    requirements, collecting = [], False
+    for tag, text in blocks:
+        if tag.startswith("h") or (tag == "p" and len(text) < 80 and text.endswith(":")):
+            collecting = bool(REQUIREMENT_HEADINGS.search(text))
+        elif collecting and tag == "li":
+            requirements.append(text)
+    return requirements[:MAX_REQUIREMENTS]
+
+
+def parse_posting(html: str, url: str) -> Dict[str, Any]:
+    """Extract title, company, description and requirements, preferring schema.org JobPosting data."""
+    parser = _parse_html(html)
+    ld = _job_posting_ld(parser.json_ld)
+    if ld:
+        org = ld.get("hiringOrganization")
+        description = _strip_html(ld.get("description", ""))
+        listed = ld.get("qualifications") or ld.get("skills") or ld.get("experienceRequirements") or ""
+        requirements = [r for r in (listed if isinstance(listed, list) else _strip_html(listed).split("\n")) if r]
+        if not requirements:
+            requirements = _requirements_from_blocks(_parse_html(unescape(ld.get("description", ""))).blocks)
+        return {
+            "link": url,
+            "job_title": _strip_html(ld.get("title", "")),
+            "company": (org.get("name") if isinstance(org, dict) else org) or parser.meta.get("og:site_name", ""),
+            "description": description[:MAX_DESCRIPTION_CHARS],
+            "requirements": requirements[:MAX_REQUIREMENTS],
+        }
+
+    headings = [text for tag, text in parser.blocks if tag == "h1"]
+    return {
+        "link": url,
+        "job_title": parser.meta.get("og:title") or (headings[0] if headings else parser.title.strip()),
+        "company": parser.meta.get("og:site_name", ""),
+        "description": "\n".join(text for tag, text in parser.blocks if tag in ("p", "li"))[:MAX_DESCRIPTION_CHARS],
+        "requirements": _requirements_from_blocks(parser.blocks),
+    }
+
+
+class PostingFetcher:
+    """
+    Fetches and parses job postings once, then serves them from the analysis
+    cache keyed by normalized URL. Stale entries are revalidated with
+    If-None-Match/If-Modified-Since, so an unchanged posting costs a 304
+    instead of a download and a re-parse.
+    """
+
+    def __init__(self, cache: AnalysisCache, fresh_seconds: float = FRESH_SECONDS,
+                 max_bytes: int = MAX_POSTING_BYTES, allow_private_hosts: bool = False,
+                 client: Optional[httpx.Client] = None):
+        self.cache = cache
+        self.fresh_seconds = fresh_seconds
+        self.max_bytes = max_bytes
+        self.allow_private_hosts = allow_private_hosts
+        limits = httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=30)
+        self.client = client or httpx.Client(
+            timeout=httpx.Timeout(10.0, connect=3.0),
+            limits=limits,
+            # Checked on every new connection, so redirects cannot lead to internal hosts either
+            transport=None if allow_private_hosts else _PublicOnlyTransport(limits),
+            # A proxy from the environment would resolve and connect on our behalf, past the check
+            trust_env=allow_private_hosts,
+            follow_redirects=True,
+            max_redirects=5,
+            headers={"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"},
+        )
+        self._lock = threading.Lock()
+        self.fetches = 0
+        self.revalidated = 0
+
+    def _download(self, url: str, headers: Dict[str, str]) -> Tuple[int, httpx.Headers, str]:
+        """Stream the page, giving up as soon as it exceeds `max_bytes`."""
+        with self.client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304:
+                return 304, response.headers, ""
+            response.raise_for_status()
+            content_type = response.headers.get("content-type", "")
+            if "html" not in content_type:
+                raise ValueError(f"Job link is not an HTML page ({content_type or 'unknown type'})")
+            if int(response.headers.get("content-length") or 0) > self.max_bytes:
+                raise ValueError("Job posting page is too large")
+            body = bytearray()
+            for chunk in response.iter_bytes():
+                body.extend(chunk)
+                if len(body) > self.max_bytes:
+                    raise ValueError("Job posting page is too large")
+            return response.status_code, response.headers, body.decode(response.encoding or "utf-8", errors="replace")
+
+    def fetch(self, url: str) -> Dict[str, Any]:
+        normalized = normalize_url(url)
+        key = cache_key("posting", PARSER_VERSION, normalized)
+        cached = self.cache.get(POSTING_CACHE_TAG, key)
+        if cached and time.time() - cached["fetched_at"] < self.fresh_seconds:
+            return cached["posting"]
+
+        headers = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        status, response_headers, html = self._download(normalized, headers)
+        with self._lock:
+            self.fetches += 1
+            if status == 304:
+                self.revalidated += 1
+        if status == 304 and cached:
+            logger.info(f"Job posting unchanged: {normalized}")
+            posting = cached["posting"]
+        else:
+            posting = parse_posting(html, normalized)
+        self.cache.put(POSTING_CACHE_TAG, key, {
+            "posting": posting,
+            "fetched_at": time.time(),
+            "etag": response_headers.get("etag") or (cached or {}).get("etag"),
+            "last_modified": response_headers.get("last-modified") or (cached or {}).get("last_modified"),
+        })
+        return posting
+
+    def stats(self) -> Dict[str, int]:
+        return {"fetches": self.fetches, "revalidated": self.revalidated}
+
+
+_fetcher: Optional[PostingFetcher] = None
+
+
+def get_posting_fetcher() -> PostingFetcher:
+    """Process-wide fetcher so every session shares one connection pool and posting cache."""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = PostingFetcher(get_analysis_cache())
+    return _fetcher
@@ -0,0 +1,207 @@
+import os
+import re
+import json
+import math
+import logging
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("applyflow-agent")
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+TRAINING_FILE = os.path.join(FIXTURES_DIR, "intents_train.jsonl")
+EVALUATION_FILE = os.path.join(FIXTURES_DIR, "intents_eval.jsonl")
+
+# Intent that means "let the orchestrator LLM decide"
+FALLBACK_INTENT = "orchestrator"
+INTENT_TOOLS = {
+    "analytics": "job_analytics_assistant",
+    "applications": "application_management_assistant",
+    "resume": "resume_assistant",
+}
+# Confidence assigned when exactly one intent's keyword rules fire and the
+# classifier does not strongly disagree
+RULE_CONFIDENCE = 0.9
+
+KEYWORD_RULES: Dict[str, List[str]] = {
+    "analytics": [
+        r"\b(success|response|rejection|interview|conversion)\s+rates?\b",
+        r"\b(stats|statistics|analytics|insights?|trends?|funnel|percentiles?|metrics?)\b",
+        r"\bhow many\b",
+        r"\b(report|breakdown|break down)\b",
+        r"\b(average|median|mean|percentage|share)\b",
+    ],
+    "applications": [
+        r"\b(add|create|log|record|track|save)\b.*\b(application|job|role|entry|position)\b",
+        r"\b(update|change|edit|set|move|mark)\b.*\b(application|status|job)\b",
+        r"\b(delete|remove|archive)\b",
+        r"\b(list|show)\b.*\bapplications\b",
+        r"^\s*i (just )?applied\b",
+    ],
+    "resume": [
+        r"\b(resume|cv|cover letter)\b",
+        r"\b(ats|applicant tracking)\b",
+        r"\b(tailor|bullet points?|keywords?)\b",
+    ],
+}
+# Follow-ups that lean on earlier turns need the orchestrator's context
+REFERENTIAL = re.compile(r"^\s*(do|try|and|also|same|that|it|yes|no|ok)\b|\b(the same|that one|the other one|again)\b",
+                         re.IGNORECASE)
+_COMPILED_RULES = {intent: [re.compile(p, re.IGNORECASE) for p in patterns]
+                   for intent, patterns in KEYWORD_RULES.items()}
+_TOKEN = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text: str) -> List[str]:
+    words = _TOKEN.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def load_examples(path: str) -> List[Tuple[str, str]]:
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [(row["text"], row["intent"]) for row in rows]
+
+
+class NaiveBayesIntentModel:
+    """Multinomial naive Bayes over unigrams and bigrams, trained in-process."""
+
+    def __init__(self, alpha: float = 0.5):
+        self.alpha = alpha
+        self.priors: Dict[str, float] = {}
+        self.likelihoods: Dict[str, Dict[str, float]] = {}
+        self.unseen: Dict[str, float] = {}
+
+    def fit(self, examples: Iterable[Tuple[str, str]]) -> "NaiveBayesIntentModel":
+        counts: Dict[str, Counter] = defaultdict(Counter)
+        docs = Counter()
+        for text, intent in examples:
+            docs[intent] += 1
+            counts[intent].update(tokenize(text))
+        vocabulary = set().union(*counts.values())
+        total_docs = sum(docs.values())
+        for intent, tokens in counts.items():
+            denominator = sum(tokens.values()) + self.alpha * len(vocabulary)
+            self.priors[intent] = math.log(docs[intent] / total_docs)
+            self.likelihoods[intent] = {t: math.log((c + self.alpha) / denominator) for t, c in tokens.items()}
+            self.unseen[intent] = math.log(self.alpha / denominator)
+        return self
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        tokens = tokenize(text)
+        scores = {
+            intent: prior + sum(self.likelihoods[intent].get(t, self.unseen[intent]) for t in tokens)
+            for intent, prior in self.priors.items()
+        }
+        top = max(scores.values())
+        exp = {intent: math.exp(s - top) for intent, s in scores.items()}
+        total = sum(exp.values())
+        return {intent: v / total for intent, v in exp.items()}
+
+
+@dataclass
+class RouteDecision:
+    intent: str
+    confidence: float
+    source: str
+    reason: str = ""
+
+    @property
+    def tool_name(self) -> Optional[str]:
+        return INTENT_TOOLS.get(self.intent)
+
+    @property
+    def is_fast_path(self) -> bool:
+        return self.tool_name is not None
+
+
+class IntentRouter:
+    """
+    Local intent classifier in front of the orchestrator.
+
+    Keyword rules and a naive Bayes model vote on which sub-agent a message
+    is for. A message is dispatched straight to that sub-agent only when the
+    result is unambiguous and at least `threshold` confident; compound
+    requests, follow-ups that refer back to earlier turns, chit-chat and
+    anything uncertain go to the orchestrator LLM as before.
+    """
+
+    def __init__(self, model: NaiveBayesIntentModel, threshold: float = 0.8):
+        self.model = model
+        self.threshold = threshold
+
+    @classmethod
+    def from_fixtures(cls, path: str = TRAINING_FILE, threshold: float = 0.8) -> "IntentRouter":
+        return cls(NaiveBayesIntentModel().fit(load_examples(path)), threshold)
+
+    @staticmethod
+    def rule_intents(text: str) -> List[str]:
+        return [intent for intent, patterns in _COMPILED_RULES.items() if any(p.search(text) for p in patterns)]
+
+    def route(self, text: str) -> RouteDecision:
+        if REFERENTIAL.search(text):
+            return RouteDecision(FALLBACK_INTENT, 1.0, "rules", "refers to earlier turns")
+
+        rules = self.rule_intents(text)
+        if len(rules) > 1:
+            return RouteDecision(FALLBACK_INTENT, 1.0, "rules", f"multiple intents: {', '.join(rules)}")
+
+        proba = self.model.predict_proba(text)
+        predicted, confidence = max(proba.items(), key=lambda kv: kv[1])
+
+        if rules:
+            intent = rules[0]
+            if predicted != intent and confidence >= self.threshold:
+                return RouteDecision(FALLBACK_INTENT, confidence, "model",
+                                     f"rules say {intent}, model says {predicted}")
+            rule_confidence = max(RULE_CONFIDENCE, proba.get(intent, 0.0))
+            if rule_confidence < self.threshold:
+                return RouteDecision(FALLBACK_INTENT, rule_confidence, "rules", f"rules say {intent}, low confidence")
+            return RouteDecision(intent, rule_confidence, "rules")
+
+        if predicted != FALLBACK_INTENT and confidence >= self.threshold:
+            return RouteDecision(predicted, confidence, "model")
+        return RouteDecision(FALLBACK_INTENT, confidence, "model", "low confidence")
+
+
+def evaluate(router: IntentRouter, examples: List[Tuple[str, str]]) -> Dict[str, object]:
+    """
+    Routing quality on labelled examples.
+
+    `accuracy` counts a fallback as correct when the label is the
+    orchestrator; `fast_path_precision` is the share of direct dispatches
+    that went to the right sub-agent, which is what a misroute costs.
+    """
+    correct = dispatched = dispatched_correct = 0
+    confusion: Dict[str, Counter] = defaultdict(Counter)
+    misses = []
+    for text, label in examples:
+        decision = router.route(text)
+        confusion[label][decision.intent] += 1
+        correct += decision.intent == label
+        if decision.is_fast_path:
+            dispatched += 1
+            dispatched_correct += decision.intent == label
+        if decision.intent != label:
+            misses.append({"text": text, "label": label, "routed": decision.intent, "reason": decision.reason})
+    return {
+        "examples": len(examples),
+        "accuracy": round(correct / len(examples), 4) if examples else None,
+        "fast_path_rate": round(dispatched / len(examples), 4) if examples else None,
+        "fast_path_precision": round(dispatched_correct / dispatched, 4) if dispatched else None,
+        "confusion": {label: dict(row) for label, row in confusion.items()},
+        "misses": misses,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Evaluate the intent router against the labelled fixtures")
+    parser.add_argument("--fixtures", default=EVALUATION_FILE)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    args = parser.parse_args()
+
+    report = evaluate(IntentRouter.from_fixtures(threshold=args.threshold), load_examples(args.fixtures))
+    print(json.dumps(report, indent=2))
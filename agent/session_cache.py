@@ -0,0 +1,171 @@
+import time
+import queue
+import logging
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from strands import Agent
+from strands.session.s3_session_manager import S3SessionManager
+
+logger = logging.getLogger("applyflow-agent")
+
+
+class WriteBehindQueue:
+    """
+    Single background writer for session persistence.
+
+    Writes run in submission order, so each session's messages reach storage
+    in the order they were produced. `flush` blocks until a session has no
+    writes outstanding, which callers use before re-reading it from storage.
+    """
+
+    def __init__(self):
+        self._queue: "queue.Queue[Tuple[str, Callable[[], Any]]]" = queue.Queue()
+        self._pending: Dict[str, int] = defaultdict(int)
+        self._drained = threading.Condition()
+        self.failures = 0
+        threading.Thread(target=self._run, name="session-write-behind", daemon=True).start()
+
+    def submit(self, session_id: str, write: Callable[[], Any]) -> None:
+        with self._drained:
+            self._pending[session_id] += 1
+        self._queue.put((session_id, write))
+
+    def _run(self) -> None:
+        while True:
+            session_id, write = self._queue.get()
+            try:
+                write()
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Write-behind persistence failed (session {session_id}): {e}", exc_info=True)
+            finally:
+                with self._drained:
+                    self._pending[session_id] -= 1
+                    if not self._pending[session_id]:
+                        del self._pending[session_id]
+                    self._drained.notify_all()
+
+    def flush(self, session_id: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """Wait for one session's writes (or all writes) to reach storage."""
+        with self._drained:
+            return self._drained.wait_for(
+                lambda: not (self._pending.get(session_id) if session_id else self._pending), timeout)
+
+    @property
+    def pending(self) -> int:
+        with self._drained:
+            return sum(self._pending.values())
+
+
+class WriteBehindS3SessionManager(S3SessionManager):
+    """
+    S3SessionManager whose writes happen off the request path.
+
+    Message and agent-state writes are queued on a WriteBehindQueue instead of
+    blocking the turn; reads still go straight to S3 and only happen when a
+    session is hydrated, after its pending writes have been flushed.
+    """
+
+    def __init__(self, writer: WriteBehindQueue, session_id: str, **kwargs):
+        self._writer = writer
+        self._write_session_id = session_id
+        super().__init__(session_id=session_id, **kwargs)
+
+    def create_message(self, *args, **kwargs) -> None:
+        self._writer.submit(self._write_session_id, lambda: super(WriteBehindS3SessionManager, self)
+                            .create_message(*args, **kwargs))
+
+    def update_message(self, *args, **kwargs) -> None:
+        self._writer.submit(self._write_session_id, lambda: super(WriteBehindS3SessionManager, self)
+                            .update_message(*args, **kwargs))
+
+    def update_agent(self, *args, **kwargs) -> None:
+        self._writer.submit(self._write_session_id, lambda: super(WriteBehindS3SessionManager, self)
+                            .update_agent(*args, **kwargs))
+
+
+class SessionAgentCache:
+    """
+    Bounded LRU of hydrated, live session agents keyed by session_id.
+
+    Entries are evicted least-recently-used first once either the entry cap or
+    the total message cap is exceeded, and lazily expire after `idle_ttl`
+    seconds without a turn.
+    """
+
+    def __init__(self, max_entries: int, idle_ttl: float, max_total_messages: int,
+                 writer: Optional[WriteBehindQueue] = None):
+        self.max_entries = max_entries
+        self.idle_ttl = idle_ttl
+        self.max_total_messages = max_total_messages
+        self.writer = writer
+        self._entries: "OrderedDict[str, Tuple[Agent, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _expire(self, now: float) -> None:
+        while self._entries:
+            session_id, (_, last_used) = next(iter(self._entries.items()))
+            if now - last_used < self.idle_ttl:
+                break
+            del self._entries[session_id]
+            self.expirations += 1
+
+    def _enforce_caps(self) -> None:
+        total_messages = sum(len(agent.messages) for agent, _ in self._entries.values())
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or total_messages > self.max_total_messages):
+            _, (agent, _) = self._entries.popitem(last=False)
+            total_messages -= len(agent.messages)
+            self.evictions += 1
+
+    def get(self, session_id: str, factory: Callable[[], Agent]) -> Agent:
+        """Return the live agent for a session, hydrating it with `factory` on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(session_id)
+            if entry:
+                self.hits += 1
+                self._entries[session_id] = (entry[0], now)
+                self._entries.move_to_end(session_id)
+                return entry[0]
+            self.misses += 1
+
+        if self.writer:
+            # Storage must reflect every earlier turn before we read it back
+            self.writer.flush(session_id)
+        agent = factory()
+
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry:
+                # Another caller hydrated the session meanwhile; keep the agent it may already be using
+                agent = entry[0]
+            self._entries[session_id] = (agent, time.monotonic())
+            self._entries.move_to_end(session_id)
+            self._enforce_caps()
+        return agent
+
+    def peek(self, session_id: str) -> Optional[Agent]:
+        """Return a cached agent without counting a hit or hydrating."""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            return entry[0] if entry else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "pending_writes": self.writer.pending if self.writer else 0,
+                "write_failures": self.writer.failures if self.writer else 0,
+            }
@@ -18,22 +18,60 @@ class Settings(BaseSettings):
     AWS_SECRET_ACCESS_KEY: str
     GOOGLE_API_KEY: str
 
+    # Auth0 settings; /agent verifies the same access tokens as the backend API
+    AUTH0_DOMAIN: str = ""  # e.g. your-tenant.us.auth0.com
+    AUTH0_AUDIENCE: str = ""
+
     # Model Configuration
     GEMINI_MODEL_ID: str = "gemini-2.5-flash-lite"
 
     # Conversation Manager Settings
-    CONVERSATION_WINDOW_SIZE: int = 20
-    SHOULD_TRUNCATE_RESULTS: bool = True
+    CONVERSATION_WINDOW_SIZE: int = 20  # Hard cap on messages kept in context
+    SHOULD_TRUNCATE_RESULTS: bool = True  # Collapse large tool results in older turns
+    CONVERSATION_MAX_PROMPT_TOKENS: int = 12000
+    CONVERSATION_TOOL_RESULT_MAX_TOKENS: int = 800
+    CONVERSATION_PRESERVE_RECENT_MESSAGES: int = 6
+
+    # Intent Router Settings
+    ROUTER_ENABLED: bool = True  # Dispatch confident requests straight to a sub-agent
+    ROUTER_CONFIDENCE_THRESHOLD: float = 0.8
 
     # FastAPI Settings
     API_TITLE: str = "ApplyFlow API"
     API_VERSION: str = "1.0.0"
+    AGENT_MAX_CONCURRENCY: int = 8  # Concurrent agent turns across all sessions
+    SUBAGENT_MAX_PARALLELISM: int = 3  # Concurrent sub-agent delegations on one event loop
 
     # Session Storage Settings
     USE_S3_SESSION_STORAGE: bool = False  # Set to True for production
     S3_SESSION_BUCKET: str = "applyflow-session-storage"
     AWS_REGION: str = "us-east-1"
 
+    # Live Session Cache Settings
+    SESSION_CACHE_MAX_ENTRIES: int = 256
+    SESSION_CACHE_IDLE_TTL_SECONDS: float = 900
+    SESSION_CACHE_MAX_TOTAL_MESSAGES: int = 20000
+
+    # Analysis Cache Settings
+    ANALYSIS_CACHE_BACKEND: str = "sqlite"  # sqlite, dynamodb or none (memory only)
+    ANALYSIS_CACHE_PATH: str = "analysis_cache.sqlite3"
+    ANALYSIS_CACHE_TABLE: str = "analysis_cache"
+    ANALYSIS_CACHE_TTL_SECONDS: float = 7 * 24 * 3600
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 5000
+    ANALYSIS_CACHE_MEMORY_ENTRIES: int = 512
+
+    # Job Posting Settings
+    POSTING_FETCH_CONCURRENCY: int = 8  # Concurrent posting fetches per batch scoring request
+
+    # Embedding Index Settings
+    EMBEDDING_INDEX_DIR: str = "embedding_index"  # One memory-mapped index per user below this directory
+
+    # Application Data Settings
+    APPLICATIONS_TABLE: str = "applications"
+    RESUMES_TABLE: str = "resumes"
+    RESUME_CONTENTS_TABLE: str = "resume_contents"  # Extracted text shared by resumes with the same file hash
+    STATS_TABLE: str = "application_stats"
+
 
 @lru_cache()
 def get_settings() -> Settings:
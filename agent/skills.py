@@ -0,0 +1,140 @@
+"""
+Skills vocabulary for resume/posting matching.
+
+Each canonical skill maps to (weight, aliases). The weight is a fixed
+specificity prior standing in for IDF: niche technical skills say more about
+fit than broad ones like "communication", so they count for more.
+"""
+
+SKILLS = {
+    # Languages
+    "python": (3.0, ["python", "python3"]),
+    "java": (3.0, ["java"]),
+    "javascript": (3.0, ["javascript", "js", "ecmascript"]),
+    "typescript": (3.0, ["typescript", "ts"]),
+    "go": (3.0, ["golang", "go lang"]),
+    "rust": (3.0, ["rust"]),
+    "c++": (3.0, ["c++", "cpp"]),
+    "c#": (3.0, ["c#", "csharp", ".net", "dotnet"]),
+    "ruby": (3.0, ["ruby"]),
+    "php": (3.0, ["php"]),
+    "kotlin": (3.0, ["kotlin"]),
+    "swift": (3.0, ["swift"]),
+    "scala": (3.0, ["scala"]),
+    "r": (2.5, ["r programming", "rstudio"]),
+    "sql": (2.5, ["sql"]),
+    "bash": (2.0, ["bash", "shell scripting"]),
+    # Web and frameworks
+    "react": (3.0, ["react", "react.js", "reactjs"]),
+    "angular": (3.0, ["angular", "angularjs"]),
+    "vue": (3.0, ["vue", "vue.js", "vuejs"]),
+    "nodejs": (3.0, ["node.js", "nodejs"]),
+    "django": (3.0, ["django"]),
+    "flask": (3.0, ["flask"]),
+    "fastapi": (3.0, ["fastapi"]),
+    "spring": (3.0, ["spring boot", "spring framework"]),
+    "rails": (3.0, ["rails", "ruby on rails"]),
+    "graphql": (3.0, ["graphql"]),
+    "rest api": (2.0, ["restful", "rest api", "rest apis"]),
+    "html": (1.5, ["html", "html5"]),
+    "css": (1.5, ["css", "css3", "sass", "tailwind"]),
+    "grpc": (3.0, ["grpc"]),
+    # Cloud and infrastructure
+    "aws": (3.0, ["aws", "amazon web services"]),
+    "gcp": (3.0, ["gcp", "google cloud", "google cloud platform"]),
+    "azure": (3.0, ["azure", "microsoft azure"]),
+    "lambda": (3.0, ["lambda", "lambda functions"]),
+    "dynamodb": (3.0, ["dynamodb", "dynamo db"]),
+    "s3": (2.5, ["s3", "amazon s3"]),
+    "docker": (3.0, ["docker", "containers", "containerization"]),
+    "kubernetes": (3.0, ["kubernetes", "k8s", "eks", "gke"]),
+    "terraform": (3.0, ["terraform"]),
+    "cloudformation": (3.0, ["cloudformation", "aws sam", "cdk"]),
+    "ci/cd": (2.5, ["ci/cd", "cicd", "continuous integration", "continuous delivery", "github actions", "jenkins"]),
+    "linux": (2.0, ["linux", "unix"]),
+    "serverless": (3.0, ["serverless"]),
+    "microservices": (2.5, ["microservices", "microservice", "service oriented architecture"]),
+    "observability": (2.5, ["observability", "monitoring", "prometheus", "grafana", "datadog", "opentelemetry"]),
+    # Data
+    "postgresql": (3.0, ["postgresql", "postgres"]),
+    "mysql": (3.0, ["mysql"]),
+    "mongodb": (3.0, ["mongodb", "mongo"]),
+    "redis": (3.0, ["redis"]),
+    "elasticsearch": (3.0, ["elasticsearch", "opensearch"]),
+    "kafka": (3.0, ["kafka"]),
+    "spark": (3.0, ["spark", "pyspark", "apache spark"]),
+    "airflow": (3.0, ["airflow"]),
+    "snowflake": (3.0, ["snowflake"]),
+    "dbt": (3.0, ["dbt"]),
+    "etl": (2.5, ["etl", "elt", "data pipelines", "data pipeline"]),
+    "data warehousing": (2.5, ["data warehouse", "data warehousing", "redshift", "bigquery"]),
+    "pandas": (3.0, ["pandas"]),
+    "numpy": (3.0, ["numpy"]),
+    "tableau": (3.0, ["tableau"]),
+    "power bi": (3.0, ["power bi", "powerbi"]),
+    "excel": (1.5, ["microsoft excel", "spreadsheets"]),
+    # ML and AI
+    "machine learning": (3.0, ["machine learning", "ml"]),
+    "deep learning": (3.0, ["deep learning", "neural networks"]),
+    "pytorch": (3.0, ["pytorch"]),
+    "tensorflow": (3.0, ["tensorflow", "keras"]),
+    "scikit-learn": (3.0, ["scikit-learn", "sklearn"]),
+    "nlp": (3.0, ["nlp", "natural language processing"]),
+    "computer vision": (3.0, ["computer vision", "opencv"]),
+    "llm": (3.0, ["llm", "llms", "large language models", "generative ai", "genai"]),
+    "statistics": (2.0, ["statistics", "statistical analysis", "a/b testing", "experimentation"]),
+    # Practices
+    "testing": (2.0, ["unit testing", "test automation", "pytest", "jest", "tdd", "integration testing"]),
+    "system design": (2.5, ["system design", "distributed systems", "scalability"]),
+    "security": (2.0, ["security", "oauth", "authentication", "encryption"]),
+    "agile": (1.0, ["agile", "scrum", "kanban"]),
+    "git": (1.0, ["git", "github", "gitlab", "version control"]),
+    "api design": (2.0, ["api design", "openapi", "swagger"]),
+    "performance": (2.0, ["performance tuning", "performance optimization", "profiling", "latency"]),
+    # Product, design and business
+    "product management": (2.5, ["product management", "product manager", "roadmap", "product strategy"]),
+    "figma": (3.0, ["figma", "sketch"]),
+    "ux research": (3.0, ["ux research", "user research", "usability testing"]),
+    "ui design": (2.5, ["ui design", "visual design", "interaction design", "ux design"]),
+    "seo": (3.0, ["seo", "search engine optimization"]),
+    "salesforce": (3.0, ["salesforce", "crm"]),
+    "financial modeling": (3.0, ["financial modeling", "financial modelling", "valuation"]),
+    "project management": (1.5, ["project management", "pmp", "jira"]),
+    # Broad skills
+    "leadership": (1.0, ["leadership", "led a team", "team lead", "people management"]),
+    "mentorship": (1.0, ["mentorship", "mentoring", "mentor", "coaching"]),
+    "communication": (0.5, ["communication", "written communication", "verbal communication"]),
+    "collaboration": (0.5, ["collaboration", "cross-functional", "cross functional", "teamwork"]),
+    "problem solving": (0.5, ["problem solving", "problem-solving", "analytical"]),
+    "stakeholder management": (1.0, ["stakeholder management", "stakeholders"]),
+}
+
+# Skills that imply another: a resume listing DynamoDB has worked with AWS
+IMPLIED_SKILLS = {
+    "lambda": ["aws", "serverless"],
+    "dynamodb": ["aws"],
+    "s3": ["aws"],
+    "cloudformation": ["aws"],
+    "kubernetes": ["docker"],
+    "django": ["python"],
+    "flask": ["python"],
+    "fastapi": ["python"],
+    "pandas": ["python"],
+    "pytorch": ["python", "deep learning"],
+    "tensorflow": ["deep learning"],
+    "react": ["javascript"],
+    "nodejs": ["javascript"],
+    "spring": ["java"],
+    "rails": ["ruby"],
+    "postgresql": ["sql"],
+    "mysql": ["sql"],
+}
+
+# Common job-ad words that carry little signal on their own
+GENERIC_TERMS = frozenset("""
+responsibilities requirements qualifications preferred required plus bonus opportunity opportunities company
+customers customer business teams environment fast-paced paced develop development build building design
+support help ensure deliver delivering solutions solution products product services service tools systems
+high quality best practices new join looking great passionate excellent good understanding familiarity
+proficiency proficient hands-on hands related degree bachelor's bachelors master's field equivalent
+""".split())
@@ -1,24 +1,14 @@
-from typing import Dict, Any
-from strands import Agent, tool
+from typing import Optional, Dict, Any
+from strands import ToolContext, tool
 from strands_tools import http_request
-from strands.models.gemini import GeminiModel
-from strands.models.openai import OpenAIModel
 from settings import get_settings
+from .factory import SubAgentPool, invocation_user_id
+from analytics import get_analytics_engine
+from embeddings import get_embedding_index
 
 settings = get_settings()
 
 
-def get_model():
-    """Initialize and return the Gemini model for the agent."""
-    return OpenAIModel(
-        client_args={
-            "api_key":  settings.OPENAI_API_KEY,
-        },
-        # **model_config
-        model_id="gpt-5-mini",
-    )
-
-
 ANALYTICS_PROMPT = """
 You are a specialized job application analytics and insights assistant.
 Your role is to:
@@ -29,12 +19,15 @@ Your role is to:
 - Generate reports on application status, response times, and conversion rates
 - Analyze which types of jobs, companies, or industries yield better results
 
-Always provide data-backed insights and practical recommendations.
+Use query_database and generate_report to get real numbers for the user's
+applications; never invent figures. Use find_similar_applications to see how
+applications resembling a new posting turned out. Always provide data-backed insights and
+practical recommendations.
 """
 
 
-@tool
-def job_analytics_assistant(query: str) -> str:
+@tool(context=True)
+async def job_analytics_assistant(query: str, tool_context: ToolContext) -> str:
     """
     Analyze job application data and provide insights and recommendations.
 
@@ -46,44 +39,79 @@ def job_analytics_assistant(query: str) -> str:
         Detailed analytics insights with data-driven recommendations
     """
     try:
-        analytics_agent = Agent(
-            model=get_model(),
-            system_prompt=ANALYTICS_PROMPT,
-            tools=[query_database, generate_report]
-        )
-
-        response = analytics_agent(query)
-        return str(response)
+        return await analytics_pool.invoke_async(query, tool_context.invocation_state.get("user_id"))
     except Exception as e:
         return f"Error in job analytics assistant: {str(e)}"
 
 
-@tool
-def query_database(query_string: str) -> Dict[str, Any]:
+@tool(context=True)
+def query_database(metric: str, tool_context: ToolContext, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Compute one analytics metric over the user's real application data.
+
+    Args:
+        metric: One of "funnel" (applied -> interviewing -> offer -> accepted
+                conversion), "response_times" (days until a status change),
+                "pay" (pay percentiles) or "companies" (per-company success rates)
+        filters: Optional {"status": ..., "company": ..., "since": ISO date}
+
+    Returns:
+        The computed metric
     """
-    s querying the database for analytics data.
+    try:
+        return {
+            "metric": metric,
+            "filters": filters or {},
+            "results": get_analytics_engine().metric(invocation_user_id(tool_context), metric, filters),
+        }
+    except (ValueError, PermissionError) as e:
+        return {"error": str(e)}
+
+
+@tool(context=True)
+def generate_report(tool_context: ToolContext, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Generate a full analytics report (funnel, response times, pay and
+    per-company success) over the user's real application data.
+
+    Args:
+        filters: Optional {"status": ..., "company": ..., "since": ISO date}
+
+    Returns:
+        Every metric for the filtered applications
     """
-    print(f": Querying database with: {query_string}")
-    return {
-        "query": query_string,
-        "results": [
-            {"date": "2023-01-01", "applications_count": 10, "status": "Applied"},
-            {"date": "2023-01-01", "applications_count": 5, "status": "Interview"},
-            {"date": "2023-01-02", "applications_count": 8, "status": "Applied"},
-        ],
-    }
-
-
-@tool
-def generate_report(report_type: str, filters: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return get_analytics_engine().report(invocation_user_id(tool_context), filters)
+    except (ValueError, PermissionError) as e:
+        return {"error": str(e)}
+
+
+@tool(context=True)
+def find_similar_applications(job_description: str, tool_context: ToolContext, top_k: int = 5) -> Dict[str, Any]:
     """
-    s generating an analytics report based on specified type and filters.
+    Find the user's past applications most similar to a job posting, with
+    their current status, to judge how similar roles have gone.
+
+    Args:
+        job_description: Title and/or description of the new posting
+        top_k: How many applications to return
+
+    Returns:
+        The closest applications (id, "title at company (status)", similarity)
     """
-    print(
-        f": Generating report of type '{report_type}' with filters: {filters}")
-    return {
-        "report_id": f"-report-{report_type}-456",
-        "type": report_type,
-        "filters": filters,
-        "data_summary": " data summary for the report.",
-    }
+    try:
+        matches = get_embedding_index().search(invocation_user_id(tool_context), job_description,
+                                               kind="application", top_k=top_k)
+    except Exception as e:
+        return {"error": f"Application search failed: {str(e)}"}
+    return {"applications": [{"application_id": m["id"].split("#", 1)[1], "application": m["label"],
+                              "similarity": m["similarity"]} for m in matches]}
+
+
+# Warm instances are reused across delegations; tools are resolved lazily
+# because they are defined below the assistant that uses them.
+analytics_pool = SubAgentPool(
+    name="analytics",
+    system_prompt=ANALYTICS_PROMPT,
+    tools=lambda: [query_database, generate_report, find_similar_applications],
+)
@@ -1,31 +1,12 @@
 from typing import Dict, Any
-from strands import Agent, tool
+from strands import ToolContext, tool
 from strands_tools import http_request
-from strands.models.gemini import GeminiModel
-from strands.models.openai import OpenAIModel
 from settings import get_settings
+from .factory import SubAgentPool
 
 settings = get_settings()
 
 
-def get_model():
-    """Initialize and return the Gemini model for the agent."""
-    # return GeminiModel(
-    #     client_args={
-    #         "api_key": settings.GOOGLE_API_KEY,
-    #     },
-    #     model_id="gemini-2.5-flash-lite",
-    # )
-
-    return OpenAIModel(
-        client_args={
-            "api_key":  settings.OPENAI_API_KEY,
-        },
-        # **model_config
-        model_id="gpt-5-mini",
-    )
-
-
 APPLICATION_MANAGEMENT_PROMPT = """
 You are a specialized application management assistant.
 Your role is to:
@@ -42,8 +23,8 @@ that modify or delete data.
 """
 
 
-@tool
-def application_management_assistant(query: str) -> str:
+@tool(context=True)
+async def application_management_assistant(query: str, tool_context: ToolContext) -> str:
     """
     Handle CRUD operations for job applications including creating, reading,
     updating, and deleting application records.
@@ -55,15 +36,7 @@ def application_management_assistant(query: str) -> str:
         Confirmation of the action taken or the requested application data
     """
     try:
-        management_agent = Agent(
-            model=get_model(),
-            system_prompt=APPLICATION_MANAGEMENT_PROMPT,
-            tools=[create_application, get_application,
-                   update_application, delete_application]
-        )
-
-        response = management_agent(query)
-        return str(response)
+        return await management_pool.invoke_async(query, tool_context.invocation_state.get("user_id"))
     except Exception as e:
         return f"Error in application management assistant: {str(e)}"
 
@@ -132,3 +105,12 @@ def delete_application(user_id: str, application_id: str) -> Dict[str, Any]:
         f": Deleting application {application_id} for user {user_id}"
     )
     return {"id": application_id, "user_id": user_id, "deleted": True}
+
+
+# Warm instances are reused across delegations; tools are resolved lazily
+# because they are defined below the assistant that uses them.
+management_pool = SubAgentPool(
+    name="application_management",
+    system_prompt=APPLICATION_MANAGEMENT_PROMPT,
+    tools=lambda: [create_application, get_application, update_application, delete_application],
+)
@@ -0,0 +1,210 @@
+import queue
+import asyncio
+import logging
+import threading
+import weakref
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Callable, Iterator, List, Optional
+
+import openai
+from strands import Agent, ToolContext
+from strands.agent.state import AgentState
+from strands.models.openai import OpenAIModel
+from strands.telemetry.metrics import EventLoopMetrics
+from strands.tools.executors import ConcurrentToolExecutor
+from settings import get_settings
+
+logger = logging.getLogger("applyflow-agent")
+
+settings = get_settings()
+
+DEFAULT_MODEL_ID = "gpt-5-mini"
+
+# asyncio primitives belong to one event loop; direct tool calls run on their own
+_delegation_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+    weakref.WeakKeyDictionary()
+
+
+class _PersistentHttpxClient(openai.DefaultAsyncHttpxClient):
+    """
+    httpx client that outlives the AsyncOpenAI wrappers built around it.
+
+    AsyncOpenAI closes its http client when its `async with` block exits;
+    this one ignores that so its connection pool and TLS sessions carry over
+    to the next request. `shutdown` closes it for real.
+    """
+
+    async def aclose(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        await super().aclose()
+
+
+class SharedClientOpenAIModel(OpenAIModel):
+    """
+    OpenAIModel whose requests share one long-lived HTTP client.
+
+    strands opens a new AsyncOpenAI client from `client_args` for every
+    request, and with it a new connection pool, TCP connection and TLS
+    handshake. Here `client_args` hands every one of those clients the same
+    httpx client. httpx connections belong to the event loop that opened
+    them, so there is one httpx client per event loop: the server's, plus
+    the loops direct tool calls run on.
+    """
+
+    def __init__(self, client_args: Optional[dict] = None, **model_config: Any):
+        self._http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _PersistentHttpxClient]" = \
+            weakref.WeakKeyDictionary()
+        self._http_clients_lock = threading.Lock()
+        super().__init__(client_args=client_args, **model_config)
+
+    @property
+    def client_args(self) -> dict:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return dict(self._client_args)
+        with self._http_clients_lock:
+            http_client = self._http_clients.get(loop)
+            if http_client is None:
+                http_client = self._http_clients[loop] = _PersistentHttpxClient()
+        return {**self._client_args, "http_client": http_client}
+
+    @client_args.setter
+    def client_args(self, value: dict) -> None:
+        self._client_args = value
+
+    async def aclose(self) -> None:
+        """Close the running event loop's HTTP client, e.g. on shutdown."""
+        with self._http_clients_lock:
+            http_client = self._http_clients.pop(asyncio.get_running_loop(), None)
+        if http_client:
+            await http_client.shutdown()
+
+
+@lru_cache(maxsize=None)
+def get_model(model_id: str = DEFAULT_MODEL_ID) -> OpenAIModel:
+    """
+    Return the shared model for a model id.
+
+    One instance per model id means every agent using it shares the same
+    HTTP client, and so the same connections, instead of opening new ones
+    per delegation.
+    """
+    logger.info(f"Initializing shared model: {model_id}")
+    return SharedClientOpenAIModel(
+        client_args={
+            "api_key": settings.OPENAI_API_KEY,
+        },
+        model_id=model_id,
+    )
+
+
+class SubAgentPool:
+    """
+    Pool of warm, stateless sub-agent instances.
+
+    An Agent holds its conversation, so one instance must never serve two
+    calls at once. Each call checks out its own instance (building one if the
+    pool is empty) and the conversation, state and metrics are reset before
+    the instance goes back, so the next caller starts from a clean slate.
+    """
+
+    def __init__(self, name: str, system_prompt: str, tools: Callable[[], List], model_id: str = DEFAULT_MODEL_ID,
+                 max_idle: int = 8):
+        self.name = name
+        self.system_prompt = system_prompt
+        self.tools = tools
+        self.model_id = model_id
+        self._idle: "queue.LifoQueue[Agent]" = queue.LifoQueue(maxsize=max_idle)
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def _build(self) -> Agent:
+        with self._lock:
+            self.created += 1
+        logger.info(f"Building {self.name} sub-agent instance #{self.created}")
+        return Agent(
+            model=get_model(self.model_id),
+            system_prompt=self.system_prompt,
+            tools=self.tools(),
+        )
+
+    @staticmethod
+    def _reset(agent: Agent) -> None:
+        agent.messages.clear()
+        agent.state = AgentState()
+        agent.event_loop_metrics = EventLoopMetrics()
+
+    @contextmanager
+    def acquire(self) -> Iterator[Agent]:
+        try:
+            agent = self._idle.get_nowait()
+            with self._lock:
+                self.reused += 1
+        except queue.Empty:
+            agent = self._build()
+
+        # An instance that failed mid-call may be in an odd state; only clean
+        # exits (no exception raised at the yield) hand it back
+        yield agent
+        self._reset(agent)
+        try:
+            self._idle.put_nowait(agent)
+        except queue.Full:
+            pass
+
+    def invoke(self, query: str, user_id: Optional[str] = None) -> str:
+        with self.acquire() as agent:
+            return str(agent(query, invocation_state={"user_id": user_id}))
+
+    async def invoke_async(self, query: str, user_id: Optional[str] = None) -> str:
+        """
+        Run one delegation without blocking the event loop, within the
+        sub-agent parallelism cap. The caller's authenticated user id is
+        passed to the sub-agent's tools as invocation state.
+        """
+        async with delegation_slots():
+            with self.acquire() as agent:
+                return str(await agent.invoke_async(query, invocation_state={"user_id": user_id}))
+
+    def stats(self) -> dict:
+        return {"name": self.name, "created": self.created, "reused": self.reused, "idle": self._idle.qsize()}
+
+
+def invocation_user_id(tool_context: ToolContext) -> str:
+    """
+    The authenticated user a tool call runs for. It comes from the request,
+    through invocation state, so a prompt cannot point a tool at another
+    user's data.
+    """
+    user_id = tool_context.invocation_state.get("user_id")
+    if not user_id:
+        raise PermissionError("No authenticated user for this request")
+    return user_id
+
+
+def delegation_slots() -> asyncio.Semaphore:
+    """Caps concurrent sub-agent delegations on the running event loop."""
+    loop = asyncio.get_running_loop()
+    slots = _delegation_slots.get(loop)
+    if slots is None:
+        slots = _delegation_slots[loop] = asyncio.Semaphore(settings.SUBAGENT_MAX_PARALLELISM)
+    return slots
+
+
+class OrderedConcurrentToolExecutor(ConcurrentToolExecutor):
+    """
+    Runs the tool calls of one model response concurrently, then puts their
+    results back in the order the model requested them, so the next prompt
+    (and the stored conversation) does not depend on which tool finished first.
+    """
+
+    async def _execute(self, agent, tool_uses, tool_results, *args: Any, **kwargs: Any) -> AsyncGenerator[Any, None]:
+        async for event in super()._execute(agent, tool_uses, tool_results, *args, **kwargs):
+            yield event
+        order = {tool_use["toolUseId"]: i for i, tool_use in enumerate(tool_uses)}
+        tool_results.sort(key=lambda result: order.get(result["toolUseId"], len(order)))
@@ -1,30 +1,20 @@
-from typing import Dict, Any
-from strands import Agent, tool
+from functools import lru_cache
+from typing import Dict, Any, List
+import boto3
+from boto3.dynamodb.conditions import Key
+from strands import ToolContext, tool
 from strands_tools import http_request
-from strands.models.gemini import GeminiModel
-from strands.models.openai import OpenAIModel
 from settings import get_settings
+from .factory import DEFAULT_MODEL_ID, SubAgentPool, invocation_user_id
+from analysis_cache import cache_key, content_hash, get_analysis_cache
+from postings import get_posting_fetcher
+import matching
+from embeddings import get_embedding_index
+from batch_scoring import rank, score_postings, summarize, unique_links
 
 settings = get_settings()
 
 
-def get_model():
-    """Initialize and return the Gemini model for the agent."""
-    # return GeminiModel(
-    #     client_args={
-    #         "api_key": settings.GOOGLE_API_KEY,
-    #     },
-    #     model_id="gemini-2.5-flash-lite",
-    # )
-    return OpenAIModel(
-        client_args={
-            "api_key":  settings.OPENAI_API_KEY,
-        },
-        # **model_config
-        model_id="gpt-5-mini",
-    )
-
-
 RESUME_PROMPT = """
 You are a specialized resume optimization and career coaching assistant.
 Your role is to:
@@ -37,13 +27,53 @@ Your role is to:
 - Provide insights on ATS (Applicant Tracking System) compatibility
 - Suggest quantifiable achievements and impact statements
 
+analyze_resume and score_job_postings return computed scores and skill gaps;
+base your feedback on those numbers rather than estimating your own.
+
+To work with one of the user's uploaded resumes, load its extracted text with
+get_resume_text (optionally just one section such as experience or skills)
+and pass that text to analyze_resume or score_job_postings.
+
+To decide which of the user's resumes fits a posting, use find_best_resume
+instead of asking for or reading every resume.
+
+When the user gives several job links to compare, call score_job_postings once
+with all of them instead of reading each link separately.
+
 Always provide specific, actionable advice tailored to the user's target role
 and industry.
 """
 
+# Cached answers follow the assistant's prompt and model automatically
+ASSISTANT_VERSION = f"{DEFAULT_MODEL_ID}:{content_hash(RESUME_PROMPT)[:12]}"
 
-@tool
-def resume_assistant(query: str) -> str:
+
+def assistant_cache_tag(user_id: str) -> str:
+    """Tag of a user's cached assistant answers; the resumes service drops it when a resume changes."""
+    return f"resume_assistant#{user_id}"
+
+
+def resume_versions(user_id: str) -> List[str]:
+    """
+    One entry per resume the user has, changing whenever its content, name
+    or status does. Part of every cached answer's key, so an answer is never
+    served once the resumes it could have read have moved on.
+    """
+    params = {"IndexName": "UserIndex", "KeyConditionExpression": Key("user_id").eq(user_id),
+              "ProjectionExpression": "id, content_hash, upload_status, created_at, updated_at"}
+    versions = []
+    while True:
+        response = _table(settings.RESUMES_TABLE).query(**params)
+        versions.extend("|".join(str(r.get(f) or "") for f in ("id", "content_hash", "upload_status",
+                                                                  "created_at", "updated_at"))
+                        for r in response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return sorted(versions)
+        params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+@tool(context=True)
+async def resume_assistant(query: str, tool_context: ToolContext) -> str:
     """
     Provide resume tips, insights, and tailoring recommendations based on
     job descriptions and career goals.
@@ -55,15 +85,16 @@ def resume_assistant(query: str) -> str:
     Returns:
         Detailed resume recommendations and tailoring insights
     """
+    user_id = tool_context.invocation_state.get("user_id")
     try:
-        resume_agent = Agent(
-            model=get_model(),
-            system_prompt=RESUME_PROMPT,
-            tools=[read_job_application_link, analyze_resume]
-        )
-
-        response = resume_agent(query)
-        return str(response)
+        if not user_id:
+            return await resume_pool.invoke_async(query, user_id)
+        # Answers draw on the user's own resumes, so they are cached per user and
+        # keyed on those resumes; the query carries the job description
+        key = cache_key("resume_assistant", ASSISTANT_VERSION, user_id, content_hash(query),
+                        *resume_versions(user_id))
+        return await get_analysis_cache().get_or_compute_async(
+            assistant_cache_tag(user_id), key, lambda: resume_pool.invoke_async(query, user_id))
     except Exception as e:
         return f"Error in resume assistant: {str(e)}"
 
@@ -71,28 +102,139 @@ def resume_assistant(query: str) -> str:
 @tool
 def read_job_application_link(job_link: str) -> Dict[str, Any]:
     """
-    s reading a job application from a given link.
+    Read a job posting from a link and extract its details.
+
+    Args:
+        job_link: URL of the job posting page
+
+    Returns:
+        The posting's link, job_title, company, description and requirements
+    """
+    try:
+        return get_posting_fetcher().fetch(job_link)
+    except Exception as e:
+        return {"link": job_link, "error": f"Could not read job posting: {str(e)}"}
+
+
+@tool
+async def score_job_postings(resume_text: str, job_links: List[str], top_n: int = 5) -> Dict[str, Any]:
     """
-    print(f": Reading job application from link: {job_link}")
+    Score one resume against many job postings at once and rank them.
+
+    Args:
+        resume_text: The resume to score
+        job_links: Up to 50 job posting URLs
+        top_n: How many of the best matches to return in detail
+
+    Returns:
+        The top matches with scores and matched/missing keywords, the
+        remaining postings' scores, and links that could not be read
+    """
+    try:
+        results = [r async for r in score_postings(resume_text, unique_links(job_links))]
+    except ValueError as e:
+        return {"error": str(e)}
+    ranked = rank(results)
     return {
-        "link": job_link,
-        "job_title": " Software Engineer",
-        "company": " Corp",
-        "description": "This is a  job description for a software engineer at  Corp.",
-        "requirements": ["Python", "AWS", "Machine Learning"],
+        "top": [summarize(r) for r in ranked[:top_n]],
+        "others": [{"link": r["link"], "job_title": r["job_title"], "score": r["score"]} for r in ranked[top_n:]],
+        "failed": [{"link": r["link"], "error": r["error"]} for r in results if "error" in r],
     }
 
 
-@tool
-def analyze_resume(resume_text: str, job_description: str) -> Dict[str, Any]:
+@tool(context=True)
+def find_best_resume(job_description: str, tool_context: ToolContext, top_k: int = 3) -> Dict[str, Any]:
+    """
+    Rank the user's uploaded resumes by semantic similarity to a job description.
+
+    Args:
+        job_description: The posting text to match
+        top_k: How many resumes to return
+
+    Returns:
+        The closest resumes (id, file name, similarity between 0 and 1)
     """
-    s analyzing a resume against a job description.
+    try:
+        matches = get_embedding_index().search(invocation_user_id(tool_context), job_description,
+                                               kind="resume", top_k=top_k)
+    except Exception as e:
+        return {"error": f"Resume search failed: {str(e)}"}
+    return {"resumes": [{"resume_id": m["id"].split("#", 1)[1], "file_name": m["label"],
+                         "similarity": m["similarity"]} for m in matches]}
+
+
+@lru_cache(maxsize=None)
+def _table(name: str):
+    return boto3.resource("dynamodb", region_name=settings.AWS_REGION).Table(name)
+
+
+@tool(context=True)
+def get_resume_text(resume_id: str, tool_context: ToolContext, section: str = "") -> Dict[str, Any]:
     """
-    print(": Analyzing resume against job description.")
+    Load the text extracted from one of the user's uploaded resumes.
+
+    Args:
+        resume_id: The resume to load
+        section: Optional section to return instead of the whole text, e.g.
+                 summary, experience, education, skills or projects
+
+    Returns:
+        The resume's file name, text, text stats and the sections found
+    """
+    try:
+        user_id = invocation_user_id(tool_context)
+        resume = _table(settings.RESUMES_TABLE).get_item(Key={"id": resume_id}).get("Item")
+        if resume and resume.get("user_id") == user_id and resume.get("content_hash"):
+            # Resumes with the same file share one extracted-text record
+            content = _table(settings.RESUME_CONTENTS_TABLE).get_item(
+                Key={"user_id": user_id, "sha256": resume["content_hash"]}).get("Item", {})
+            resume.update({k: content[k] for k in ("text", "text_stats", "sections", "extraction_error")
+                           if k in content})
+    except Exception as e:
+        return {"error": f"Could not load resume: {str(e)}"}
+    if not resume or resume.get("user_id") != user_id:
+        return {"error": "Resume not found"}
+    if resume.get("upload_status") != "completed" or "text" not in resume:
+        return {"error": resume.get("extraction_error") or "Resume text is not available yet"}
+    text = resume["text"]
+    sections = resume.get("sections", [])
+    if section:
+        spans = [s for s in sections if s["name"] == section.lower()]
+        if not spans:
+            return {"error": f"No {section} section found",
+                    "sections": [s["name"] for s in sections]}
+        text = "\n".join(text[int(s["offset"]):int(s["offset"]) + int(s["length"])] for s in spans)
     return {
-        "resume_analysis": {
-            "score": 85,
-            "feedback": "Resume is well-aligned with the job description. Consider adding more quantifiable achievements.",
-            "missing_keywords": ["Leadership", "Mentorship"],
-        },
+        "file_name": resume.get("file_name"),
+        "text": text,
+        "text_stats": {k: int(v) if k != "truncated" else bool(v)
+                       for k, v in resume.get("text_stats", {}).items()},
+        "sections": [s["name"] for s in sections],
     }
+
+
+@tool
+def analyze_resume(resume_text: str, job_description: str) -> Dict[str, Any]:
+    """
+    Score a resume against a job description with the local matching engine.
+
+    Args:
+        resume_text: The resume to analyze
+        job_description: The job description to match against
+
+    Returns:
+        A 0-100 score, skill coverage, text similarity, matched and missing
+        skills, and posting keywords the resume does not mention
+    """
+    # Not cached: scoring in process is cheaper than a cache lookup
+    return {"resume_analysis": matching.score(resume_text, job_description)}
+
+
+# Warm instances are reused across delegations; tools are resolved lazily
+# because they are defined below the assistant that uses them.
+resume_pool = SubAgentPool(
+    name="resume",
+    system_prompt=RESUME_PROMPT,
+    tools=lambda: [read_job_application_link, score_job_postings, find_best_resume, get_resume_text,
+                   analyze_resume],
+)
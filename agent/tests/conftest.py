@@ -0,0 +1,18 @@
+"""
+Shared setup for the agent tests. Nothing here reaches a model provider or AWS:
+
+    uv run --group dev pytest tests
+"""
+import os
+import sys
+
+AGENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, AGENT_DIR)
+
+# Settings and SDK clients are built at import time and only need to be present
+for name in ("OPENAI_API_KEY", "GOOGLE_API_KEY", "AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"):
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("ANALYSIS_CACHE_BACKEND", "none")
+os.environ.setdefault("AUTH0_DOMAIN", "applyflow-test.auth0.com")
+os.environ.setdefault("AUTH0_AUDIENCE", "https://api.applyflow.test")
@@ -0,0 +1,78 @@
+import time
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from analytics import AnalyticsEngine, _epoch
+
+USER_ID = "auth0|analytics-user"
+
+
+@pytest.fixture
+def engine():
+    with mock_aws():
+        client = boto3.client("dynamodb")
+        client.create_table(
+            TableName="applications",
+            AttributeDefinitions=[{"AttributeName": k, "AttributeType": "S"} for k in ("id", "user_id")],
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            GlobalSecondaryIndexes=[{
+                "IndexName": "UserIndex",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            }],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        client.create_table(
+            TableName="application_stats",
+            AttributeDefinitions=[{"AttributeName": k, "AttributeType": "S"} for k in ("user_id", "sk")],
+            KeySchema=[{"AttributeName": "user_id", "KeyType": "HASH"}, {"AttributeName": "sk", "KeyType": "RANGE"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        yield AnalyticsEngine("applications", "application_stats")
+
+
+def put(engine, app_id, status, created_at="2025-01-01T00:00:00", updated_at="2025-01-03T00:00:00"):
+    engine.applications.put_item(Item={"id": app_id, "user_id": USER_ID, "company": "Initech", "status": status,
+                                       "created_at": created_at, "updated_at": updated_at})
+
+
+def test_report_reads_the_data_once(engine, monkeypatch):
+    put(engine, "a1", "applied")
+    put(engine, "a2", "offer")
+    engine.stats.put_item(Item={"user_id": USER_ID, "sk": "summary", "updated_at": "2025-01-03T00:00:00"})
+    reads = []
+    for table in (engine.applications, engine.stats):
+        for name in ("get_item", "query"):
+            call = getattr(table, name)
+            monkeypatch.setattr(table, name, lambda call=call, name=name, **params: reads.append(name) or call(**params))
+
+    report = engine.report(USER_ID)
+
+    assert reads == ["get_item", "query"]
+    assert report["total_applications"] == 2
+    assert report["funnel"]["reached"] == {"applied": 2, "interviewing": 1, "offer": 1, "accepted": 0}
+
+
+def test_unknown_statuses_are_left_out(engine):
+    put(engine, "a1", "applied")
+    put(engine, "a2", "withdrawn")
+    put(engine, "a3", "ghosted")
+
+    report = engine.report(USER_ID)
+
+    assert report["total_applications"] == 1
+    assert report["funnel"]["by_status"]["applied"] == 1
+    assert report["companies"][0]["applications"] == 1
+
+
+def test_stored_timestamps_are_read_as_utc(monkeypatch):
+    monkeypatch.setenv("TZ", "America/Los_Angeles")
+    time.tzset()
+    try:
+        assert _epoch("2025-01-01T00:00:00") == 1735689600.0
+        assert _epoch("2025-01-01T01:00:00+01:00") == 1735689600.0
+    finally:
+        monkeypatch.undo()
+        time.tzset()
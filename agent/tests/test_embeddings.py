@@ -0,0 +1,134 @@
+import os
+
+import boto3
+import pytest
+from moto import mock_aws
+
+import embeddings
+from embeddings import EmbeddingIndexManager
+
+USER_ID = "auth0|embed-user"
+
+
+def create_table(name, keys, user_index=True):
+    attributes = dict(keys, user_id="S")
+    params = {
+        "TableName": name,
+        "AttributeDefinitions": [{"AttributeName": k, "AttributeType": t} for k, t in attributes.items()],
+        "KeySchema": [{"AttributeName": k, "KeyType": kind} for k, kind in zip(keys, ("HASH", "RANGE"))],
+        "BillingMode": "PAY_PER_REQUEST",
+    }
+    if user_index:
+        params["GlobalSecondaryIndexes"] = [{
+            "IndexName": "UserIndex",
+            "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+            "Projection": {"ProjectionType": "ALL"},
+        }]
+    boto3.client("dynamodb").create_table(**params)
+    return boto3.resource("dynamodb").Table(name)
+
+
+@pytest.fixture
+def tables():
+    with mock_aws():
+        yield {
+            "resumes": create_table("resumes", {"id": "S"}),
+            "resume_contents": create_table("resume_contents", {"user_id": "S", "sha256": "S"}, user_index=False),
+            "applications": create_table("applications", {"id": "S"}),
+        }
+
+
+@pytest.fixture
+def manager(tables, tmp_path):
+    return EmbeddingIndexManager(str(tmp_path), "resumes", "resume_contents", "applications")
+
+
+@pytest.fixture
+def embedded(monkeypatch):
+    calls = []
+    embed = embeddings.embed
+    monkeypatch.setattr(embeddings, "embed", lambda text: calls.append(text) or embed(text))
+    return calls
+
+
+def put_application(tables, app_id, title, written, status="applied", user_id=USER_ID):
+    tables["applications"].put_item(Item={
+        "id": app_id, "user_id": user_id, "job_title": title, "company": "Initech",
+        "status": status, "created_at": "2025-01-01T00:00:00", "updated_at": written})
+
+
+def test_user_ids_that_sanitize_alike_get_separate_indexes(manager):
+    first, second = manager.index("auth0|x"), manager.index("auth0_x")
+
+    assert first.directory != second.directory
+    assert os.path.basename(first.directory).isalnum()
+
+
+def test_first_sync_indexes_everything(tables, manager):
+    put_application(tables, "a1", "Python Engineer", "2025-01-01T00:00:00")
+    tables["resume_contents"].put_item(Item={"user_id": USER_ID, "sha256": "abc", "text": "Python AWS DynamoDB"})
+    tables["resumes"].put_item(Item={"id": "r1", "user_id": USER_ID, "file_name": "cv.pdf", "content_hash": "abc",
+                                     "upload_status": "completed", "created_at": "2025-01-02T00:00:00"})
+    tables["resumes"].put_item(Item={"id": "r2", "user_id": USER_ID, "file_name": "draft.pdf",
+                                     "upload_status": "pending", "created_at": "2025-01-03T00:00:00"})
+
+    index = manager.sync(USER_ID)
+
+    assert set(index.versions()) == {"application#a1", "resume#r1"}
+    assert index.manifest["cursor"] == "2025-01-03T00:00:00"
+
+
+def test_incremental_sync_only_embeds_changes(tables, manager, embedded):
+    put_application(tables, "a1", "Python Engineer", "2025-01-01T00:00:00")
+    put_application(tables, "a2", "Data Analyst", "2025-01-01T00:00:00")
+    manager.sync(USER_ID)
+    embedded.clear()
+
+    put_application(tables, "a2", "Data Analyst", "2025-02-01T00:00:00", status="interviewing")
+    put_application(tables, "a3", "Frontend Developer", "2025-02-01T00:00:00")
+    index = manager.sync(USER_ID, force=True)
+
+    assert sorted(embedded) == ["Data Analyst Initech ", "Frontend Developer Initech "]
+    assert index.manifest["items"]["application#a2"]["label"] == "Data Analyst at Initech (interviewing)"
+    assert index.manifest["cursor"] == "2025-02-01T00:00:00"
+
+
+def test_writes_just_behind_the_cursor_are_picked_up(tables, manager):
+    put_application(tables, "a1", "Python Engineer", "2025-01-01T00:10:00")
+    manager.sync(USER_ID)
+
+    # Stamped by a slower clock after the last sync had already read a newer write
+    put_application(tables, "a2", "Data Analyst", "2025-01-01T00:08:00")
+    index = manager.sync(USER_ID, force=True)
+
+    assert "application#a2" in index.versions()
+
+
+def test_deletes_are_dropped_on_reconcile(tables, manager):
+    put_application(tables, "a1", "Python Engineer", "2025-01-01T00:00:00")
+    put_application(tables, "a2", "Data Analyst", "2025-01-01T00:00:00")
+    manager.sync(USER_ID)
+
+    tables["applications"].delete_item(Key={"id": "a2"})
+    assert "application#a2" in manager.sync(USER_ID, force=True).versions()
+
+    manager.reconcile_interval = 0
+    assert set(manager.sync(USER_ID, force=True).versions()) == {"application#a1"}
+
+
+def test_resume_that_stops_being_completed_is_removed(tables, manager):
+    tables["resumes"].put_item(Item={"id": "r1", "user_id": USER_ID, "file_name": "cv.pdf", "text": "Python",
+                                     "upload_status": "completed", "created_at": "2025-01-01T00:00:00"})
+    manager.sync(USER_ID)
+
+    tables["resumes"].update_item(Key={"id": "r1"}, UpdateExpression="SET upload_status = :s, updated_at = :u",
+                                  ExpressionAttributeValues={":s": "failed", ":u": "2025-02-01T00:00:00"})
+
+    assert manager.sync(USER_ID, force=True).versions() == {}
+
+
+def test_other_users_records_are_not_indexed(tables, manager):
+    put_application(tables, "a1", "Python Engineer", "2025-01-01T00:00:00")
+    put_application(tables, "b1", "Data Analyst", "2025-01-01T00:00:00", user_id="auth0_embed-user")
+
+    assert set(manager.sync(USER_ID).versions()) == {"application#a1"}
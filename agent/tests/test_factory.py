@@ -0,0 +1,89 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from strands import Agent
+
+from subagents.factory import SharedClientOpenAIModel, SubAgentPool
+
+
+def chunk(**choice):
+    body = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": 0, "model": "gpt-5-mini",
+            "choices": [{"index": 0, **choice}]}
+    return f"data: {json.dumps(body)}\n\n".encode("utf-8")
+
+
+COMPLETION = chunk(delta={"role": "assistant", "content": "Hello"}, finish_reason=None) + \
+    chunk(delta={}, finish_reason="stop") + b"data: [DONE]\n\n"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(COMPLETION)))
+        self.end_headers()
+        self.wfile.write(COMPLETION)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.connections = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def model(server):
+    return SharedClientOpenAIModel(client_args={"api_key": "test",
+                                                "base_url": f"http://127.0.0.1:{server.server_port}/v1"},
+                                   model_id="gpt-5-mini")
+
+
+def test_requests_on_one_loop_share_a_connection(server, model):
+    async def delegations():
+        agent = Agent(model=model, callback_handler=None)
+        answers = [str(await agent.invoke_async("hi")).strip() for _ in range(3)]
+        await model.aclose()
+        return answers
+
+    assert asyncio.run(delegations()) == ["Hello"] * 3
+    assert server.connections == 1
+
+
+def test_each_event_loop_gets_its_own_client(model):
+    async def http_client():
+        return model.client_args["http_client"]
+
+    first, second = asyncio.run(http_client()), asyncio.run(http_client())
+
+    assert first is not second
+    assert "http_client" not in model.client_args
+
+
+def test_failed_call_drops_the_pooled_instance():
+    pool = SubAgentPool(name="test", system_prompt="", tools=list)
+
+    with pytest.raises(RuntimeError):
+        with pool.acquire():
+            raise RuntimeError("model error")
+    with pool.acquire():
+        pass
+
+    assert pool.stats()["idle"] == 1
+    assert pool.created == 2
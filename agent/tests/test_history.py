@@ -0,0 +1,57 @@
+import json
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from history import ConversationHistoryReader, _message_dir
+
+BUCKET = "applyflow-sessions"
+SESSION_ID = "session-1"
+MESSAGES = 120
+
+
+@pytest.fixture
+def reader():
+    with mock_aws():
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket=BUCKET)
+        directory = _message_dir(SESSION_ID, "default")
+        for i in range(MESSAGES):
+            # Every tenth message is a tool call with nothing for the chat UI to show
+            content = [{"toolUse": {"name": "lookup"}}] if i % 10 == 9 else [{"text": f"message {i}"}]
+            s3.put_object(Bucket=BUCKET, Key=f"sessions/{directory}message_{i}.json",
+                          Body=json.dumps({"message": {"role": "user", "content": content}, "message_id": i}))
+        yield ConversationHistoryReader(use_s3=True, bucket=BUCKET, prefix="sessions/", region_name="us-east-1")
+
+
+@pytest.fixture
+def listings(reader):
+    calls = []
+    reader._s3.meta.events.register("before-call.s3.ListObjectsV2", lambda **kwargs: calls.append(kwargs))
+    return calls
+
+
+def test_pages_walk_back_through_the_session(reader, listings):
+    pages = [reader.page(SESSION_ID, limit=50)]
+    while pages[-1]["next_before"] is not None:
+        pages.append(reader.page(SESSION_ID, before=pages[-1]["next_before"], limit=50))
+
+    assert [page["next_before"] for page in pages] == [70, 20, None]
+    indices = [m["index"] for page in reversed(pages) for m in page["messages"]]
+    assert indices == [i for i in range(MESSAGES) if i % 10 != 9]
+    # Only the first page lists the session to find the newest message
+    assert len(listings) == 1
+
+
+def test_page_before_the_newest_message_does_not_list(reader, listings):
+    page = reader.page(SESSION_ID, before=5, limit=50)
+
+    assert [m["content"] for m in page["messages"]] == [f"message {i}" for i in range(5)]
+    assert page["next_before"] is None
+    assert listings == []
+
+
+def test_missing_session_is_empty(reader):
+    assert reader.page("no-such-session") == {"messages": [], "next_before": None}
+    assert reader.page("no-such-session", before=10) == {"messages": [], "next_before": None}
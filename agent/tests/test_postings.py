@@ -0,0 +1,223 @@
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+import postings
+from analysis_cache import AnalysisCache
+from postings import PostingFetcher, normalize_url, parse_posting
+
+POSTING = b"""<html><head><title>Careers | Initech</title>
+<meta property="og:site_name" content="Initech"></head><body>
+<nav><a href="/">Home</a></nav>
+<h1>Senior Backend Engineer</h1>
+<p>Initech is hiring a backend engineer to build our billing platform.</p>
+<h2>Requirements</h2><ul><li>5+ years of Python</li><li>AWS and DynamoDB</li></ul>
+<h2>Benefits</h2><ul><li>Remote friendly</li></ul>
+</body></html>"""
+ETAG = '"posting-v1"'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+        if self.path.startswith("/redirect"):
+            self.send_response(302)
+            self.send_header("Location", f"http://127.0.0.1:{self.server.server_port}/jobs/1")
+            self.end_headers()
+            return
+        if self.path.startswith("/pdf"):
+            body, content_type = b"%PDF-1.7", "application/pdf"
+        elif self.path.startswith("/huge"):
+            body, content_type = b"<html>" + b"x" * (64 * 1024), "text/html"
+        elif self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.end_headers()
+            return
+        else:
+            body, content_type = POSTING, "text/html; charset=utf-8"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("ETag", ETAG)
+        if not self.path.startswith("/huge"):
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def base(server):
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def fetcher(**kwargs):
+    kwargs.setdefault("allow_private_hosts", True)
+    return PostingFetcher(AnalysisCache(None, ttl=3600), **kwargs)
+
+
+def test_parses_html_posting(base):
+    posting = fetcher().fetch(f"{base}/jobs/1?utm_source=mail")
+
+    assert posting == {
+        "link": f"{base}/jobs/1",
+        "job_title": "Senior Backend Engineer",
+        "company": "Initech",
+        "description": "Initech is hiring a backend engineer to build our billing platform.\n"
+                       "5+ years of Python\nAWS and DynamoDB\nRemote friendly",
+        "requirements": ["5+ years of Python", "AWS and DynamoDB"],
+    }
+
+
+def test_prefers_json_ld_job_posting():
+    ld = {"@context": "https://schema.org", "@type": "JobPosting", "title": "Data Engineer",
+          "hiringOrganization": {"@type": "Organization", "name": "Globex"},
+          "description": "&lt;p&gt;Build pipelines.&lt;/p&gt;&lt;h3&gt;Qualifications&lt;/h3&gt;"
+                         "&lt;ul&gt;&lt;li&gt;Spark&lt;/li&gt;&lt;li&gt;SQL&lt;/li&gt;&lt;/ul&gt;"}
+    html = f'<html><script type="application/ld+json">{json.dumps(ld)}</script><h1>Ignored</h1></html>'
+
+    posting = parse_posting(html, "https://jobs.example.com/1")
+
+    assert posting["job_title"] == "Data Engineer"
+    assert posting["company"] == "Globex"
+    assert posting["requirements"] == ["Spark", "SQL"]
+
+
+def test_fresh_posting_is_served_from_cache(server, base):
+    reader = fetcher()
+    first = reader.fetch(f"{base}/jobs/1")
+
+    assert reader.fetch(f"{base}/jobs/1?utm_campaign=x#apply") == first
+    assert len(server.requests) == 1
+    assert reader.stats() == {"fetches": 1, "revalidated": 0}
+
+
+def test_stale_posting_is_revalidated_with_etag(server, base):
+    reader = fetcher(fresh_seconds=0)
+    first = reader.fetch(f"{base}/jobs/1")
+
+    assert reader.fetch(f"{base}/jobs/1") == first
+    assert server.requests[1][1].get("If-None-Match") == ETAG
+    assert reader.stats() == {"fetches": 2, "revalidated": 1}
+
+
+def test_oversized_page_is_rejected(base):
+    with pytest.raises(ValueError, match="too large"):
+        fetcher(max_bytes=16 * 1024).fetch(f"{base}/huge")
+
+
+def test_declared_content_length_over_limit_is_rejected(base):
+    with pytest.raises(ValueError, match="too large"):
+        fetcher(max_bytes=64).fetch(f"{base}/jobs/1")
+
+
+def test_non_html_is_rejected(base):
+    with pytest.raises(ValueError, match="not an HTML page"):
+        fetcher().fetch(f"{base}/pdf")
+
+
+def test_private_hosts_are_rejected(server, base):
+    with pytest.raises(ValueError, match="not publicly routable"):
+        fetcher(allow_private_hosts=False).fetch(f"{base}/jobs/1")
+    assert server.requests == []
+
+
+def test_redirect_to_private_host_is_rejected(server, monkeypatch):
+    # public.test stands in for an internet host that redirects to an internal address
+    resolve = postings._resolve_public_host
+    monkeypatch.setattr(postings, "_resolve_public_host", lambda host, port: (
+        [("127.0.0.1", port)] if host == "public.test" else resolve(host, port)))
+
+    with pytest.raises(ValueError, match="not publicly routable"):
+        fetcher(allow_private_hosts=False).fetch(f"http://public.test:{server.server_port}/redirect")
+    assert [path for path, _ in server.requests] == ["/redirect"]
+
+
+def test_connection_goes_to_the_checked_address(server, monkeypatch):
+    # rebind.test answers with a "public" address when checked and the internal server's address after
+    lookups = []
+    resolve = socket.getaddrinfo
+
+    def rebinding_getaddrinfo(host, *args, **kwargs):
+        if host == "rebind.test":
+            lookups.append(host)
+            host = "127.0.0.2" if len(lookups) == 1 else "127.0.0.1"
+        return resolve(host, *args, **kwargs)
+
+    monkeypatch.setattr(socket, "getaddrinfo", rebinding_getaddrinfo)
+    monkeypatch.setattr(postings, "_is_public_address", lambda address: address == "127.0.0.2")
+
+    # The stub listens on 127.0.0.1 only, so connecting to the checked address is refused
+    with pytest.raises(httpx.ConnectError):
+        fetcher(allow_private_hosts=False).fetch(f"http://rebind.test:{server.server_port}/jobs/1")
+    assert lookups == ["rebind.test"]
+    assert server.requests == []
+
+
+@pytest.mark.parametrize("url", ["ftp://example.com/job", "file:///etc/passwd", "not a url"])
+def test_unsupported_links_are_rejected(url):
+    with pytest.raises(ValueError, match="Unsupported job link"):
+        normalize_url(url)
+
+
+
+@pytest.fixture
+def delegations(monkeypatch):
+    import main
+
+    async def score_postings(resume_text, links):
+        for index, link in enumerate(links):
+            yield {"index": index, "link": link, "job_title": "Backend Engineer", "company": "Initech",
+                   "score": 80, "skill_coverage": 0.8, "similarity": 0.5, "matched_skills": ["python"],
+                   "missing_skills": [], "missing_keywords": []}
+
+    calls = []
+
+    async def invoke_async(query, user_id=None):
+        calls.append(user_id)
+        return "Lead with your Python work."
+
+    monkeypatch.setattr(main, "score_postings", score_postings)
+    monkeypatch.setattr(main.resume_pool, "invoke_async", invoke_async)
+    yield calls
+    main.app.dependency_overrides.clear()
+
+
+def score_request(user_id=None):
+    import main
+    from auth import authenticated_user_id
+    from fastapi.testclient import TestClient
+
+    if user_id:
+        main.app.dependency_overrides[authenticated_user_id] = lambda: user_id
+    return TestClient(main.app).post(
+        "/postings/score", json={"resume_text": "Python", "job_links": ["https://a.example/1"]})
+
+
+def test_scoring_endpoint_requires_a_bearer_token(delegations):
+    assert score_request().status_code == 401
+    assert delegations == []
+
+
+def test_scoring_feedback_runs_for_the_caller(delegations):
+    response = score_request("auth0|scorer")
+
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [e["type"] for e in events] == ["posting", "ranking", "feedback"]
+    assert delegations == ["auth0|scorer"]
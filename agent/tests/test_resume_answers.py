@@ -0,0 +1,97 @@
+import asyncio
+from types import SimpleNamespace
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from analysis_cache import AnalysisCache
+from subagents import resume_agent
+
+QUERY = "Tailor my resume to this posting: Senior Python engineer, AWS, DynamoDB"
+
+
+@pytest.fixture
+def resumes():
+    with mock_aws():
+        boto3.client("dynamodb").create_table(
+            TableName="resumes",
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"},
+                                  {"AttributeName": "user_id", "AttributeType": "S"}],
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            GlobalSecondaryIndexes=[{
+                "IndexName": "UserIndex",
+                "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}],
+                "Projection": {"ProjectionType": "ALL"},
+            }],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        resume_agent._table.cache_clear()
+        yield boto3.resource("dynamodb").Table("resumes")
+        resume_agent._table.cache_clear()
+
+
+@pytest.fixture
+def delegations(monkeypatch):
+    calls = []
+
+    async def invoke_async(query, user_id=None):
+        calls.append(user_id)
+        return f"Answer {len(calls)} for {user_id}"
+
+    cache = AnalysisCache(None, ttl=3600)
+    monkeypatch.setattr(resume_agent.resume_pool, "invoke_async", invoke_async)
+    monkeypatch.setattr(resume_agent, "get_analysis_cache", lambda: cache)
+    return calls
+
+
+def ask(user_id, query=QUERY):
+    context = SimpleNamespace(invocation_state={"user_id": user_id})
+    return asyncio.run(resume_agent.resume_assistant._tool_func(query=query, tool_context=context))
+
+
+def put_resume(table, user_id, content_hash, updated_at="2025-01-01T00:00:00"):
+    table.put_item(Item={"id": f"{user_id}-resume", "user_id": user_id, "content_hash": content_hash,
+                         "upload_status": "completed", "created_at": "2025-01-01T00:00:00",
+                         "updated_at": updated_at})
+
+
+def test_repeated_request_is_answered_from_the_cache(resumes, delegations):
+    put_resume(resumes, "auth0|alice", "hash-1")
+
+    assert ask("auth0|alice") == ask("auth0|alice") == "Answer 1 for auth0|alice"
+    assert delegations == ["auth0|alice"]
+
+
+def test_answers_are_not_shared_between_users(resumes, delegations):
+    put_resume(resumes, "auth0|alice", "hash-1")
+    put_resume(resumes, "auth0|bob", "hash-1")
+
+    assert ask("auth0|alice") == "Answer 1 for auth0|alice"
+    assert ask("auth0|bob") == "Answer 2 for auth0|bob"
+
+
+def test_replaced_resume_misses(resumes, delegations):
+    put_resume(resumes, "auth0|alice", "hash-1")
+    ask("auth0|alice")
+
+    put_resume(resumes, "auth0|alice", "hash-2", updated_at="2025-02-01T00:00:00")
+
+    assert ask("auth0|alice") == "Answer 2 for auth0|alice"
+
+
+def test_different_job_description_misses(resumes, delegations):
+    put_resume(resumes, "auth0|alice", "hash-1")
+    ask("auth0|alice")
+
+    assert ask("auth0|alice", "Tailor my resume to this posting: Frontend engineer, React") == \
+        "Answer 2 for auth0|alice"
+
+
+def test_invalidating_the_users_tag_drops_their_answers(resumes, delegations):
+    put_resume(resumes, "auth0|alice", "hash-1")
+    ask("auth0|alice")
+
+    resume_agent.get_analysis_cache().invalidate(resume_agent.assistant_cache_tag("auth0|alice"))
+
+    assert ask("auth0|alice") == "Answer 2 for auth0|alice"
@@ -0,0 +1,58 @@
+import pytest
+
+from router import EVALUATION_FILE, FALLBACK_INTENT, TRAINING_FILE, IntentRouter, evaluate, load_examples
+
+# Floors for the held-out set. A misroute sends the user to the wrong
+# sub-agent, so fast-path precision is held higher than overall accuracy.
+MIN_ACCURACY = 0.9
+MIN_FAST_PATH_PRECISION = 0.95
+# Precision alone is met by never dispatching; keep the fast path worth having
+MIN_FAST_PATH_RATE = 0.6
+
+
+@pytest.fixture(scope="module")
+def router():
+    return IntentRouter.from_fixtures()
+
+
+@pytest.fixture(scope="module")
+def report(router):
+    return evaluate(router, load_examples(EVALUATION_FILE))
+
+
+def test_evaluation_set_is_held_out():
+    training = {text.lower() for text, _ in load_examples(TRAINING_FILE)}
+    assert not [text for text, _ in load_examples(EVALUATION_FILE) if text.lower() in training]
+
+
+def test_accuracy_on_labelled_set(report):
+    assert report["accuracy"] >= MIN_ACCURACY, report["misses"]
+
+
+def test_fast_path_precision_on_labelled_set(report):
+    assert report["fast_path_precision"] >= MIN_FAST_PATH_PRECISION, report["misses"]
+    assert report["fast_path_rate"] >= MIN_FAST_PATH_RATE
+
+
+@pytest.mark.parametrize("text", [
+    "Do the same for my other resume",
+    "Try that one again",
+    "How many applications are pending and tailor my resume for the Acme role",
+])
+def test_follow_ups_and_compound_requests_go_to_the_orchestrator(router, text):
+    assert router.route(text).intent == FALLBACK_INTENT
+
+
+class FixedModel:
+    """Classifier stand-in that is unsure between analytics and the orchestrator."""
+
+    def predict_proba(self, text):
+        return {"analytics": 0.5, "applications": 0.05, "resume": 0.05, FALLBACK_INTENT: 0.4}
+
+
+@pytest.mark.parametrize("threshold, intent", [(0.8, "analytics"), (0.95, FALLBACK_INTENT)])
+def test_rule_hits_are_held_to_the_threshold(threshold, intent):
+    decision = IntentRouter(FixedModel(), threshold=threshold).route("Show me my funnel")
+
+    assert decision.intent == intent
+    assert decision.source == "rules"
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+
+from session_cache import SessionAgentCache
+
+
+class FakeAgent:
+    def __init__(self, name):
+        self.name = name
+        self.messages = []
+
+
+def test_concurrent_misses_share_the_first_hydrated_agent():
+    cache = SessionAgentCache(max_entries=10, idle_ttl=60, max_total_messages=1000)
+    both_building = threading.Barrier(2)
+    results = {}
+
+    def hydrate(name):
+        def factory():
+            both_building.wait(timeout=5)
+            return FakeAgent(name)
+        results[name] = cache.get("session-1", factory)
+
+    threads = [threading.Thread(target=hydrate, args=(name,)) for name in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results["a"] is results["b"]
+    assert cache.peek("session-1") is results["a"]
+    assert cache.misses == 2
+
+
+def test_get_conversations_waits_for_a_running_turn_before_hydrating(monkeypatch):
+    import main
+
+    hydrated = []
+
+    def get_session_agent(session_id):
+        hydrated.append(session_id)
+        return FakeAgent("hydrated")
+
+    monkeypatch.setattr(main, "get_session_agent", get_session_agent)
+
+    session_id = main.owned_session_id("auth0|reader", "session-2")
+
+    async def scenario():
+        turn_started = asyncio.Event()
+        finish_turn = asyncio.Event()
+
+        async def turn():
+            async with main.session_turn(session_id):
+                turn_started.set()
+                await finish_turn.wait()
+                hydrated.append("turn finished")
+
+        running = asyncio.create_task(turn())
+        await turn_started.wait()
+        reader = asyncio.create_task(main.get_conversations("session-2", user_id="auth0|reader"))
+        await asyncio.sleep(0.05)
+        assert hydrated == []
+        finish_turn.set()
+        await running
+        return await reader
+
+    assert asyncio.run(scenario()) == {"messages": []}
+    assert hydrated == ["turn finished", session_id]
+
+
+def test_get_conversations_reads_a_cached_agent_without_the_lock(monkeypatch):
+    import main
+
+    cached = FakeAgent("cached")
+    cached.messages = [{"role": "user", "content": [{"text": "hi"}]}]
+    monkeypatch.setattr(main.session_cache, "peek", lambda session_id: cached)
+
+    async def scenario():
+        async with main.session_lock(main.owned_session_id("auth0|reader", "session-3")):
+            return await asyncio.wait_for(main.get_conversations("session-3", user_id="auth0|reader"), timeout=1)
+
+    assert asyncio.run(scenario()) == {"messages": cached.messages}
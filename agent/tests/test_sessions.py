@@ -0,0 +1,92 @@
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from auth import authenticated_user_id
+
+ALICE = "auth0|alice"
+BOB = "auth0|bob"
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(main.history_reader, "storage_dir", str(tmp_path))
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
+
+
+def login(user_id):
+    main.app.dependency_overrides[authenticated_user_id] = lambda: user_id
+
+
+class FakeAgent:
+    def __init__(self):
+        self.event_loop_metrics = SimpleNamespace(accumulated_usage={})
+        self.conversation_manager = SimpleNamespace(pending_summary=False)
+        self.invocations = []
+
+    async def invoke_async(self, prompt, invocation_state):
+        self.invocations.append(invocation_state)
+        return "ok"
+
+    def turn_usage(self, usage_before):
+        return {"input_tokens": 0, "output_tokens": 0}
+
+
+@pytest.mark.parametrize("path", ["/agent", "/agent-streaming"])
+def test_turns_require_a_bearer_token(client, path):
+    assert client.post(path, json={"prompt": "hi", "session_id": ALICE}).status_code == 401
+
+
+@pytest.mark.parametrize("path", ["/conversations", "/get_conversations"])
+def test_history_requires_a_bearer_token(client, path):
+    assert client.get(path, params={"session_id": ALICE}).status_code == 401
+
+
+def test_sessions_are_namespaced_by_user():
+    assert main.owned_session_id(ALICE, "chat") != main.owned_session_id(BOB, "chat")
+    # Delimiters in the client's session id cannot forge another user's prefix
+    assert main.owned_session_id(ALICE, ALICE) != main.owned_session_id(BOB, ALICE)
+
+
+def test_turn_runs_in_the_callers_own_session(client, monkeypatch):
+    agents = {}
+    monkeypatch.setattr(main, "route", lambda prompt: None)
+    monkeypatch.setattr(main, "get_session_agent", lambda session_id: agents.setdefault(session_id, FakeAgent()))
+
+    login(BOB)
+    response = client.post("/agent", json={"prompt": "What did I tell you?", "session_id": ALICE})
+
+    assert response.status_code == 200
+    assert list(agents) == [main.owned_session_id(BOB, ALICE)]
+    assert agents[main.owned_session_id(BOB, ALICE)].invocations == [{"user_id": BOB}]
+
+
+def store_message(storage_dir, session_id, index, role, text):
+    directory = os.path.join(storage_dir, f"session_{session_id}", "agents", "agent_default", "messages")
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f"message_{index}.json"), "w", encoding="utf-8") as f:
+        json.dump({"message": {"role": role, "content": [{"text": text}]}}, f)
+
+
+def test_history_is_served_only_to_its_owner(client, tmp_path):
+    store_message(str(tmp_path), main.owned_session_id(ALICE, ALICE), 0, "user", "My salary is 120k")
+
+    login(ALICE)
+    assert client.get("/conversations", params={"session_id": ALICE}).json()["messages"] == [
+        {"index": 0, "role": "user", "content": "My salary is 120k"}]
+
+    login(BOB)
+    assert client.get("/conversations", params={"session_id": ALICE}).json()["messages"] == []
+
+
+@pytest.mark.parametrize("session_id", ["", "../alice", "a\\b"])
+def test_path_like_session_ids_are_rejected(client, session_id):
+    login(ALICE)
+
+    assert client.post("/agent", json={"prompt": "hi", "session_id": session_id}).status_code == 400
+    assert client.get("/conversations", params={"session_id": session_id}).status_code == 400
@@ -0,0 +1,80 @@
+import os
+import logging
+from typing import Dict, Any
+from botocore.exceptions import ClientError
+from clients import get_table
+from models import Application
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+def _missing_derived_attributes(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Derived index attributes the stored item lacks or has out of date."""
+    expected = Application.from_dynamo_dict(item).to_dynamo_dict()
+    return {
+        k: expected[k] for k in Application.DERIVED_ATTRIBUTES
+        if k in expected and item.get(k) != expected[k]
+    }
+
+
+def backfill_index_attributes(table_name: str = "applications", dry_run: bool = False) -> Dict[str, int]:
+    """
+    Scan the applications table and write the derived GSI attributes
+    (date_added, resume_used_id, user_status) onto rows created before they existed.
+
+    Safe to re-run: rows that are already up to date are skipped, and each write
+    is conditioned on the status it was derived from so a concurrent status
+    change is never overwritten with a stale user_status.
+    """
+    table = get_table(table_name)
+    stats = {'scanned': 0, 'updated': 0, 'skipped': 0, 'conflicts': 0}
+
+    scan_params: Dict[str, Any] = {}
+    while True:
+        response = table.scan(**scan_params)
+        for item in response.get('Items', []):
+            stats['scanned'] += 1
+            updates = _missing_derived_attributes(item)
+            if not updates:
+                stats['skipped'] += 1
+                continue
+            if dry_run:
+                logger.info(f"Would update {item['id']}: {updates}")
+                stats['updated'] += 1
+                continue
+
+            names = {f"#k{i}": k for i, k in enumerate(updates)}
+            values = {f":v{i}": v for i, v in enumerate(updates.values())}
+            names['#status'] = 'status'
+            values[':status'] = item.get('status')
+            try:
+                table.update_item(
+                    Key={'id': item['id']},
+                    UpdateExpression="SET " + ", ".join(f"#k{i} = :v{i}" for i in range(len(updates))),
+                    ConditionExpression="#status = :status",
+                    ExpressionAttributeNames=names,
+                    ExpressionAttributeValues=values
+                )
+                stats['updated'] += 1
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+                logger.warning(f"Skipping {item['id']}: status changed during backfill")
+                stats['conflicts'] += 1
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    logger.info(f"Backfill finished: {stats}")
+    return stats
+
+
+if __name__ == "__main__":
+    logging.basicConfig()
+    backfill_index_attributes(
+        table_name=os.environ.get("APPLICATIONS_TABLE", "applications"),
+        dry_run=os.environ.get("DRY_RUN") == "1"
+    )
@@ -0,0 +1,94 @@
+import logging
+from decimal import Decimal
+from datetime import datetime
+from dataclasses import dataclass, field, fields
+from typing import Optional, Dict, Any, List
+from models import Application
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+MAX_BATCH_OPERATIONS = 500
+VALID_OPS = {"create", "update", "delete"}
+# Fields a client may set through a batch create or update
+WRITABLE_FIELDS = {f.name for f in fields(Application)} - {'id', 'user_id', 'version', 'created_at', 'updated_at'}
+
+
+@dataclass
+class BatchOperation:
+    index: int
+    op: str
+    id: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+    # Expected version for updates and deletes; the operation fails if the item has moved on
+    version: Optional[int] = None
+    # Creation time carried over from an imported row; creates default to now
+    created_at: Optional[datetime] = None
+
+
+def validate_application_data(label: str, data: Any) -> Dict[str, Any]:
+    """Check client-supplied application fields; `label` prefixes error messages."""
+    if not isinstance(data, dict):
+        raise ValueError(f"{label}: 'data' must be an object")
+    unknown = set(data) - WRITABLE_FIELDS
+    if unknown:
+        raise ValueError(f"{label}: unknown fields {', '.join(sorted(unknown))}")
+    if 'status' in data and data['status'] not in Application.VALID_STATUSES:
+        raise ValueError(
+            f"{label}: invalid status '{data['status']}'. "
+            f"Must be one of {', '.join(sorted(list(Application.VALID_STATUSES)))}"
+        )
+    if data.get('pay') is not None:
+        try:
+            data['pay'] = Decimal(str(data['pay']))
+        except (TypeError, ValueError, ArithmeticError):
+            raise ValueError(f"{label}: invalid format for 'pay'. It must be a number.")
+    return data
+
+
+def parse_batch_operations(payload: Any) -> List[BatchOperation]:
+    """
+    Validate every operation in a batch request before any of them run.
+
+    Raises ValueError naming the first offending operation so a bad row in a
+    spreadsheet import never leaves the batch half-applied.
+    """
+    operations = payload.get('operations') if isinstance(payload, dict) else None
+    if not isinstance(operations, list) or not operations:
+        raise ValueError("'operations' must be a non-empty list")
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise ValueError(f"A batch may contain at most {MAX_BATCH_OPERATIONS} operations")
+
+    parsed = []
+    seen_ids = set()
+    for index, raw in enumerate(operations):
+        if not isinstance(raw, dict):
+            raise ValueError(f"Operation {index}: must be an object")
+        op = raw.get('op')
+        if op not in VALID_OPS:
+            raise ValueError(f"Operation {index}: 'op' must be one of {', '.join(sorted(VALID_OPS))}")
+
+        application_id = raw.get('id')
+        if op == 'create':
+            data = validate_application_data(f"Operation {index}", dict(raw.get('data') or {}))
+            data.setdefault('status', 'applied')
+        else:
+            if not application_id:
+                raise ValueError(f"Operation {index}: 'id' is required for {op}")
+            # A transaction may not touch the same item twice
+            if application_id in seen_ids:
+                raise ValueError(f"Operation {index}: application {application_id} appears more than once")
+            seen_ids.add(application_id)
+            data = validate_application_data(f"Operation {index}", dict(raw.get('data') or {})) if op == 'update' else {}
+            if op == 'update' and not data:
+                raise ValueError(f"Operation {index}: 'data' is required for update")
+
+        version = raw.get('version')
+        if version is not None and (op == 'create' or not isinstance(version, int) or isinstance(version, bool)):
+            raise ValueError(f"Operation {index}: 'version' must be an integer and only applies to update and delete")
+
+        parsed.append(BatchOperation(index=index, op=op, id=application_id, data=data, version=version))
+
+    logger.info(f"Validated batch of {len(parsed)} operations")
+    return parsed
@@ -1,22 +1,70 @@
-import boto3
+import time
 import uuid
+import random
 import logging
 from datetime import datetime
-from typing import Optional, Dict, Any, List
-from boto3.dynamodb.conditions import Key, Attr
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 from botocore.exceptions import ClientError
-from models import Application
+from clients import get_dynamodb_resource, get_table
+from expressions import VersionConflict, build_condition, build_update, raise_for_conflict
+from models import Application, ImportJob
+from batch import BatchOperation
+from planner import QueryPlan, plan_query
 
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Items read per request when a FilterExpression is applied
+FILTERED_PAGE_SIZE = 100
+# Upper bound on read capacity spent filling a single page of results
+MAX_READ_UNITS_PER_PAGE = 50.0
+# DynamoDB batch and transaction writes are issued in chunks of this size
+BATCH_CHUNK_SIZE = 25
+# Retries for unprocessed items / cancelled transactions before giving up
+BATCH_MAX_RETRIES = 5
+BATCH_BASE_DELAY_SECONDS = 0.05
+# Transaction cancellation reasons worth retrying as-is
+RETRYABLE_CANCELLATION_CODES = {'TransactionConflict', 'ThrottlingError', 'ProvisionedThroughputExceeded'}
+# Request-level errors worth retrying with backoff
+RETRYABLE_ERROR_CODES = {'ThrottlingException', 'ProvisionedThroughputExceededException',
+                         'TransactionInProgressException', 'InternalServerError'}
+
+
+def _sanitize_updates(updates: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop keys callers are never allowed to set directly."""
+    return {k: v for k, v in updates.items() if k not in [
+        'id', 'user_id', 'version', 'created_at', 'updated_at'] and k not in Application.DERIVED_ATTRIBUTES}
+
+
+def _with_derived_updates(updates: Dict[str, Any], user_id: Optional[str]) -> Dict[str, Any]:
+    """Stamp updated_at and keep derived index attributes in step with the update."""
+    updates = dict(updates)
+    updates['updated_at'] = datetime.utcnow().isoformat()
+    if 'resume_id' in updates:
+        # Keep the ResumeIndex key in step with the model field
+        updates['resume_used_id'] = updates['resume_id']
+    if 'status' in updates and user_id is not None:
+        # Keep the UserStatusIndex key in step with the new status
+        updates['user_status'] = Application.user_status_key(user_id, updates['status'])
+    return updates
+
+
+def _chunks(items: List[Any], size: int = BATCH_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _backoff(attempt: int) -> None:
+    """Sleep with exponential backoff and full jitter."""
+    time.sleep(random.uniform(0, BATCH_BASE_DELAY_SECONDS * (2 ** attempt)))
+
 
 class ApplicationDynamoDB:
     def __init__(self, table_name: str = "applications"):
-        self.dynamodb = boto3.resource('dynamodb')
-        self.table = self.dynamodb.Table(table_name)
+        self.dynamodb = get_dynamodb_resource()
+        self.table = get_table(table_name)
         logger.info(f"Initialized ApplicationDynamoDB with table: {table_name}")
 
     def create(self, application: Application) -> Application:
@@ -58,94 +106,332 @@ class ApplicationDynamoDB:
         max_pay: Optional[int] = None,
         limit: int = 20
     ) -> List[Application]:
-        """Queries using GSI. No Decimal conversion needed for integer pay."""
-        logger.info(f"Querying applications for user: {user_id}")
-        query_params = {
-            'IndexName': 'UserIndex',
-            'KeyConditionExpression': Key('user_id').eq(user_id),
-            'ScanIndexForward': False,
-            'Limit': limit
-        }
+        """Return the first page of matching applications."""
+        plan = plan_query(
+            user_id=user_id,
+            status=status,
+            job_title=job_title,
+            company=company,
+            location=location,
+            min_pay=min_pay,
+            max_pay=max_pay
+        )
+        apps, _ = self.query_page(plan, limit=limit)
+        return apps
+
+    def query_page(
+        self,
+        plan: QueryPlan,
+        limit: int = 20,
+        exclusive_start_key: Optional[Dict[str, Any]] = None,
+        max_read_units: float = MAX_READ_UNITS_PER_PAGE
+    ) -> Tuple[List[Application], Optional[Dict[str, Any]]]:
+        """
+        Execute a query plan, following LastEvaluatedKey until `limit` matches
+        are collected or the read-capacity budget is spent.
+
+        DynamoDB applies `Limit` before `FilterExpression`, so a single filtered
+        request can come back short even though more matches exist. Returns the
+        matches plus the key to resume from (None once the partition is exhausted).
+        """
+        query_params = plan.to_query_params()
+        query_params['ScanIndexForward'] = False
+        query_params['ReturnConsumedCapacity'] = 'TOTAL'
+        if plan.filter_expression is not None:
+            # Read wider pages when filtering so sparse matches fill in fewer round trips
+            query_params['Limit'] = max(limit, FILTERED_PAGE_SIZE)
+        else:
+            query_params['Limit'] = limit
 
-        filters = None
-        if status:
-            filters = Attr('status').eq(status)
-        if job_title:
-            condition = Attr('job_title').contains(job_title)
-            filters = filters & condition if filters else condition
-        if company:
-            condition = Attr('company').contains(company)
-            filters = filters & condition if filters else condition
-        if location:
-            condition = Attr('location').contains(location)
-            filters = filters & condition if filters else condition
-        if min_pay is not None:
-            condition = Attr('pay').gte(min_pay)
-            filters = filters & condition if filters else condition
-        if max_pay is not None:
-            condition = Attr('pay').lte(max_pay)
-            filters = filters & condition if filters else condition
-
-        if filters:
-            query_params['FilterExpression'] = filters
-        
         logger.info(f"Executing query with params: {query_params}")
-        response = self.table.query(**query_params)
-        items = response.get('Items', [])
-        logger.info(f"Query returned {len(items)} items.")
-        return [Application.from_dynamo_dict(item) for item in items]
+        items: List[Dict[str, Any]] = []
+        start_key = exclusive_start_key
+        consumed = 0.0
+        pages = 0
+        while True:
+            if start_key:
+                query_params['ExclusiveStartKey'] = start_key
+            response = self.table.query(**query_params)
+            pages += 1
+            consumed += response.get('ConsumedCapacity', {}).get('CapacityUnits', 0)
+            page_items = response.get('Items', [])
+            start_key = response.get('LastEvaluatedKey')
+
+            remaining = limit - len(items)
+            if len(page_items) > remaining:
+                # Page overshot the limit; resume right after the last item we return
+                items.extend(page_items[:remaining])
+                start_key = {k: items[-1][k] for k in plan.key_attributes if k in items[-1]}
+                break
+            items.extend(page_items)
+
+            if len(items) >= limit or not start_key:
+                break
+            if consumed >= max_read_units:
+                logger.info(f"Read budget exhausted after {pages} pages ({consumed} RCU)")
+                break
+
+        logger.info(f"Query returned {len(items)} items across {pages} pages ({consumed} RCU).")
+        return [Application.from_dynamo_dict(item) for item in items], start_key
+
+    def iter_pages(self, plan: QueryPlan) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Lazily yield raw item pages for a query plan, following LastEvaluatedKey
+        until the key range is exhausted. Only one page is held at a time.
+        """
+        query_params = plan.to_query_params()
+        while True:
+            response = self.table.query(**query_params)
+            yield response.get('Items', [])
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return
+            query_params['ExclusiveStartKey'] = last_key
+
+    def update(self, application_id: str, updates: Dict[str, Any], user_id: Optional[str] = None,
+               expected_version: Optional[int] = None) -> Optional[Application]:
+        """
+        Update fields in a single conditional write. Integers in 'updates' are handled natively.
 
-    def update(self, application_id: str, updates: Dict[str, Any]) -> Optional[Application]:
-        """Update fields. Integers in 'updates' are handled natively."""
+        Pass the owning user_id when it is known: the write is then conditioned
+        on ownership, and a status change can rewrite the UserStatusIndex key
+        without an extra read. With expected_version the write also fails with
+        VersionConflict if someone else updated the item first. Returns None
+        when the item doesn't exist or belongs to someone else.
+        """
         logger.info(f"Updating application ID: {application_id} with data: {updates}")
-        updates = {k: v for k, v in updates.items() if k not in [
-            'id', 'user_id', 'created_at', 'updated_at']}
+        updates = _sanitize_updates(updates)
         if not updates:
             logger.warning("No update data provided. Fetching current item instead.")
-            return self.get_by_id(application_id)
-
-        updates['updated_at'] = datetime.utcnow().isoformat()
-
-        # Build expressions to handle reserved keywords
-        update_expression_parts = []
-        expression_attribute_names = {}
-        expression_attribute_values = {}
-        for i, (key, value) in enumerate(updates.items()):
-            name_placeholder = f"#k{i}"
-            value_placeholder = f":v{i}"
-            update_expression_parts.append(f"{name_placeholder} = {value_placeholder}")
-            expression_attribute_names[name_placeholder] = key
-            expression_attribute_values[value_placeholder] = value
-
-        update_expr = "SET " + ", ".join(update_expression_parts)
-        
-        logger.info(f"Update expression: {update_expr}")
-        logger.info(f"Expression attribute names: {expression_attribute_names}")
-        logger.info(f"Expression attribute values: {expression_attribute_values}")
+            current = self.get_by_id(application_id)
+            return current if current and user_id in (None, current.user_id) else None
+
+        if 'status' in updates and user_id is None:
+            current = self.get_by_id(application_id)
+            if not current:
+                return None
+            user_id = current.user_id
+        updates = _with_derived_updates(updates, user_id)
+
+        update_params = build_update(updates, owner=user_id, expected_version=expected_version)
+        logger.info(f"Update expression: {update_params['UpdateExpression']}")
+        logger.info(f"Condition expression: {update_params['ConditionExpression']}")
 
         try:
-            response = self.table.update_item(
-                Key={'id': application_id},
-                UpdateExpression=update_expr,
-                ExpressionAttributeNames=expression_attribute_names,
-                ExpressionAttributeValues=expression_attribute_values,
-                ReturnValues="ALL_NEW"
-            )
+            response = self.table.update_item(Key={'id': application_id}, ReturnValues="ALL_NEW", **update_params)
             logger.info(f"Successfully updated application ID: {application_id}")
             return Application.from_dynamo_dict(response['Attributes'])
         except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                raise_for_conflict(e.response.get('Item'), user_id)
             logger.error(f"Error updating application {application_id}: {e.response['Error']['Code']}", exc_info=True)
             return None
 
-    def delete(self, application_id: str) -> bool:
+    def delete(self, application_id: str, user_id: Optional[str] = None,
+               expected_version: Optional[int] = None) -> bool:
+        """Delete in one conditional write; ownership and version are checked as in update."""
         logger.info(f"Deleting application ID: {application_id}")
+        names: Dict[str, str] = {}
+        values: Dict[str, Any] = {}
+        delete_params = {
+            'Key': {'id': application_id},
+            'ConditionExpression': build_condition(names, values, user_id, expected_version),
+            'ReturnValuesOnConditionCheckFailure': 'ALL_OLD',
+        }
+        if names:
+            delete_params['ExpressionAttributeNames'] = names
+            delete_params['ExpressionAttributeValues'] = values
         try:
-            self.table.delete_item(
-                Key={'id': application_id},
-                ConditionExpression="attribute_exists(id)"
-            )
+            self.table.delete_item(**delete_params)
             logger.info(f"Successfully deleted application ID: {application_id}")
             return True
         except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                raise_for_conflict(e.response.get('Item'), user_id)
             logger.error(f"Error deleting application {application_id}: {e.response['Error']['Code']}", exc_info=True)
             return False
+
+    def batch_write(self, user_id: str, operations: List[BatchOperation]) -> List[Dict[str, Any]]:
+        """
+        Execute validated batch operations and return one result per operation,
+        in request order.
+
+        Creates are new items owned by the caller, so they go through
+        BatchWriteItem. Updates and deletes must be conditioned on ownership,
+        which BatchWriteItem cannot express, so they go through
+        TransactWriteItems instead.
+        """
+        logger.info(f"Executing batch of {len(operations)} operations for user: {user_id}")
+        results: List[Optional[Dict[str, Any]]] = [None] * len(operations)
+        now = datetime.utcnow()
+
+        creates = []
+        mutations = []
+        for position, operation in enumerate(operations):
+            if operation.op == 'create':
+                app = Application(**operation.data, id=str(uuid.uuid4()), user_id=user_id,
+                                  created_at=operation.created_at or now)
+                creates.append((position, app))
+            else:
+                mutations.append((position, operation))
+
+        for chunk in _chunks(creates):
+            self._batch_put(chunk, results)
+        for chunk in _chunks(mutations):
+            self._transact_chunk(user_id, chunk, results)
+
+        failed = sum(1 for r in results if r['status'] != 'ok')
+        logger.info(f"Batch finished: {len(results) - failed} succeeded, {failed} failed")
+        return results
+
+    def _batch_put(self, chunk: List[Tuple[int, Application]], results: List[Optional[Dict[str, Any]]]) -> None:
+        client = self.dynamodb.meta.client
+        by_id = {app.id: position for position, app in chunk}
+        pending = [{'PutRequest': {'Item': app.to_dynamo_dict()}} for _, app in chunk]
+
+        for attempt in range(BATCH_MAX_RETRIES + 1):
+            response = client.batch_write_item(RequestItems={self.table.name: pending})
+            unprocessed = response.get('UnprocessedItems', {}).get(self.table.name, [])
+            unprocessed_ids = {r['PutRequest']['Item']['id'] for r in unprocessed}
+            for request in pending:
+                application_id = request['PutRequest']['Item']['id']
+                if application_id not in unprocessed_ids:
+                    results[by_id[application_id]] = {'op': 'create', 'id': application_id, 'status': 'ok'}
+            pending = unprocessed
+            if not pending:
+                return
+            logger.warning(f"{len(pending)} unprocessed items, retrying (attempt {attempt + 1})")
+            _backoff(attempt)
+
+        for request in pending:
+            application_id = request['PutRequest']['Item']['id']
+            results[by_id[application_id]] = {
+                'op': 'create', 'id': application_id, 'status': 'error', 'error': 'Throughput exceeded'}
+
+    def _transact_item(self, user_id: str, operation: BatchOperation) -> Dict[str, Any]:
+        if operation.op == 'delete':
+            names: Dict[str, str] = {}
+            values: Dict[str, Any] = {}
+            condition = build_condition(names, values, user_id, operation.version)
+            return {'Delete': {
+                'TableName': self.table.name,
+                'Key': {'id': operation.id},
+                'ConditionExpression': condition,
+                'ExpressionAttributeNames': names,
+                'ExpressionAttributeValues': values,
+                'ReturnValuesOnConditionCheckFailure': 'ALL_OLD'
+            }}
+
+        updates = _with_derived_updates(_sanitize_updates(operation.data), user_id)
+        return {'Update': {
+            'TableName': self.table.name,
+            'Key': {'id': operation.id},
+            **build_update(updates, owner=user_id, expected_version=operation.version)
+        }}
+
+    def _transact_chunk(self, user_id: str, chunk: List[Tuple[int, BatchOperation]],
+                        results: List[Optional[Dict[str, Any]]]) -> None:
+        client = self.dynamodb.meta.client
+        pending = list(chunk)
+
+        for attempt in range(BATCH_MAX_RETRIES + 1):
+            try:
+                client.transact_write_items(
+                    TransactItems=[self._transact_item(user_id, operation) for _, operation in pending])
+                for position, operation in pending:
+                    results[position] = {'op': operation.op, 'id': operation.id, 'status': 'ok'}
+                return
+            except ClientError as e:
+                code = e.response['Error']['Code']
+                if code in RETRYABLE_ERROR_CODES:
+                    _backoff(attempt)
+                    continue
+                if code != 'TransactionCanceledException':
+                    logger.error(f"Batch transaction failed: {code}", exc_info=True)
+                    for position, operation in pending:
+                        results[position] = {'op': operation.op, 'id': operation.id, 'status': 'error', 'error': code}
+                    return
+
+                # A cancelled transaction applies nothing; drop the items that
+                # failed their condition and retry the rest.
+                reasons = e.response.get('CancellationReasons', [])
+                retry = []
+                for (position, operation), reason in zip(pending, reasons):
+                    reason_code = reason.get('Code', 'None')
+                    if reason_code == 'ConditionalCheckFailed':
+                        try:
+                            raise_for_conflict(reason.get('Item'), user_id)
+                            error = 'Application not found'
+                        except VersionConflict as conflict:
+                            error = str(conflict)
+                        results[position] = {
+                            'op': operation.op, 'id': operation.id, 'status': 'error', 'error': error}
+                    elif reason_code in ('None', *RETRYABLE_CANCELLATION_CODES):
+                        retry.append((position, operation))
+                    else:
+                        results[position] = {
+                            'op': operation.op, 'id': operation.id, 'status': 'error', 'error': reason_code}
+                pending = retry
+                if not pending:
+                    return
+                if any(r.get('Code') in RETRYABLE_CANCELLATION_CODES for r in reasons):
+                    _backoff(attempt)
+
+        for position, operation in pending:
+            results[position] = {'op': operation.op, 'id': operation.id, 'status': 'error', 'error': 'Transaction conflict'}
+
+
+class ImportJobDynamoDB:
+    def __init__(self, table_name: str = "application_imports"):
+        self.table = get_table(table_name)
+        logger.info(f"Initialized ImportJobDynamoDB with table: {table_name}")
+
+    def create(self, job: ImportJob) -> ImportJob:
+        """Create a new import job record."""
+        logger.info(f"Creating import job {job.id} for user: {job.user_id}")
+        if not job.created_at:
+            job.created_at = datetime.utcnow()
+        self.table.put_item(Item=job.to_dynamo_dict())
+        return job
+
+    def get_by_id(self, job_id: str) -> Optional[ImportJob]:
+        logger.info(f"Getting import job by ID: {job_id}")
+        try:
+            item = self.table.get_item(Key={'id': job_id}).get('Item')
+            return ImportJob.from_dynamo_dict(item) if item else None
+        except ClientError as e:
+            logger.error(f"Error getting import job {job_id}: {e.response['Error']['Code']}", exc_info=True)
+            return None
+
+    def update_status(self, job_id: str, status: str) -> None:
+        """Move an import job to a new status."""
+        if status not in ImportJob.VALID_STATUSES:
+            raise ValueError(f"Invalid status: {status}")
+        logger.info(f"Updating import job {job_id} to {status}")
+        self.table.update_item(
+            Key={'id': job_id},
+            UpdateExpression="SET #status = :status, updated_at = :updated_at",
+            ExpressionAttributeNames={'#status': 'status'},
+            ExpressionAttributeValues={':status': status, ':updated_at': datetime.utcnow().isoformat()}
+        )
+
+    def record_progress(self, job_id: str, processed: int, imported: int, failed: int,
+                        errors: Optional[List[str]] = None) -> None:
+        """Atomically add to the job's row counters and append any row errors."""
+        update_expr = ("ADD rows_processed :processed, rows_imported :imported, rows_failed :failed "
+                       "SET updated_at = :updated_at")
+        values: Dict[str, Any] = {
+            ':processed': processed,
+            ':imported': imported,
+            ':failed': failed,
+            ':updated_at': datetime.utcnow().isoformat()
+        }
+        if errors:
+            update_expr += ", errors = list_append(if_not_exists(errors, :empty), :errors)"
+            values[':errors'] = errors
+            values[':empty'] = []
+        self.table.update_item(
+            Key={'id': job_id},
+            UpdateExpression=update_expr,
+            ExpressionAttributeValues=values
+        )
@@ -0,0 +1,199 @@
+import io
+import csv
+import json
+import queue
+import logging
+import threading
+from dataclasses import fields
+from decimal import Decimal
+from typing import Dict, Any, Iterator, List, Optional
+from boto3.dynamodb.conditions import Attr
+
+from clients import get_s3_client
+from db import ApplicationDynamoDB
+from models import Application
+from planner import QueryPlan, plan_query
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+EXPORT_FORMATS = {"ndjson", "csv"}
+EXPORT_COLUMNS = [f.name for f in fields(Application)]
+# S3 requires every multipart part except the last to be at least 5 MiB
+MULTIPART_PART_SIZE = 8 * 1024 * 1024
+# Pages buffered between the segment readers and the serializer
+MAX_BUFFERED_PAGES = 8
+# How often a reader blocked on a full queue checks whether the consumer stopped
+READER_PUT_TIMEOUT_SECONDS = 0.1
+CONTENT_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+_DONE = object()
+
+
+def _to_json_value(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return int(value) if value % 1 == 0 else float(value)
+    return value
+
+
+def _segment_plans(user_id: str) -> List[QueryPlan]:
+    """
+    Disjoint reads that together cover every application with a date_added.
+
+    Each valid status is its own UserStatusIndex partition. Rows with no
+    user_status, or one outside VALID_STATUSES, are picked up from the user's
+    UserIndex partition with a filter that excludes the status segments.
+    Rows predating date_added are in neither index until backfill.py runs.
+    """
+    plans = [plan_query(user_id=user_id, status=status) for status in sorted(Application.VALID_STATUSES)]
+    leftovers = plan_query(user_id=user_id)
+    status_keys = [Application.user_status_key(user_id, status) for status in sorted(Application.VALID_STATUSES)]
+    leftovers.filter_expression = Attr('user_status').not_exists() | ~Attr('user_status').is_in(status_keys)
+    plans.append(leftovers)
+    return plans
+
+
+def iter_user_items(db: ApplicationDynamoDB, user_id: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every application item for a user.
+
+    The segments from _segment_plans are read in parallel. Pages flow through
+    a bounded queue, which keeps memory flat no matter how many applications
+    the user has. Closing the iterator early stops and joins the readers.
+    """
+    pages: queue.Queue = queue.Queue(maxsize=MAX_BUFFERED_PAGES)
+    errors: List[BaseException] = []
+    stop = threading.Event()
+
+    def put(page: Any) -> bool:
+        while not stop.is_set():
+            try:
+                pages.put(page, timeout=READER_PUT_TIMEOUT_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read_segment(plan: QueryPlan) -> None:
+        try:
+            for page in db.iter_pages(plan):
+                if not put(page):
+                    return
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            put(_DONE)
+
+    readers = [threading.Thread(target=read_segment, args=(plan,), name=f"export-reader-{i}", daemon=True)
+               for i, plan in enumerate(_segment_plans(user_id))]
+    for reader in readers:
+        reader.start()
+
+    try:
+        remaining = len(readers)
+        while remaining:
+            page = pages.get()
+            if page is _DONE:
+                remaining -= 1
+                continue
+            if errors:
+                break
+            yield from page
+    finally:
+        stop.set()
+        for reader in readers:
+            reader.join()
+
+    if errors:
+        raise errors[0]
+
+
+def ndjson_lines(items: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    for item in items:
+        record = {k: _to_json_value(item[k]) for k in EXPORT_COLUMNS if k in item}
+        yield (json.dumps(record) + "\n").encode('utf-8')
+
+
+def csv_lines(items: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction='ignore')
+    writer.writeheader()
+    for item in items:
+        writer.writerow({k: _to_json_value(v) for k, v in item.items()})
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def upload_stream(bucket: str, key: str, chunks: Iterator[bytes], content_type: str) -> int:
+    """
+    Upload a byte stream to S3 without materialising it.
+
+    Small exports go up with a single put_object; once the stream passes one
+    part size it switches to a multipart upload. Returns the bytes written.
+    """
+    s3 = get_s3_client()
+    buffer = bytearray()
+    upload_id: Optional[str] = None
+    parts = []
+    total = 0
+
+    try:
+        for chunk in chunks:
+            buffer.extend(chunk)
+            total += len(chunk)
+            if len(buffer) >= MULTIPART_PART_SIZE:
+                if upload_id is None:
+                    upload_id = s3.create_multipart_upload(
+                        Bucket=bucket, Key=key, ContentType=content_type)['UploadId']
+                part_number = len(parts) + 1
+                response = s3.upload_part(Bucket=bucket, Key=key, UploadId=upload_id,
+                                          PartNumber=part_number, Body=bytes(buffer))
+                parts.append({'PartNumber': part_number, 'ETag': response['ETag']})
+                buffer.clear()
+
+        if upload_id is None:
+            s3.put_object(Bucket=bucket, Key=key, Body=bytes(buffer), ContentType=content_type)
+            return total
+
+        if buffer:
+            part_number = len(parts) + 1
+            response = s3.upload_part(Bucket=bucket, Key=key, UploadId=upload_id,
+                                      PartNumber=part_number, Body=bytes(buffer))
+            parts.append({'PartNumber': part_number, 'ETag': response['ETag']})
+        s3.complete_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id,
+                                     MultipartUpload={'Parts': parts})
+        logger.info(f"Uploaded {total} bytes to s3://{bucket}/{key} in {len(parts)} parts")
+        return total
+    except Exception:
+        if upload_id is not None:
+            s3.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+
+
+def export_applications(db: ApplicationDynamoDB, user_id: str, bucket: str, key: str,
+                        file_format: str = "ndjson") -> Dict[str, Any]:
+    """Write every application for a user to S3 and return a presigned download URL."""
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid format '{file_format}'. Must be one of {', '.join(sorted(EXPORT_FORMATS))}")
+
+    counter = {'count': 0}
+
+    def counted(items: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for item in items:
+            counter['count'] += 1
+            yield item
+
+    items = counted(iter_user_items(db, user_id))
+    lines = ndjson_lines(items) if file_format == 'ndjson' else csv_lines(items)
+    size = upload_stream(bucket, key, lines, CONTENT_TYPES[file_format])
+
+    url = get_s3_client().generate_presigned_url(
+        'get_object',
+        Params={'Bucket': bucket, 'Key': key},
+        ExpiresIn=3600
+    )
+    logger.info(f"Exported {counter['count']} applications for user {user_id} ({size} bytes)")
+    return {'download_url': url, 'count': counter['count'], 'size_bytes': size, 'format': file_format}
@@ -0,0 +1,206 @@
+import os
+import csv
+import json
+import codecs
+import logging
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, Future
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, Any, Iterator, Iterable, List, Tuple
+from urllib.parse import unquote_plus
+
+from batch import BatchOperation, WRITABLE_FIELDS, validate_application_data
+from clients import get_s3_client
+from db import ApplicationDynamoDB, ImportJobDynamoDB, BATCH_CHUNK_SIZE
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Chunks written concurrently while the next rows are parsed
+MAX_CHUNKS_IN_FLIGHT = 4
+# Row errors kept on the import job for the UI; the rest are only counted
+MAX_RECORDED_ERRORS = 50
+# Columns other trackers use for when an application was made, in order of preference
+CREATED_AT_COLUMNS = ("created_at", "date_added", "date_applied", "applied_date")
+IMPORT_KEY_PREFIX = "imports/"
+
+db = ApplicationDynamoDB(os.environ.get("APPLICATIONS_TABLE", "applications"))
+jobs = ImportJobDynamoDB(os.environ.get("IMPORTS_TABLE", "application_imports"))
+
+
+def import_key(user_id: str, job_id: str, file_format: str) -> str:
+    """S3 key an import file is uploaded to; the worker parses ids back out of it."""
+    return f"{IMPORT_KEY_PREFIX}{user_id}/{job_id}.{file_format}"
+
+
+def _parse_import_key(key: str) -> Tuple[str, str, str]:
+    user_id, file_name = key[len(IMPORT_KEY_PREFIX):].split('/', 1)
+    job_id, file_format = file_name.rsplit('.', 1)
+    return user_id, job_id, file_format
+
+
+def read_csv_rows(stream) -> Iterator[Dict[str, Any]]:
+    """Yield one dict per CSV row, decoding the byte stream incrementally."""
+    reader = csv.DictReader(codecs.getreader('utf-8-sig')(stream))
+    for row in reader:
+        yield row
+
+
+def read_ndjson_rows(stream) -> Iterator[Any]:
+    """
+    Yield one dict per non-blank NDJSON line.
+
+    A malformed line is yielded as its ValueError rather than raised, so it is
+    reported against its row without ending the rest of the file.
+    """
+    for line in codecs.getreader('utf-8-sig')(stream):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield e
+
+
+def _parse_created_at(label: str, value: Any) -> datetime:
+    try:
+        created_at = datetime.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f"{label}: invalid date '{value}'. Use ISO 8601, e.g. 2024-05-01")
+    if created_at.tzinfo is not None:
+        # Stored timestamps are naive UTC so date_added sorts consistently
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return created_at
+
+
+def row_to_operation(row_number: int, row: Any) -> BatchOperation:
+    """
+    Map an exported row from another tracker onto an Application create.
+
+    Header names are normalised and unknown columns ignored, since other
+    trackers export far more columns than we store. Blank cells are dropped.
+    A creation date column, when present, is kept instead of the import time.
+    """
+    if not isinstance(row, dict):
+        raise ValueError(f"Row {row_number}: expected an object")
+    data = {}
+    dates = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        name = key.strip().lower().replace(' ', '_')
+        if name not in WRITABLE_FIELDS and name not in CREATED_AT_COLUMNS:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if name == 'status':
+                value = value.lower()
+        if value in ('', None):
+            continue
+        if name in CREATED_AT_COLUMNS:
+            dates[name] = value
+        else:
+            data[name] = value
+    data = validate_application_data(f"Row {row_number}", data)
+    data.setdefault('status', 'applied')
+    created_at = next((dates[c] for c in CREATED_AT_COLUMNS if c in dates), None)
+    return BatchOperation(
+        index=row_number,
+        op='create',
+        data=data,
+        created_at=_parse_created_at(f"Row {row_number}", created_at) if created_at is not None else None
+    )
+
+
+class _ErrorBudget:
+    """Caps the row errors recorded across every chunk of one import job."""
+
+    def __init__(self, limit: int = MAX_RECORDED_ERRORS):
+        self.remaining = limit
+        self._lock = threading.Lock()
+
+    def take(self, errors: List[str]) -> List[str]:
+        with self._lock:
+            kept = errors[:self.remaining]
+            self.remaining -= len(kept)
+            return kept
+
+
+def _write_chunk(user_id: str, job_id: str, chunk: List[BatchOperation], invalid: int, errors: List[str],
+                 budget: _ErrorBudget) -> None:
+    results = db.batch_write(user_id, chunk) if chunk else []
+    write_errors = [f"Row {op.index}: {r['error']}" for op, r in zip(chunk, results) if r['status'] != 'ok']
+    imported = len(results) - len(write_errors)
+    jobs.record_progress(
+        job_id,
+        processed=len(chunk) + invalid,
+        imported=imported,
+        failed=invalid + len(write_errors),
+        errors=budget.take(errors + write_errors) or None
+    )
+
+
+def import_rows(user_id: str, job_id: str, rows: Iterable[Dict[str, Any]]) -> None:
+    """
+    Validate rows and write them in BatchWriteItem-sized chunks.
+
+    Only MAX_CHUNKS_IN_FLIGHT chunks are ever buffered, so memory stays flat
+    regardless of file size while DynamoDB writes overlap with parsing.
+    """
+    budget = _ErrorBudget()
+    in_flight: Deque[Future] = deque()
+    with ThreadPoolExecutor(max_workers=MAX_CHUNKS_IN_FLIGHT) as executor:
+        numbered = enumerate(rows, start=1)
+        while True:
+            raw_chunk = list(islice(numbered, BATCH_CHUNK_SIZE))
+            if not raw_chunk:
+                break
+            chunk = []
+            errors = []
+            for row_number, row in raw_chunk:
+                try:
+                    if isinstance(row, Exception):
+                        raise ValueError(f"Row {row_number}: {row}")
+                    chunk.append(row_to_operation(row_number, row))
+                except ValueError as e:
+                    errors.append(str(e))
+
+            if len(in_flight) >= MAX_CHUNKS_IN_FLIGHT:
+                in_flight.popleft().result()
+            in_flight.append(executor.submit(_write_chunk, user_id, job_id, chunk, len(errors), errors, budget))
+
+        while in_flight:
+            in_flight.popleft().result()
+
+
+def process_import(bucket: str, key: str) -> None:
+    user_id, job_id, file_format = _parse_import_key(key)
+    job = jobs.get_by_id(job_id)
+    if not job or job.user_id != user_id or job.s3_key != key:
+        logger.warning(f"No import job matches uploaded object {key}; ignoring")
+        return
+
+    jobs.update_status(job_id, "processing")
+    try:
+        body = get_s3_client().get_object(Bucket=bucket, Key=key)['Body']
+        rows = read_csv_rows(body) if file_format == 'csv' else read_ndjson_rows(body)
+        import_rows(user_id, job_id, rows)
+        jobs.update_status(job_id, "completed")
+        logger.info(f"Import job {job_id} completed")
+    except Exception as e:
+        logger.error(f"Import job {job_id} failed: {e}", exc_info=True)
+        jobs.record_progress(job_id, processed=0, imported=0, failed=0, errors=[f"Import failed: {e}"])
+        jobs.update_status(job_id, "failed")
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> None:
+    """Entry point for S3 ObjectCreated events on the imports/ prefix."""
+    for record in event.get('Records', []):
+        bucket = record['s3']['bucket']['name']
+        key = unquote_plus(record['s3']['object']['key'])
+        logger.info(f"Processing import upload s3://{bucket}/{key}")
+        process_import(bucket, key)
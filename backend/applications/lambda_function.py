@@ -1,15 +1,32 @@
+import os
 import json
+import uuid
 import logging
 from decimal import Decimal
-from typing import Dict, Any
-from db import ApplicationDynamoDB
-from models import Application
+from typing import Dict, Any, Optional
+from batch import parse_batch_operations
+from clients import get_s3_client
+from db import ApplicationDynamoDB, ImportJobDynamoDB
+from exporter import export_applications
+from expressions import VersionConflict
+from importer import import_key
+from models import Application, ImportJob
+from pagination import encode_cursor, decode_cursor
+from planner import plan_query
 
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Largest page a client may request from GET /applications
+MAX_PAGE_LIMIT = 100
+
+# Initialize clients once per container so warm invocations reuse them
+db = ApplicationDynamoDB(os.environ.get("APPLICATIONS_TABLE", "applications"))
+jobs = ImportJobDynamoDB(os.environ.get("IMPORTS_TABLE", "application_imports"))
+DATA_S3_BUCKET = os.environ.get("APPLICATIONS_S3_BUCKET")
+
 
 class DecimalEncoder(json.JSONEncoder):
     """Custom JSON encoder to handle Decimal types."""
@@ -23,16 +40,20 @@ class DecimalEncoder(json.JSONEncoder):
         return super(DecimalEncoder, self).default(o)
 
 
-def success_response(data: Any, status_code: int = 200) -> Dict[str, Any]:
-    """Create a successful API Gateway response."""
+def success_response(data: Any, status_code: int = 200, version: Optional[int] = None) -> Dict[str, Any]:
+    """Create a successful API Gateway response, with an ETag when a single item's version is known."""
+    headers = {
+        'Content-Type': 'application/json',
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Headers': 'Content-Type,If-Match',
+        'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS,PATCH',
+        'Access-Control-Expose-Headers': 'ETag'
+    }
+    if version is not None:
+        headers['ETag'] = f'"{version}"'
     return {
         'statusCode': status_code,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Headers': 'Content-Type',
-            'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS'
-        },
+        'headers': headers,
         'body': json.dumps(data, cls=DecimalEncoder)
     }
 
@@ -44,13 +65,31 @@ def error_response(message: str, status_code: int = 400) -> Dict[str, Any]:
         'headers': {
             'Content-Type': 'application/json',
             'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Headers': 'Content-Type',
-            'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS'
+            'Access-Control-Allow-Headers': 'Content-Type,If-Match',
+            'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS,PATCH',
+            'Access-Control-Expose-Headers': 'ETag'
         },
         'body': json.dumps({'error': message})
     }
 
 
+def expected_version(event: Dict[str, Any]) -> Optional[int]:
+    """
+    Version from an If-Match header (the ETag of an earlier response), or
+    None when the header is absent or `*` and any version may be overwritten.
+    """
+    value = (event.get('headers') or {}).get('if-match')
+    if not value or value.strip() == '*':
+        return None
+    value = value.strip()
+    if value.startswith('W/'):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise ValueError("If-Match must be an ETag returned by this API")
+
+
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Main Lambda handler for application CRUD operations using DynamoDB.
@@ -61,8 +100,6 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         user_id = event['requestContext']['authorizer']['jwt']['claims']['sub']
         logger.info(f"Authenticated User ID: {user_id}")
 
-        db = ApplicationDynamoDB()
-
         http_method = event.get('requestContext', {}).get('http', {}).get('method', '')
         path = event.get('rawPath', '')
         path_parameters = event.get('pathParameters') or {}
@@ -81,6 +118,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         elif http_method == 'POST' and path == '/applications':
             logger.info("Routing to: CREATE - POST /applications")
             data['user_id'] = user_id # Assign user_id from auth context
+            data.pop('version', None)
 
             status = data.get('status', 'applied')
             if status not in Application.VALID_STATUSES:
@@ -93,39 +131,99 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             app = Application(**data)
             created_app = db.create(app)
             logger.info(f"Successfully created application: {created_app.id}")
-            return success_response(created_app.to_dynamo_dict(), status_code=201)
+            return success_response(created_app.to_dynamo_dict(), status_code=201, version=created_app.version)
+
+        elif http_method == 'POST' and path == '/applications/batch':
+            logger.info("Routing to: BATCH - POST /applications/batch")
+            operations = parse_batch_operations(data)
+            results = db.batch_write(user_id, operations)
+            succeeded = sum(1 for r in results if r['status'] == 'ok')
+            logger.info(f"Batch applied {succeeded}/{len(results)} operations for user {user_id}")
+            return success_response({
+                'results': results,
+                'succeeded': succeeded,
+                'failed': len(results) - succeeded
+            })
+
+        elif http_method == 'POST' and path == '/applications/imports':
+            logger.info("Routing to: START IMPORT - POST /applications/imports")
+            file_format = data.get('format', 'csv')
+            if file_format not in ImportJob.VALID_FORMATS:
+                return error_response(
+                    f"Invalid format '{file_format}'. Must be one of {', '.join(sorted(ImportJob.VALID_FORMATS))}",
+                    status_code=400
+                )
+            job_id = str(uuid.uuid4())
+            s3_key = import_key(user_id, job_id, file_format)
+            job = jobs.create(ImportJob(id=job_id, user_id=user_id, s3_key=s3_key, format=file_format))
+
+            presigned_url = get_s3_client().generate_presigned_url(
+                'put_object',
+                Params={
+                    'Bucket': DATA_S3_BUCKET,
+                    'Key': s3_key,
+                    'ContentType': 'text/csv' if file_format == 'csv' else 'application/x-ndjson'
+                },
+                ExpiresIn=3600
+            )
+            return success_response({'presigned_url': presigned_url, 'import': job.to_dynamo_dict()}, status_code=201)
+
+        elif http_method == 'GET' and path == '/applications/export':
+            logger.info("Routing to: EXPORT - GET /applications/export")
+            file_format = query_parameters.get('format', 'ndjson')
+            export_key = f"exports/{user_id}/{uuid.uuid4()}.{file_format}"
+            result = export_applications(db, user_id, DATA_S3_BUCKET, export_key, file_format)
+            return success_response(result)
+
+        elif http_method == 'GET' and path_parameters.get('import_id'):
+            job_id = path_parameters['import_id']
+            logger.info(f"Routing to: IMPORT PROGRESS - GET /applications/imports/{job_id}")
+            job = jobs.get_by_id(job_id)
+            if not job or job.user_id != user_id:
+                return error_response('Import not found', status_code=404)
+            return success_response(job.to_dynamo_dict())
 
         elif http_method == 'GET' and path_parameters.get('id'):
             application_id = path_parameters['id']
             logger.info(f"Routing to: READ BY ID - GET /applications/{application_id}")
             app = db.get_by_id(application_id)
-            if not app:
+            if not app or app.user_id != user_id:
                 logger.warning(f"Application with ID {application_id} not found")
                 return error_response('Application not found', status_code=404)
             logger.info(f"Successfully found application: {app.id}")
-            return success_response(app.to_dynamo_dict())
+            return success_response(app.to_dynamo_dict(), version=app.version)
 
         elif http_method == 'GET' and path == '/applications':
             logger.info("Routing to: QUERY - GET /applications")
             # user_id is now taken from the auth context
 
-            status = query_parameters.get('status')
-            job_title = query_parameters.get('job_title')
-            company = query_parameters.get('company')
-            limit = int(query_parameters.get('limit', 20))
-
-            apps = db.query(
+            min_pay = query_parameters.get('min_pay')
+            max_pay = query_parameters.get('max_pay')
+            plan = plan_query(
                 user_id=user_id,
-                status=status,
-                job_title=job_title,
-                company=company,
-                limit=limit
+                status=query_parameters.get('status'),
+                resume_id=query_parameters.get('resume_id'),
+                job_title=query_parameters.get('job_title'),
+                company=query_parameters.get('company'),
+                location=query_parameters.get('location'),
+                date_from=query_parameters.get('date_from'),
+                date_to=query_parameters.get('date_to'),
+                min_pay=int(min_pay) if min_pay is not None else None,
+                max_pay=int(max_pay) if max_pay is not None else None
             )
+            limit = min(max(int(query_parameters.get('limit', 20)), 1), MAX_PAGE_LIMIT)
+            start_key = decode_cursor(query_parameters.get('cursor'), user_id, scope=plan.index_name)
+
+            apps, last_key = db.query_page(plan, limit=limit, exclusive_start_key=start_key)
             logger.info(f"Found {len(apps)} applications for user {user_id}")
-            return success_response({
+            result = {
                 'applications': [app.to_dynamo_dict() for app in apps],
-                'count': len(apps)
-            })
+                'count': len(apps),
+                'next_cursor': encode_cursor(last_key, user_id, scope=plan.index_name)
+            }
+            if query_parameters.get('explain') == 'true':
+                result['plan'] = plan.explain()
+            return success_response(result)
 
         elif http_method == 'PATCH' and path_parameters.get('id'):
             application_id = path_parameters['id']
@@ -142,17 +240,17 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 except (TypeError, ValueError):
                     return error_response("Invalid format for 'pay'. It must be a number.", status_code=400)
                 
-            updated_app = db.update(application_id, data)
+            updated_app = db.update(application_id, data, user_id=user_id, expected_version=expected_version(event))
             if not updated_app:
                 logger.warning(f"Update failed. Application with ID {application_id} not found or update error.")
                 return error_response('Application not found', status_code=404)
             logger.info(f"Successfully updated application: {updated_app.id}")
-            return success_response(updated_app.to_dynamo_dict())
+            return success_response(updated_app.to_dynamo_dict(), version=updated_app.version)
 
         elif http_method == 'DELETE' and path_parameters.get('id'):
             application_id = path_parameters['id']
             logger.info(f"Routing to: DELETE - DELETE /applications/{application_id}")
-            deleted = db.delete(application_id)
+            deleted = db.delete(application_id, user_id=user_id, expected_version=expected_version(event))
             if not deleted:
                 logger.warning(f"Delete failed. Application with ID {application_id} not found.")
                 return error_response('Application not found', status_code=404)
@@ -163,6 +261,9 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             logger.warning(f"Route not found for method {http_method} and path {path}")
             return error_response('Route not found', status_code=404)
 
+    except VersionConflict as e:
+        logger.warning(f"Version conflict: {e}")
+        return error_response(str(e), status_code=412)
     except ValueError as e:
         logger.error(f"Validation error: {e}", exc_info=True)
         return error_response(str(e), status_code=400)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from dataclasses import dataclass, asdict
 from decimal import Decimal
 
@@ -16,11 +16,15 @@ class Application:
     status: str = "applied"
     id: Optional[str] = None
     user_id: Optional[str] = None
+    # Bumped by every update; clients send it back in If-Match
+    version: int = 1
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
     VALID_STATUSES = {"applied", "interviewing",
                       "offer", "accepted", "rejected"}
+    # Index-only attributes written alongside the model fields
+    DERIVED_ATTRIBUTES = {"date_added", "resume_used_id", "user_status"}
 
     def to_dynamo_dict(self) -> Dict[str, Any]:
         """Convert to DynamoDB compatible dict (handles Decimals)."""
@@ -33,12 +37,66 @@ class Application:
         if isinstance(data.get('updated_at'), datetime):
             data['updated_at'] = data['updated_at'].isoformat()
 
+        # GSI key attributes derived from the model fields
+        data['date_added'] = data.get('created_at')
+        data['resume_used_id'] = data.get('resume_id')
+        if data.get('user_id') and data.get('status'):
+            data['user_status'] = self.user_status_key(data['user_id'], data['status'])
+
         # Remove None values
         return {k: v for k, v in data.items() if v is not None}
 
+    @staticmethod
+    def user_status_key(user_id: str, status: str) -> str:
+        """Partition key for UserStatusIndex."""
+        return f"{user_id}#{status}"
+
     @classmethod
     def from_dynamo_dict(cls, item: Dict[str, Any]) -> "Application":
         """Reconstruct object from DynamoDB item."""
+        item = {k: v for k, v in item.items() if k not in cls.DERIVED_ATTRIBUTES}
+        if 'version' in item:
+            item['version'] = int(item['version'])
+        if 'created_at' in item and isinstance(item['created_at'], str):
+            item['created_at'] = datetime.fromisoformat(item['created_at'])
+        if 'updated_at' in item and isinstance(item['updated_at'], str):
+            item['updated_at'] = datetime.fromisoformat(item['updated_at'])
+        return cls(**item)
+
+
+@dataclass
+class ImportJob:
+    id: str
+    user_id: str
+    s3_key: str
+    format: str = "csv"
+    status: str = "pending"
+    rows_processed: int = 0
+    rows_imported: int = 0
+    rows_failed: int = 0
+    errors: Optional[List[str]] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    VALID_FORMATS = {"csv", "ndjson"}
+    VALID_STATUSES = {"pending", "processing", "completed", "failed"}
+
+    def to_dynamo_dict(self) -> Dict[str, Any]:
+        """Convert to DynamoDB compatible dict."""
+        data = asdict(self)
+        if isinstance(data.get('created_at'), datetime):
+            data['created_at'] = data['created_at'].isoformat()
+        if isinstance(data.get('updated_at'), datetime):
+            data['updated_at'] = data['updated_at'].isoformat()
+        return {k: v for k, v in data.items() if v is not None}
+
+    @classmethod
+    def from_dynamo_dict(cls, item: Dict[str, Any]) -> "ImportJob":
+        """Reconstruct object from DynamoDB item."""
+        item = dict(item)
+        for counter in ('rows_processed', 'rows_imported', 'rows_failed'):
+            if counter in item:
+                item[counter] = int(item[counter])
         if 'created_at' in item and isinstance(item['created_at'], str):
             item['created_at'] = datetime.fromisoformat(item['created_at'])
         if 'updated_at' in item and isinstance(item['updated_at'], str):
@@ -0,0 +1,73 @@
+import os
+import hmac
+import json
+import base64
+import hashlib
+import logging
+from typing import Optional, Dict, Any
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+CURSOR_SECRET = os.environ.get("CURSOR_SECRET")
+if not CURSOR_SECRET:
+    # Fail closed: signing with a well-known fallback would let anyone forge cursors
+    raise RuntimeError("CURSOR_SECRET must be set to sign pagination cursors")
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _b64decode(value: str) -> bytes:
+    padding = '=' * (-len(value) % 4)
+    return base64.urlsafe_b64decode(value + padding)
+
+
+def _sign(payload: bytes) -> bytes:
+    return hmac.new(CURSOR_SECRET.encode('utf-8'), payload, hashlib.sha256).digest()
+
+
+def encode_cursor(last_key: Optional[Dict[str, Any]], user_id: str, scope: str = "") -> Optional[str]:
+    """
+    Turn a DynamoDB LastEvaluatedKey into an opaque, signed cursor token.
+
+    The cursor is bound to the user it was issued for so a token can never
+    be replayed against another user's partition, and to a scope (the index
+    queried) so it is only accepted by a query with the same key shape.
+    """
+    if not last_key:
+        return None
+    payload = json.dumps({'k': last_key, 'u': user_id, 's': scope}, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return f"{_b64encode(payload)}.{_b64encode(_sign(payload))}"
+
+
+def decode_cursor(cursor: Optional[str], user_id: str, scope: str = "") -> Optional[Dict[str, Any]]:
+    """
+    Verify a cursor token and return the ExclusiveStartKey it wraps.
+
+    Raises ValueError if the token is malformed, tampered with, or was
+    issued for a different user or scope.
+    """
+    if not cursor:
+        return None
+    try:
+        encoded_payload, encoded_signature = cursor.split('.', 1)
+        payload = _b64decode(encoded_payload)
+        signature = _b64decode(encoded_signature)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+    if not hmac.compare_digest(signature, _sign(payload)):
+        logger.warning("Rejected cursor with invalid signature")
+        raise ValueError("Invalid cursor")
+
+    data = json.loads(payload)
+    if data.get('u') != user_id:
+        logger.warning(f"Rejected cursor issued for a different user than {user_id}")
+        raise ValueError("Invalid cursor")
+    if data.get('s', "") != scope:
+        logger.warning(f"Rejected cursor issued for scope {data.get('s')!r}, expected {scope!r}")
+        raise ValueError("Invalid cursor")
+    return data.get('k')
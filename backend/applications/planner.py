@@ -0,0 +1,130 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Tuple
+from boto3.dynamodb.conditions import Key, Attr
+from models import Application
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+@dataclass
+class QueryPlan:
+    """The index, key condition and residual filter chosen for a query."""
+    index_name: str
+    key_attributes: Tuple[str, ...]
+    key_condition: Any
+    filter_expression: Any = None
+    steps: List[str] = field(default_factory=list)
+
+    def to_query_params(self) -> Dict[str, Any]:
+        params = {
+            'IndexName': self.index_name,
+            'KeyConditionExpression': self.key_condition,
+        }
+        if self.filter_expression is not None:
+            params['FilterExpression'] = self.filter_expression
+        return params
+
+    def explain(self) -> Dict[str, Any]:
+        """Debug-friendly description of the plan."""
+        return {
+            'index': self.index_name,
+            'key_attributes': list(self.key_attributes),
+            'has_filter': self.filter_expression is not None,
+            'steps': self.steps,
+        }
+
+
+# Key attributes (table key + index keys) for each GSI on the applications table
+INDEX_KEY_ATTRIBUTES = {
+    'UserIndex': ('id', 'user_id', 'date_added'),
+    'ResumeIndex': ('id', 'resume_used_id', 'date_added'),
+    'UserStatusIndex': ('id', 'user_status', 'date_added'),
+}
+
+
+def _and(filters: Any, condition: Any) -> Any:
+    return filters & condition if filters is not None else condition
+
+
+def plan_query(
+    user_id: str,
+    status: Optional[str] = None,
+    resume_id: Optional[str] = None,
+    job_title: Optional[str] = None,
+    company: Optional[str] = None,
+    location: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    min_pay: Optional[int] = None,
+    max_pay: Optional[int] = None
+) -> QueryPlan:
+    """
+    Pick the most selective index for a filter combination.
+
+    A resume id belongs to a single user, so ResumeIndex narrows the read to
+    that resume's applications. A status filter is an exact key on
+    UserStatusIndex (user_id#status), so only matching rows are read.
+    Everything else reads the user's partition on UserIndex. Date ranges are
+    always pushed into the key condition since every index uses date_added as
+    its range key; the remaining filters are applied as a FilterExpression.
+    """
+    steps = []
+    filters = None
+
+    if resume_id:
+        index_name = 'ResumeIndex'
+        key_condition = Key('resume_used_id').eq(resume_id)
+        # Guard against reading another user's rows through a guessed resume id
+        filters = _and(filters, Attr('user_id').eq(user_id))
+        steps.append(f"key: ResumeIndex resume_used_id = {resume_id}")
+    elif status:
+        index_name = 'UserStatusIndex'
+        user_status = Application.user_status_key(user_id, status)
+        key_condition = Key('user_status').eq(user_status)
+        steps.append(f"key: UserStatusIndex user_status = {user_status}")
+    else:
+        index_name = 'UserIndex'
+        key_condition = Key('user_id').eq(user_id)
+        steps.append(f"key: UserIndex user_id = {user_id}")
+
+    if date_from and date_to:
+        key_condition = key_condition & Key('date_added').between(date_from, date_to)
+        steps.append(f"key: date_added between {date_from} and {date_to}")
+    elif date_from:
+        key_condition = key_condition & Key('date_added').gte(date_from)
+        steps.append(f"key: date_added >= {date_from}")
+    elif date_to:
+        key_condition = key_condition & Key('date_added').lte(date_to)
+        steps.append(f"key: date_added <= {date_to}")
+
+    if status and index_name != 'UserStatusIndex':
+        filters = _and(filters, Attr('status').eq(status))
+        steps.append(f"filter: status = {status}")
+    if job_title:
+        filters = _and(filters, Attr('job_title').contains(job_title))
+        steps.append(f"filter: job_title contains {job_title}")
+    if company:
+        filters = _and(filters, Attr('company').contains(company))
+        steps.append(f"filter: company contains {company}")
+    if location:
+        filters = _and(filters, Attr('location').contains(location))
+        steps.append(f"filter: location contains {location}")
+    if min_pay is not None:
+        filters = _and(filters, Attr('pay').gte(min_pay))
+        steps.append(f"filter: pay >= {min_pay}")
+    if max_pay is not None:
+        filters = _and(filters, Attr('pay').lte(max_pay))
+        steps.append(f"filter: pay <= {max_pay}")
+
+    plan = QueryPlan(
+        index_name=index_name,
+        key_attributes=INDEX_KEY_ATTRIBUTES[index_name],
+        key_condition=key_condition,
+        filter_expression=filters,
+        steps=steps
+    )
+    logger.info(f"Query plan: {plan.explain()}")
+    return plan
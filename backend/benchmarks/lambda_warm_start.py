@@ -0,0 +1,171 @@
+"""
+Replay synthetic API Gateway events against the applications and resumes
+Lambdas and report cold-init time versus warm p50/p99 latency.
+
+DynamoDB and S3 are replaced by moto's in-process stand-in, so this measures
+handler and client overhead rather than network latency.
+
+    pip install boto3 moto
+    python backend/benchmarks/lambda_warm_start.py --invocations 500
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+import statistics
+from typing import Dict, Any, List, Callable
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Contents of the shared Lambda layer, found at /opt/python when deployed
+SHARED_DIR = os.path.join(BACKEND_DIR, "shared", "python")
+sys.path.append(SHARED_DIR)
+# Modules that both Lambdas define with the same name, plus the shared layer's
+LAMBDA_MODULES = ('lambda_function', 'db', 'models', 'clients', 'pagination', 'planner', 'batch', 'importer', 'exporter',
+                  'uploads', 'expressions')
+USER_ID = "bench-user"
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("RESUMES_S3_BUCKET", "bench-resumes")
+os.environ.setdefault("CURSOR_SECRET", "bench-cursor-secret-0123456789abcdef")
+
+
+def api_event(method: str, path: str, body: Dict[str, Any] = None,
+              query: Dict[str, str] = None, path_parameters: Dict[str, str] = None) -> Dict[str, Any]:
+    """Build a minimal HTTP API (payload v2) event."""
+    return {
+        'rawPath': path,
+        'requestContext': {
+            'http': {'method': method},
+            'authorizer': {'jwt': {'claims': {'sub': USER_ID}}}
+        },
+        'pathParameters': path_parameters,
+        'queryStringParameters': query,
+        'body': json.dumps(body) if body is not None else None
+    }
+
+
+def create_tables(dynamodb) -> None:
+    dynamodb.create_table(
+        TableName='applications',
+        AttributeDefinitions=[
+            {'AttributeName': 'id', 'AttributeType': 'S'},
+            {'AttributeName': 'user_id', 'AttributeType': 'S'},
+            {'AttributeName': 'date_added', 'AttributeType': 'S'},
+        ],
+        KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+        GlobalSecondaryIndexes=[{
+            'IndexName': 'UserIndex',
+            'KeySchema': [
+                {'AttributeName': 'user_id', 'KeyType': 'HASH'},
+                {'AttributeName': 'date_added', 'KeyType': 'RANGE'},
+            ],
+            'Projection': {'ProjectionType': 'ALL'},
+        }],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    dynamodb.create_table(
+        TableName='resumes',
+        AttributeDefinitions=[
+            {'AttributeName': 'id', 'AttributeType': 'S'},
+            {'AttributeName': 'user_id', 'AttributeType': 'S'},
+        ],
+        KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+        GlobalSecondaryIndexes=[{
+            'IndexName': 'UserIndex',
+            'KeySchema': [{'AttributeName': 'user_id', 'KeyType': 'HASH'}],
+            'Projection': {'ProjectionType': 'ALL'},
+        }],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    dynamodb.create_table(
+        TableName='resume_contents',
+        AttributeDefinitions=[
+            {'AttributeName': 'user_id', 'AttributeType': 'S'},
+            {'AttributeName': 'sha256', 'AttributeType': 'S'},
+        ],
+        KeySchema=[
+            {'AttributeName': 'user_id', 'KeyType': 'HASH'},
+            {'AttributeName': 'sha256', 'KeyType': 'RANGE'},
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
+
+
+def cold_import(service: str):
+    """Import a Lambda's handler module from scratch, as a fresh container would."""
+    for name in LAMBDA_MODULES:
+        sys.modules.pop(name, None)
+    service_dir = os.path.join(BACKEND_DIR, service)
+    sys.path.insert(0, service_dir)
+    try:
+        return importlib.import_module('lambda_function')
+    finally:
+        sys.path.remove(service_dir)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(service: str, events: Callable[[int], Dict[str, Any]], invocations: int) -> Dict[str, float]:
+    start = time.perf_counter()
+    module = cold_import(service)
+    module.lambda_handler(events(0), None)
+    cold_ms = (time.perf_counter() - start) * 1000
+
+    samples = []
+    for i in range(1, invocations + 1):
+        start = time.perf_counter()
+        response = module.lambda_handler(events(i), None)
+        samples.append((time.perf_counter() - start) * 1000)
+        if response['statusCode'] >= 500:
+            raise RuntimeError(f"{service} handler failed: {response['body']}")
+
+    return {
+        'cold_init_ms': round(cold_ms, 2),
+        'warm_p50_ms': round(percentile(samples, 50), 3),
+        'warm_p99_ms': round(percentile(samples, 99), 3),
+        'warm_mean_ms': round(statistics.mean(samples), 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--invocations', type=int, default=200)
+    args = parser.parse_args()
+
+    try:
+        import boto3
+        from moto import mock_aws
+    except ImportError:
+        sys.exit("This benchmark needs boto3 and moto: pip install boto3 moto")
+
+    with mock_aws():
+        create_tables(boto3.client('dynamodb'))
+        boto3.client('s3').create_bucket(Bucket=os.environ["RESUMES_S3_BUCKET"])
+
+        def application_events(i: int) -> Dict[str, Any]:
+            if i % 4 == 0:
+                return api_event('POST', '/applications', body={'job_title': f"Engineer {i}", 'company': "Acme"})
+            return api_event('GET', '/applications', query={'limit': '20'})
+
+        def resume_events(i: int) -> Dict[str, Any]:
+            if i % 2 == 0:
+                return api_event('POST', '/resumes/upload-url', body={'file_name': f"resume-{i}.pdf"})
+            return api_event('GET', '/resumes')
+
+        results = {
+            'applications': run('applications', application_events, args.invocations),
+            'resumes': run('resumes', resume_events, args.invocations),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Drive the resumable multipart resume upload API end to end against moto's
+local S3 and DynamoDB stand-in, and compare it with a single presigned PUT
+on a simulated lossy connection.
+
+The connection drops a transfer with probability --drop-rate per MiB sent.
+A single PUT restarts from zero after every drop; the multipart flow only
+re-sends the part that dropped, asking the API for what is still missing.
+Bytes on the wire and the wall time at --bandwidth-kbps are simulated; the S3
+calls, API routes and completion checks are real.
+
+    pip install boto3 moto requests
+    python backend/benchmarks/resumable_upload.py --size-mb 20 --drop-rate 0.15
+"""
+import os
+import sys
+import json
+import random
+import hashlib
+import argparse
+import statistics
+from typing import Dict, Any, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from lambda_warm_start import api_event, cold_import, create_tables  # noqa: E402
+
+MIB = 1024 * 1024
+# Give up on a single PUT after this many restarts, as a user would
+MAX_PUT_ATTEMPTS = 50
+
+
+class LossyLink:
+    """Counts bytes sent and drops a transfer part-way through at random."""
+
+    def __init__(self, drop_rate: float, seed: int):
+        self.drop_rate = drop_rate
+        self.rng = random.Random(seed)
+        self.bytes_sent = 0
+
+    def send(self, size: int) -> bool:
+        survive = (1 - self.drop_rate) ** (size / MIB)
+        if self.rng.random() < survive:
+            self.bytes_sent += size
+            return True
+        self.bytes_sent += int(size * self.rng.random())
+        return False
+
+
+def body_of(response: Dict[str, Any]) -> Dict[str, Any]:
+    if response['statusCode'] >= 300:
+        raise RuntimeError(f"API error {response['statusCode']}: {response['body']}")
+    return json.loads(response['body'])
+
+
+def single_put(module, requests, data: bytes, link: LossyLink) -> Dict[str, Any]:
+    plan = body_of(module.lambda_handler(api_event(
+        'POST', '/resumes/upload-url',
+        body={'file_name': 'portfolio.pdf', 'content_type': 'application/pdf', 'content_length': len(data)}), None))
+    for attempt in range(1, MAX_PUT_ATTEMPTS + 1):
+        if link.send(len(data)):
+            requests.put(plan['presigned_url'], data=data,
+                         headers={'Content-Type': 'application/pdf'}).raise_for_status()
+            return {'completed': True, 'attempts': attempt}
+    return {'completed': False, 'attempts': MAX_PUT_ATTEMPTS}
+
+
+def start_multipart(module, data: bytes) -> Dict[str, Any]:
+    return body_of(module.lambda_handler(api_event(
+        'POST', '/resumes/uploads',
+        body={'file_name': 'portfolio.pdf', 'content_type': 'application/pdf', 'content_length': len(data),
+              'sha256': hashlib.sha256(data).hexdigest()}), None))
+
+
+def multipart(module, requests, data: bytes, link: LossyLink) -> Dict[str, Any]:
+    plan = start_multipart(module, data)
+    resume_id, part_size, parts = plan['resume_id'], plan['part_size'], plan['parts']
+    rounds = 0
+    while parts:
+        rounds += 1
+        for part in parts:
+            start = (part['part_number'] - 1) * part_size
+            if link.send(part['size']):
+                requests.put(part['url'], data=data[start:start + part['size']]).raise_for_status()
+        progress = body_of(module.lambda_handler(api_event(
+            'GET', f"/resumes/uploads/{resume_id}", path_parameters={'id': resume_id}), None))
+        parts = progress['parts']
+    body_of(module.lambda_handler(api_event(
+        'POST', f"/resumes/uploads/{resume_id}/complete", path_parameters={'id': resume_id}), None))
+    return {'completed': True, 'rounds': rounds, 'resume_id': resume_id}
+
+
+def check_limits(module, requests, s3) -> Dict[str, Any]:
+    """Oversized declarations fail at presign time; mismatched parts fail completion and are aborted."""
+    oversized = module.lambda_handler(api_event(
+        'POST', '/resumes/uploads',
+        body={'file_name': 'huge.pdf', 'content_length': sys.modules['uploads'].MAX_RESUME_BYTES + 1,
+              'sha256': "0" * 64}), None)
+    plan = start_multipart(module, b"x" * 6 * MIB)
+    for part in plan['parts']:
+        # The stand-in doesn't check signatures, so a short part gets through to completion
+        requests.put(part['url'], data=b"x" * (part['size'] - 1)).raise_for_status()
+    resume_id = plan['resume_id']
+    mismatched = module.lambda_handler(api_event(
+        'POST', f"/resumes/uploads/{resume_id}/complete", path_parameters={'id': resume_id}), None)
+    resume = module.db.get_by_id(resume_id)
+    return {
+        'oversized_status': oversized['statusCode'],
+        'mismatched_status': mismatched['statusCode'],
+        'mismatched_resume_status': resume.upload_status,
+        'open_uploads': len(s3.list_multipart_uploads(Bucket=os.environ["RESUMES_S3_BUCKET"]).get('Uploads', [])),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size-mb', type=float, default=20)
+    parser.add_argument('--drop-rate', type=float, default=0.15, help="chance a transfer drops per MiB sent")
+    parser.add_argument('--bandwidth-kbps', type=float, default=1000, help="simulated uplink in kilobits/s")
+    parser.add_argument('--trials', type=int, default=20)
+    args = parser.parse_args()
+
+    try:
+        import boto3
+        import requests
+        from moto import mock_aws
+    except ImportError:
+        sys.exit("This benchmark needs boto3, moto and requests: pip install boto3 moto requests")
+
+    data = random.Random(0).randbytes(int(args.size_mb * MIB))
+    seconds_per_byte = 8 / (args.bandwidth_kbps * 1000)
+    with mock_aws():
+        create_tables(boto3.client('dynamodb'))
+        s3 = boto3.client('s3')
+        s3.create_bucket(Bucket=os.environ["RESUMES_S3_BUCKET"])
+        module = cold_import('resumes')
+
+        results: Dict[str, List[Dict[str, Any]]] = {'single_put': [], 'multipart': []}
+        for trial in range(args.trials):
+            # A different file each trial, or later uploads would be deduplicated
+            trial_data = trial.to_bytes(4, 'big') + data[4:]
+            for name, upload in (('single_put', single_put), ('multipart', multipart)):
+                link = LossyLink(args.drop_rate, seed=trial)
+                outcome = upload(module, requests, trial_data, link)
+                outcome['wire_mb'] = link.bytes_sent / MIB
+                outcome['wall_s'] = link.bytes_sent * seconds_per_byte
+                results[name].append(outcome)
+
+        # The stored object is byte-identical to the file
+        last = module.db.get_by_id(results['multipart'][-1]['resume_id'])
+        stored = s3.get_object(Bucket=os.environ["RESUMES_S3_BUCKET"], Key=last.s3_key)['Body'].read()
+        assert hashlib.sha256(stored).hexdigest() == last.content_hash, "multipart object differs"
+        limits = check_limits(module, requests, s3)
+
+    report = {}
+    for name, outcomes in results.items():
+        report[name] = {
+            'success_rate': sum(o['completed'] for o in outcomes) / len(outcomes),
+            'median_wire_mb': round(statistics.median(o['wire_mb'] for o in outcomes), 1),
+            'median_wall_s': round(statistics.median(o['wall_s'] for o in outcomes), 1),
+        }
+    report['limits'] = limits
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,25 @@
-import boto3
 import uuid
 import logging
-from datetime import datetime
-from typing import Optional, List
-from boto3.dynamodb.conditions import Key
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any, Iterable
+from boto3.dynamodb.conditions import Attr, Key
 from botocore.exceptions import ClientError
-from models import Resume
+from clients import get_dynamodb_resource, get_table
+from expressions import build_update, raise_for_conflict
+from models import Resume, ResumeContent
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# A pending content claim untouched for this long is treated as an abandoned upload
+CONTENT_CLAIM_TTL = timedelta(days=1)
+
 
 class ResumeDynamoDB:
     def __init__(self, table_name: str = "resumes"):
-        self.dynamodb = boto3.resource('dynamodb')
-        self.table = self.dynamodb.Table(table_name)
+        self.dynamodb = get_dynamodb_resource()
+        self.table = get_table(table_name)
         logger.info(f"Initialized ResumeDynamoDB with table: {table_name}")
 
     def create(self, resume: Resume) -> Resume:
@@ -61,25 +65,195 @@ class ResumeDynamoDB:
             logger.error(f"Error querying resumes for user {user_id}: {e.response['Error']['Code']}", exc_info=True)
             return []
 
+    def update(self, resume_id: str, updates: Dict[str, Any], user_id: Optional[str] = None,
+               expected_version: Optional[int] = None, remove: Iterable[str] = ()) -> Optional[Resume]:
+        """
+        SET `updates` and REMOVE `remove` in one conditional update_item that
+        also bumps the version. With user_id the write only applies to the
+        owner's resume, and with expected_version it raises VersionConflict if
+        the resume changed since the caller read it. Returns None when the
+        resume doesn't exist or belongs to someone else.
+        """
+        logger.info(f"Updating resume ID: {resume_id} with fields: {sorted(updates)}")
+        updates = dict(updates, updated_at=datetime.utcnow().isoformat())
+        try:
+            response = self.table.update_item(Key={'id': resume_id}, ReturnValues="ALL_NEW",
+                                              **build_update(updates, remove, user_id, expected_version))
+            logger.info(f"Successfully updated resume ID: {resume_id}")
+            return Resume.from_dynamo_dict(response['Attributes'])
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                raise_for_conflict(e.response.get('Item'), user_id)
+            logger.error(f"Error updating resume {resume_id}: {e.response['Error']['Code']}", exc_info=True)
+            return None
+
     def update_status(self, resume_id: str, status: str) -> Optional[Resume]:
         """Update the upload status of a resume."""
         logger.info(f"Updating status for resume ID: {resume_id} to {status}")
         if status not in Resume.VALID_STATUSES:
             logger.warning(f"Invalid status '{status}' provided.")
             raise ValueError(f"Invalid status: {status}")
+        return self.update(resume_id, {'upload_status': status})
+
+    def record_extraction(self, resume_id: str, text: str, text_stats: Dict[str, Any],
+                          sections: List[Dict[str, Any]]) -> Optional[Resume]:
+        """Store extracted text and mark the upload completed in one write."""
+        logger.info(f"Recording extracted text for resume ID: {resume_id}")
+        return self.update(resume_id, {'text': text, 'text_stats': text_stats, 'sections': sections,
+                                       'upload_status': "completed"}, remove=['extraction_error'])
+
+    def record_extraction_failure(self, resume_id: str, error: str) -> Optional[Resume]:
+        """Mark the upload failed and keep the reason for the UI."""
+        logger.info(f"Recording extraction failure for resume ID: {resume_id}")
+        return self.update(resume_id, {'upload_status': "failed", 'extraction_error': error})
+
+    def clear_upload(self, resume_id: str, status: Optional[str] = None,
+                     user_id: Optional[str] = None) -> Optional[Resume]:
+        """Forget a finished or aborted multipart upload, optionally setting the status too."""
+        logger.info(f"Clearing multipart upload for resume ID: {resume_id}")
+        updates = {}
+        if status:
+            if status not in Resume.VALID_STATUSES:
+                raise ValueError(f"Invalid status: {status}")
+            updates['upload_status'] = status
+        return self.update(resume_id, updates, user_id=user_id, remove=['upload_id'])
+
+    def update_status_for_content(self, user_id: str, sha256: str, status: str,
+                                  error: Optional[str] = None, from_status: Optional[str] = None) -> int:
+        """
+        Set the status of every one of a user's resumes that references the
+        given content, or only of those currently in `from_status`.
+        """
+        if status not in Resume.VALID_STATUSES:
+            raise ValueError(f"Invalid status: {status}")
+        filter_expression = Attr('content_hash').eq(sha256)
+        if from_status:
+            filter_expression &= Attr('upload_status').eq(from_status)
+        params = {
+            'IndexName': 'UserIndex',
+            'KeyConditionExpression': Key('user_id').eq(user_id),
+            'FilterExpression': filter_expression,
+            'ProjectionExpression': 'id',
+        }
+        updates = {'upload_status': status}
+        if error:
+            updates['extraction_error'] = error
+        updated = 0
+        while True:
+            response = self.table.query(**params)
+            for item in response.get('Items', []):
+                if self.update(item['id'], updates, user_id=user_id, remove=[] if error else ['extraction_error']):
+                    updated += 1
+            if 'LastEvaluatedKey' not in response:
+                break
+            params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        logger.info(f"Set {updated} resumes referencing content {sha256} to {status}")
+        return updated
+
+
+class ResumeContentDynamoDB:
+    def __init__(self, table_name: str = "resume_contents"):
+        self.table = get_table(table_name)
+        logger.info(f"Initialized ResumeContentDynamoDB with table: {table_name}")
+
+    def get(self, user_id: str, sha256: str) -> Optional[ResumeContent]:
+        logger.info(f"Getting resume content {sha256} for user: {user_id}")
+        try:
+            item = self.table.get_item(Key={'user_id': user_id, 'sha256': sha256}).get('Item')
+            return ResumeContent.from_dynamo_dict(item) if item else None
+        except ClientError as e:
+            logger.error(f"Error getting resume content {sha256}: {e.response['Error']['Code']}", exc_info=True)
+            return None
+
+    def claim(self, content: ResumeContent) -> bool:
+        """
+        Record a pending upload of `content` unless another upload of the same
+        bytes already holds the record. Failed records and pending ones older
+        than CONTENT_CLAIM_TTL are taken over. Returns False when not claimed.
+        """
+        logger.info(f"Claiming resume content {content.sha256} for user: {content.user_id}")
+        now = datetime.utcnow()
+        content.created_at = content.created_at or now
+        content.updated_at = now
+        try:
+            self.table.put_item(
+                Item=content.to_dynamo_dict(),
+                ConditionExpression="attribute_not_exists(sha256) OR upload_status = :failed OR "
+                                    "(upload_status = :pending AND updated_at < :stale_before)",
+                ExpressionAttributeValues={
+                    ':failed': 'failed',
+                    ':pending': 'pending',
+                    ':stale_before': (now - CONTENT_CLAIM_TTL).isoformat()
+                }
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            logger.info(f"Resume content {content.sha256} is already claimed")
+            return False
 
+    def release(self, user_id: str, sha256: str, error: str, from_status: str = "pending") -> None:
+        """
+        Mark a claim failed so the next upload of the same bytes can take it
+        over. Only a record still in `from_status` is changed.
+        """
+        logger.info(f"Releasing claim on resume content {sha256} for user: {user_id}")
         try:
-            response = self.table.update_item(
-                Key={'id': resume_id},
-                UpdateExpression="SET upload_status = :status, updated_at = :updated_at",
+            self.table.update_item(
+                Key={'user_id': user_id, 'sha256': sha256},
+                UpdateExpression="SET upload_status = :failed, extraction_error = :error, updated_at = :updated_at",
+                ConditionExpression="upload_status = :from_status",
                 ExpressionAttributeValues={
-                    ':status': status,
+                    ':failed': 'failed',
+                    ':from_status': from_status,
+                    ':error': error,
                     ':updated_at': datetime.utcnow().isoformat()
-                },
-                ReturnValues="ALL_NEW"
+                }
             )
-            logger.info(f"Successfully updated status for resume ID: {resume_id}")
-            return Resume.from_dynamo_dict(response['Attributes'])
         except ClientError as e:
-            logger.error(f"Error updating status for resume {resume_id}: {e.response['Error']['Code']}", exc_info=True)
-            return None
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+
+    def put(self, content: ResumeContent) -> ResumeContent:
+        """Create or replace the content record once its object has been verified and extracted."""
+        logger.info(f"Storing resume content {content.sha256} for user: {content.user_id}")
+        now = datetime.utcnow()
+        content.created_at = content.created_at or now
+        content.updated_at = now
+        self.table.put_item(Item=content.to_dynamo_dict())
+        return content
+
+
+class AnalysisCacheDynamoDB:
+    """The agent service's analysis cache, partitioned by tag."""
+
+    def __init__(self, table_name: str = "analysis_cache"):
+        self.table = get_table(table_name)
+        logger.info(f"Initialized AnalysisCacheDynamoDB with table: {table_name}")
+
+    def invalidate_user(self, user_id: str) -> int:
+        """
+        Drop a user's cached resume assistant answers after one of their
+        resumes changes. The tag must match the agent's assistant_cache_tag.
+        """
+        tag = f"resume_assistant#{user_id}"
+        params = {"KeyConditionExpression": Key('tag').eq(tag), "ProjectionExpression": "#key",
+                  "ExpressionAttributeNames": {"#key": "key"}}
+        deleted = 0
+        try:
+            with self.table.batch_writer() as batch:
+                while True:
+                    response = self.table.query(**params)
+                    for item in response.get('Items', []):
+                        batch.delete_item(Key={'tag': tag, 'key': item['key']})
+                        deleted += 1
+                    if 'LastEvaluatedKey' not in response:
+                        break
+                    params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        except ClientError as e:
+            # Cached answers are also keyed on the user's resumes, so a failed drop only delays cleanup
+            logger.error(f"Error dropping cached answers for user {user_id}: {e.response['Error']['Code']}",
+                         exc_info=True)
+        logger.info(f"Dropped {deleted} cached assistant answers for user {user_id}")
+        return deleted
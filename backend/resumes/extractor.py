@@ -0,0 +1,310 @@
+import io
+import hashlib
+import os
+import re
+import logging
+import zipfile
+import unicodedata
+from decimal import Decimal
+from typing import Any, Dict, List, Tuple
+from urllib.parse import unquote_plus
+from xml.etree import ElementTree
+
+from pypdf import PdfReader
+
+from clients import get_s3_client
+from db import AnalysisCacheDynamoDB, ResumeDynamoDB, ResumeContentDynamoDB
+from models import ResumeContent
+from uploads import CONTENT_PREFIX, MAX_RESUME_BYTES
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# DynamoDB rejects items over 400 KB; extracted text gets whatever the rest of the item leaves
+MAX_ITEM_BYTES = 400 * 1024
+# Headroom for attributes written after extraction (updated_at, version, a renamed file)
+ITEM_SIZE_MARGIN = 8 * 1024
+# Attributes that extract_resume fills in
+EXTRACTION_FIELDS = ("text", "text_stats", "sections", "extraction_error")
+# Same rough chars-per-token ratio the agent uses for its context budget
+CHARS_PER_TOKEN = 4
+MAX_HEADING_WORDS = 4
+
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+# Canonical section name for each heading spelling seen on resumes
+SECTION_HEADINGS = {
+    "summary": ["summary", "professional summary", "profile", "professional profile", "about me", "objective",
+                "career objective"],
+    "experience": ["experience", "work experience", "professional experience", "employment", "employment history",
+                   "work history", "relevant experience"],
+    "education": ["education", "academic background", "education and training"],
+    "skills": ["skills", "technical skills", "core competencies", "competencies", "key skills", "technologies"],
+    "projects": ["projects", "personal projects", "selected projects", "portfolio"],
+    "certifications": ["certifications", "certificates", "licenses and certifications", "licenses & certifications"],
+    "awards": ["awards", "honors", "honors and awards", "achievements"],
+    "publications": ["publications", "research"],
+    "volunteering": ["volunteering", "volunteer experience", "volunteer work"],
+    "languages": ["languages"],
+    "interests": ["interests", "hobbies"],
+}
+_HEADINGS = {spelling: name for name, spellings in SECTION_HEADINGS.items() for spelling in spellings}
+
+_BULLETS = re.compile(r"^[•▪●◦‣⁃∙·*\-–—]\s*")
+_SPACES = re.compile(r"[^\S\n]+")
+
+db = ResumeDynamoDB(os.environ.get("RESUMES_TABLE", "resumes"))
+contents = ResumeContentDynamoDB(os.environ.get("RESUME_CONTENTS_TABLE", "resume_contents"))
+# The agent's cached resume answers, when it keeps them in DynamoDB
+analysis_cache = AnalysisCacheDynamoDB(os.environ["ANALYSIS_CACHE_TABLE"]) \
+    if os.environ.get("ANALYSIS_CACHE_TABLE") else None
+
+
+def _parse_resume_key(key: str) -> Tuple[str, str, str]:
+    """Per-resume upload keys are `{user_id}/{resume_id}/{file_name}` (see POST /resumes/upload-url)."""
+    user_id, resume_id, file_name = key.split('/', 2)
+    return user_id, resume_id, file_name
+
+
+def _parse_content_key(key: str) -> Tuple[str, str, str]:
+    """
+    Content-addressed keys are `{user_id}/content/{sha256}` (see uploads.content_key).
+    Keys written before the file name moved onto the content record end in `/{file_name}`.
+    """
+    user_id, _, sha256, *file_name = key.split('/', 3)
+    return user_id, sha256, file_name[0] if file_name else ""
+
+
+def extract_pdf(data: bytes) -> Tuple[str, int]:
+    reader = PdfReader(io.BytesIO(data))
+    if reader.is_encrypted:
+        raise ValueError("Encrypted PDFs are not supported")
+    pages = [page.extract_text() or "" for page in reader.pages]
+    return "\n".join(pages), len(pages)
+
+
+def extract_docx(data: bytes) -> Tuple[str, int]:
+    """Paragraph text from word/document.xml; tabs and line breaks are kept."""
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        root = ElementTree.fromstring(archive.read("word/document.xml"))
+    paragraphs = []
+    for paragraph in root.iter(f"{WORD_NAMESPACE}p"):
+        parts = []
+        for node in paragraph.iter():
+            if node.tag == f"{WORD_NAMESPACE}t":
+                parts.append(node.text or "")
+            elif node.tag == f"{WORD_NAMESPACE}tab":
+                parts.append("\t")
+            elif node.tag in (f"{WORD_NAMESPACE}br", f"{WORD_NAMESPACE}cr"):
+                parts.append("\n")
+        paragraphs.append("".join(parts))
+    # Word doesn't store page breaks reliably; count explicit ones
+    pages = 1 + sum(1 for node in root.iter(f"{WORD_NAMESPACE}br")
+                    if node.get(f"{WORD_NAMESPACE}type") == "page")
+    return "\n".join(paragraphs), pages
+
+
+def extract_raw_text(file_name: str, data: bytes) -> Tuple[str, int]:
+    """Dispatch on the file's magic bytes, falling back to its extension for plain text."""
+    if data.startswith(b"%PDF"):
+        return extract_pdf(data)
+    if data.startswith(b"PK") and file_name.lower().endswith(".docx"):
+        return extract_docx(data)
+    if file_name.lower().endswith((".txt", ".md")):
+        return data.decode("utf-8-sig", errors="replace"), 1
+    raise ValueError(f"Unsupported resume format: {file_name}")
+
+
+def normalize_text(text: str) -> str:
+    """
+    NFKC-fold ligatures and full-width characters, strip bullet glyphs,
+    collapse runs of spaces and keep at most one blank line between blocks.
+    """
+    text = unicodedata.normalize("NFKC", text).replace("\r\n", "\n").replace("\r", "\n")
+    lines = []
+    for line in text.split("\n"):
+        line = _BULLETS.sub("", _SPACES.sub(" ", line).strip())
+        if line or (lines and lines[-1]):
+            lines.append(line)
+    return "\n".join(lines).strip()
+
+
+def _heading_name(line: str) -> str:
+    candidate = line.strip().rstrip(":").lower()
+    if not candidate or len(candidate.split()) > MAX_HEADING_WORDS:
+        return ""
+    return _HEADINGS.get(candidate, "")
+
+
+def detect_sections(text: str) -> List[Dict[str, Any]]:
+    """
+    Recognised section headings as character spans into `text`, so a consumer
+    can slice out just the experience or skills block.
+    """
+    sections = []
+    offset = 0
+    for line in text.split("\n"):
+        name = _heading_name(line)
+        if name:
+            if sections:
+                sections[-1]["length"] = offset - sections[-1]["offset"]
+            sections.append({"name": name, "heading": line.strip(), "offset": offset, "length": 0})
+        offset += len(line) + 1
+    if sections:
+        sections[-1]["length"] = len(text) - sections[-1]["offset"]
+    return sections
+
+
+def text_stats(text: str, pages: int, truncated: bool) -> Dict[str, Any]:
+    return {
+        "chars": len(text),
+        "words": len(text.split()),
+        "lines": text.count("\n") + 1 if text else 0,
+        "estimated_tokens": len(text) // CHARS_PER_TOKEN,
+        "pages": pages,
+        "truncated": truncated,
+    }
+
+
+def attribute_size(value: Any) -> int:
+    """
+    Upper bound on the bytes DynamoDB counts for a value: UTF-8 length for
+    strings, up to 21 bytes per number, and 3 bytes plus 1 per element of
+    overhead for maps and lists (map keys count like attribute names).
+    """
+    if value is None or isinstance(value, bool):
+        return 1
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (int, float, Decimal)):
+        return 21
+    if isinstance(value, dict):
+        return 3 + sum(len(str(k).encode("utf-8")) + attribute_size(v) + 1 for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return 3 + sum(attribute_size(v) + 1 for v in value)
+    return len(str(value).encode("utf-8"))
+
+
+def extraction_budget(item: Dict[str, Any]) -> int:
+    """Bytes left for the extraction fields on `item` (a Resume or ResumeContent as stored)."""
+    rest = {k: v for k, v in item.items() if k not in EXTRACTION_FIELDS}
+    return MAX_ITEM_BYTES - ITEM_SIZE_MARGIN - attribute_size(rest)
+
+
+def _truncate_utf8(text: str, max_bytes: int) -> str:
+    return text.encode("utf-8")[:max_bytes].decode("utf-8", errors="ignore")
+
+
+def extract_resume(file_name: str, data: bytes, max_bytes: int) -> Dict[str, Any]:
+    """
+    Text, stats and sections for a file, truncated so the three together
+    stay within `max_bytes` as DynamoDB counts them.
+    """
+    raw, pages = extract_raw_text(file_name, data)
+    full_text = normalize_text(raw)
+    if not full_text:
+        raise ValueError("No text could be extracted; the file may be a scanned image")
+
+    text_budget = max_bytes
+    while text_budget > 0:
+        text = _truncate_utf8(full_text, text_budget)
+        extraction = {"text": text, "text_stats": text_stats(text, pages, len(text) < len(full_text)),
+                      "sections": detect_sections(text)}
+        overflow = attribute_size(extraction) - max_bytes
+        if overflow <= 0:
+            return extraction
+        # Stats and sections shrink with the text, so cutting the overflow converges
+        text_budget = min(text_budget, attribute_size(text)) - overflow
+    raise ValueError("Resume item has no room left for extracted text")
+
+
+def _read_object(bucket: str, key: str) -> bytes:
+    obj = get_s3_client().get_object(Bucket=bucket, Key=key)
+    # Upload URLs already enforce the limit; this guards objects written any other way
+    if obj['ContentLength'] > MAX_RESUME_BYTES:
+        raise ValueError(f"Resume is larger than {MAX_RESUME_BYTES // (1024 * 1024)} MB")
+    return obj['Body'].read()
+
+
+def process_upload(bucket: str, key: str) -> None:
+    user_id, resume_id, file_name = _parse_resume_key(key)
+    resume = db.get_by_id(resume_id)
+    if not resume or resume.user_id != user_id or resume.s3_key != key:
+        logger.warning(f"No resume matches uploaded object {key}; ignoring")
+        return
+
+    try:
+        extraction = extract_resume(file_name, _read_object(bucket, key), extraction_budget(resume.to_dynamo_dict()))
+        db.record_extraction(resume_id, **extraction)
+        logger.info(f"Extracted resume {resume_id}: {extraction['text_stats']}")
+    except Exception as e:
+        logger.error(f"Text extraction failed for resume {resume_id}: {e}", exc_info=True)
+        db.record_extraction_failure(resume_id, str(e))
+    if analysis_cache:
+        analysis_cache.invalidate_user(user_id)
+
+
+def process_content_upload(bucket: str, key: str) -> None:
+    """
+    Verify a content-addressed upload against the SHA-256 its key claims,
+    extract it once, and point every resume that references it at the result.
+    """
+    user_id, sha256, file_name = _parse_content_key(key)
+    data = _read_object(bucket, key)
+    existing = contents.get(user_id, sha256)
+    completed = existing is not None and existing.upload_status == "completed"
+    if hashlib.sha256(data).hexdigest() != sha256:
+        logger.warning(f"Uploaded object {key} does not match its SHA-256")
+        # Never leave bytes under a hash they don't have, even at the verified content's own key
+        get_s3_client().delete_object(Bucket=bucket, Key=key)
+        if not completed:
+            contents.release(user_id, sha256, "Uploaded file does not match its SHA-256")
+        elif existing.s3_key == key:
+            # The verified file was overwritten and there is no other copy of it;
+            # let the next upload of the same bytes store it again
+            logger.warning(f"Verified content {sha256} was overwritten at {key}; releasing it for re-upload")
+            contents.release(user_id, sha256, "Stored file was overwritten; upload it again", from_status="completed")
+        db.update_status_for_content(user_id, sha256, "failed", "Uploaded file does not match its SHA-256",
+                                     from_status="pending")
+        return
+
+    if completed:
+        # Same bytes uploaded again (e.g. two uploads raced); the text is already there
+        logger.info(f"Content {sha256} already extracted; skipping")
+        if existing.s3_key != key:
+            get_s3_client().delete_object(Bucket=bucket, Key=key)
+        db.update_status_for_content(user_id, sha256, "completed", from_status="pending")
+        if analysis_cache:
+            analysis_cache.invalidate_user(user_id)
+        return
+
+    content = ResumeContent(user_id=user_id, sha256=sha256, s3_key=key, content_length=len(data),
+                            file_name=existing.file_name if existing and existing.file_name else file_name,
+                            created_at=existing.created_at if existing else None)
+    try:
+        extraction = extract_resume(content.file_name or "", data, extraction_budget(content.to_dynamo_dict()))
+        content.text, content.text_stats, content.sections = (
+            extraction["text"], extraction["text_stats"], extraction["sections"])
+        logger.info(f"Extracted content {sha256}: {extraction['text_stats']}")
+    except Exception as e:
+        logger.error(f"Text extraction failed for content {sha256}: {e}", exc_info=True)
+        content.upload_status, content.extraction_error = "failed", str(e)
+    contents.put(content)
+    db.update_status_for_content(user_id, sha256, content.upload_status, content.extraction_error)
+    if analysis_cache:
+        analysis_cache.invalidate_user(user_id)
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> None:
+    """Entry point for S3 ObjectCreated events on the resumes bucket."""
+    for record in event.get('Records', []):
+        bucket = record['s3']['bucket']['name']
+        key = unquote_plus(record['s3']['object']['key'])
+        logger.info(f"Processing resume upload s3://{bucket}/{key}")
+        if key.split('/', 2)[1:2] == [CONTENT_PREFIX]:
+            process_content_upload(bucket, key)
+        else:
+            process_upload(bucket, key)
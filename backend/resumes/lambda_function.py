@@ -1,12 +1,16 @@
 import json
 import logging
 import os
-import boto3
 import uuid
-from typing import Dict, Any
+from decimal import Decimal
+from typing import Dict, Any, Optional
 
-from db import ResumeDynamoDB
-from models import Resume
+from clients import get_s3_client
+from db import AnalysisCacheDynamoDB, ResumeDynamoDB, ResumeContentDynamoDB
+from expressions import VersionConflict
+from models import Resume, ResumeContent
+from uploads import (abort_upload, complete_upload, content_key, part_urls, plan_parts, start_upload,
+                     upload_progress, validate_content_length, validate_sha256, PART_SIZE, PART_URL_EXPIRY)
 
 # Configure logging
 logger = logging.getLogger()
@@ -14,19 +18,35 @@ logger.setLevel(logging.INFO)
 
 # Initialize clients
 S3_BUCKET = os.environ.get("RESUMES_S3_BUCKET")
-db = ResumeDynamoDB()
+db = ResumeDynamoDB(os.environ.get("RESUMES_TABLE", "resumes"))
+contents = ResumeContentDynamoDB(os.environ.get("RESUME_CONTENTS_TABLE", "resume_contents"))
+# The agent's cached resume answers, when it keeps them in DynamoDB
+analysis_cache = AnalysisCacheDynamoDB(os.environ["ANALYSIS_CACHE_TABLE"]) \
+    if os.environ.get("ANALYSIS_CACHE_TABLE") else None
 
 
-def success_response(data: Any, status_code: int = 200) -> Dict[str, Any]:
+class DecimalEncoder(json.JSONEncoder):
+    """Custom JSON encoder to handle Decimal types (extracted text stats)."""
+    def default(self, o):
+        if isinstance(o, Decimal):
+            return int(o) if o % 1 == 0 else float(o)
+        return super(DecimalEncoder, self).default(o)
+
+
+def success_response(data: Any, status_code: int = 200, version: Optional[int] = None) -> Dict[str, Any]:
+    headers = {
+        'Content-Type': 'application/json',
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Headers': 'Content-Type,If-Match',
+        'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS,PATCH',
+        'Access-Control-Expose-Headers': 'ETag'
+    }
+    if version is not None:
+        headers['ETag'] = f'"{version}"'
     return {
         'statusCode': status_code,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Headers': 'Content-Type',
-            'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS,PATCH'
-        },
-        'body': json.dumps(data)
+        'headers': headers,
+        'body': json.dumps(data, cls=DecimalEncoder)
     }
 
 
@@ -36,13 +56,68 @@ def error_response(message: str, status_code: int = 400) -> Dict[str, Any]:
         'headers': {
             'Content-Type': 'application/json',
             'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Headers': 'Content-Type',
-            'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS,PATCH'
+            'Access-Control-Allow-Headers': 'Content-Type,If-Match',
+            'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS,PATCH',
+            'Access-Control-Expose-Headers': 'ETag'
         },
         'body': json.dumps({'error': message})
     }
 
 
+def expected_version(event: Dict[str, Any]) -> Optional[int]:
+    """Version from an If-Match header, or None when it is absent or `*`."""
+    value = (event.get('headers') or {}).get('if-match')
+    if not value or value.strip() == '*':
+        return None
+    value = value.strip()
+    if value.startswith('W/'):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise ValueError("If-Match must be an ETag returned by this API")
+
+
+def claim_content(user_id: str, file_name: str, sha256: str, content_length: Optional[int]) -> Optional[Resume]:
+    """
+    Claim the user's content record for `sha256` before handing out upload
+    URLs, so concurrent uploads of the same file store and extract it once.
+    Returns None when this request should upload the file, otherwise a new
+    resume referencing the stored (or still uploading) content.
+    """
+    claim = ResumeContent(user_id=user_id, sha256=sha256, s3_key=content_key(user_id, sha256),
+                          content_length=content_length, upload_status="pending", file_name=file_name)
+    if contents.claim(claim):
+        return None
+    content = contents.get(user_id, sha256)
+    if not content:
+        return None
+    logger.info(f"Content {sha256} already claimed for user {user_id}; skipping upload")
+    return db.create(Resume(id=str(uuid.uuid4()), user_id=user_id, file_name=file_name, s3_key=content.s3_key,
+                            upload_status=content.upload_status, content_hash=sha256,
+                            content_length=content.content_length))
+
+
+def release_content(resume: Resume, error: str) -> None:
+    """Give up an upload's content claim and fail the resumes that were waiting on it."""
+    if not resume.content_hash:
+        return
+    contents.release(resume.user_id, resume.content_hash, error)
+    db.update_status_for_content(resume.user_id, resume.content_hash, "failed", error, from_status="pending")
+
+
+def with_content(resume: Resume) -> Dict[str, Any]:
+    """Detail view: a content-addressed resume with its shared extracted text filled in."""
+    data = resume.to_dynamo_dict()
+    if resume.content_hash:
+        content = contents.get(resume.user_id, resume.content_hash)
+        if content:
+            for field in ('text', 'text_stats', 'sections', 'extraction_error'):
+                if getattr(content, field) is not None:
+                    data[field] = getattr(content, field)
+    return data
+
+
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     try:
         logger.info(f"Received event: {json.dumps(event)}")
@@ -67,39 +142,126 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             content_type = data.get('content_type', 'application/octet-stream')
             if not file_name:
                 return error_response("file_name is required")
+            params = {'ContentType': content_type}
+            # Optional for older clients; when given, S3 rejects a body of any other size
+            if 'content_length' in data:
+                params['ContentLength'] = validate_content_length(data['content_length'])
+            # Optional for older clients; when given, identical files are stored once
+            sha256 = validate_sha256(data['sha256']) if 'sha256' in data else None
+
+            if sha256:
+                existing = claim_content(user_id, file_name, sha256, params.get('ContentLength'))
+                if existing:
+                    return success_response({"presigned_url": None, "resume_id": existing.id, "duplicate": True})
 
             resume_id = str(uuid.uuid4())
-            s3_key = f"{user_id}/{resume_id}/{file_name}" # Use user_id from auth context
+            s3_key = content_key(user_id, sha256) if sha256 else \
+                f"{user_id}/{resume_id}/{file_name}" # Use user_id from auth context
 
             new_resume = Resume(id=resume_id, user_id=user_id, # Use user_id from auth context
-                                file_name=file_name, s3_key=s3_key, upload_status="pending")
+                                file_name=file_name, s3_key=s3_key, upload_status="pending",
+                                content_hash=sha256, content_length=params.get('ContentLength'))
             db.create(new_resume)
 
-            s3_client = boto3.client('s3')
-            presigned_url = s3_client.generate_presigned_url(
+            presigned_url = get_s3_client().generate_presigned_url(
                 'put_object',
                 Params={
                     'Bucket': S3_BUCKET,
                     'Key': s3_key,
-                    'ContentType': content_type
+                    **params
                 },
                 ExpiresIn=3600
             )
 
-            return success_response({"presigned_url": presigned_url, "resume_id": resume_id})
+            return success_response({"presigned_url": presigned_url, "resume_id": resume_id, "duplicate": False})
+
+        # --- Route: POST /resumes/uploads ---
+        elif http_method == 'POST' and path == '/resumes/uploads':
+            logger.info("Routing to: Start Multipart Upload")
+            file_name = data.get('file_name')
+            if not file_name:
+                return error_response("file_name is required")
+            content_length = validate_content_length(data.get('content_length'))
+            sha256 = validate_sha256(data.get('sha256'))
+            content_type = data.get('content_type', 'application/octet-stream')
+
+            existing = claim_content(user_id, file_name, sha256, content_length)
+            if existing:
+                return success_response({"resume_id": existing.id, "duplicate": True, "part_size": PART_SIZE,
+                                         "expires_in": PART_URL_EXPIRY, "parts": []}, 201)
+
+            resume_id = str(uuid.uuid4())
+            s3_key = content_key(user_id, sha256)
+            s3 = get_s3_client()
+            upload_id = start_upload(s3, S3_BUCKET, s3_key, content_type)
+            db.create(Resume(id=resume_id, user_id=user_id, file_name=file_name, s3_key=s3_key,
+                             upload_status="pending", content_hash=sha256, upload_id=upload_id,
+                             content_length=content_length))
+
+            return success_response({
+                "resume_id": resume_id,
+                "duplicate": False,
+                "part_size": PART_SIZE,
+                "expires_in": PART_URL_EXPIRY,
+                "parts": part_urls(s3, S3_BUCKET, s3_key, upload_id, plan_parts(content_length)),
+            }, 201)
+
+        # --- Routes: /resumes/uploads/{id}[/complete] ---
+        elif path.startswith('/resumes/uploads/') and path_parameters.get('id'):
+            resume_id = path_parameters['id']
+            resume = db.get_by_id(resume_id)
+            if not resume or resume.user_id != user_id:
+                return error_response("Upload not found", 404)
+            if not resume.upload_id:
+                return error_response("Upload is no longer in progress", 409)
+            s3 = get_s3_client()
+            content_length = int(resume.content_length)
+
+            # GET: resume an interrupted upload from the parts S3 already has
+            if http_method == 'GET':
+                logger.info(f"Routing to: Get Upload Progress - {resume_id}")
+                progress = upload_progress(s3, S3_BUCKET, resume.s3_key, resume.upload_id, content_length)
+                return success_response({"resume_id": resume_id, "content_length": content_length,
+                                         "expires_in": PART_URL_EXPIRY, **progress})
+
+            elif http_method == 'POST' and path.endswith('/complete'):
+                logger.info(f"Routing to: Complete Multipart Upload - {resume_id}")
+                error = complete_upload(s3, S3_BUCKET, resume.s3_key, resume.upload_id, content_length)
+                if error:
+                    abort_upload(s3, S3_BUCKET, resume.s3_key, resume.upload_id)
+                    db.clear_upload(resume_id, status="failed", user_id=user_id)
+                    release_content(resume, error)
+                    return error_response(error)
+                # The S3 event from completion starts text extraction
+                resume = db.clear_upload(resume_id, user_id=user_id)
+                if not resume:
+                    return error_response("Upload not found", 404)
+                return success_response(resume.to_summary_dict(), version=resume.version)
+
+            elif http_method == 'DELETE':
+                logger.info(f"Routing to: Abort Multipart Upload - {resume_id}")
+                abort_upload(s3, S3_BUCKET, resume.s3_key, resume.upload_id)
+                resume = db.clear_upload(resume_id, status="failed", user_id=user_id)
+                if not resume:
+                    return error_response("Upload not found", 404)
+                release_content(resume, "Upload was cancelled")
+                return success_response(resume.to_summary_dict(), version=resume.version)
+
+            return error_response('Route not found', status_code=404)
 
         # --- Route: POST /resumes ---
+        # Kept for older clients: the S3-triggered extractor now completes the
+        # upload, so confirming only reports the resume's current state.
         elif http_method == 'POST' and path == '/resumes':
             logger.info("Routing to: Confirm Resume Upload")
             resume_id = data.get('resume_id')
             if not resume_id:
                 return error_response("resume_id is required")
 
-            if not db.get_by_id(resume_id):
+            resume = db.get_by_id(resume_id)
+            if not resume or resume.user_id != user_id:
                 return error_response("Resume not found", 404)
-
-            updated_resume = db.update_status(resume_id, "completed")
-            return success_response(updated_resume.to_dynamo_dict(), 201)
+            return success_response(resume.to_summary_dict(), 201, version=resume.version)
 
         # --- Route: GET /resumes ---
         elif http_method == 'GET' and path == '/resumes':
@@ -107,36 +269,42 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             # user_id is now taken from the auth context
 
             resumes = db.get_by_user_id(user_id)
-            return success_response([r.to_dynamo_dict() for r in resumes])
+            return success_response([r.to_summary_dict() for r in resumes])
 
         # --- Route: GET /resumes/{id} ---
         elif http_method == 'GET' and path_parameters.get('id'):
             resume_id = path_parameters['id']
             logger.info(f"Routing to: Get Resume by ID - {resume_id}")
             resume = db.get_by_id(resume_id)
-            if resume:
-                return success_response(resume.to_dynamo_dict())
+            if resume and resume.user_id == user_id:
+                return success_response(with_content(resume), version=resume.version)
             return error_response("Resume not found", 404)
 
         # --- Route: PATCH /resumes/{id} ---
         elif http_method == 'PATCH' and path_parameters.get('id'):
             resume_id = path_parameters['id']
             logger.info(f"Routing to: Update Resume - {resume_id}")
-            if 'file_name' not in data:
+            if not data.get('file_name'):
                 return error_response("Only file_name can be updated")
 
-            resume = db.get_by_id(resume_id)
+            # One conditional write: ownership and If-Match are checked by DynamoDB
+            resume = db.update(resume_id, {'file_name': data['file_name']}, user_id=user_id,
+                               expected_version=expected_version(event))
             if not resume:
                 return error_response("Resume not found", 404)
-
-            # This is a simplified update. A more robust solution would be in the db class.
-            resume.file_name = data['file_name']
-            db.create(resume)  # Overwrites/updates the item
-            return success_response(resume.to_dynamo_dict())
+            if analysis_cache:
+                analysis_cache.invalidate_user(user_id)
+            return success_response(resume.to_summary_dict(), version=resume.version)
 
         else:
             return error_response('Route not found', status_code=404)
 
+    except VersionConflict as e:
+        logger.warning(f"Version conflict: {e}")
+        return error_response(str(e), status_code=412)
+    except ValueError as e:
+        logger.error(f"Validation error: {e}", exc_info=True)
+        return error_response(str(e), status_code=400)
     except Exception as e:
         logger.error(f"Internal server error: {e}", exc_info=True)
         return error_response('Internal server error', status_code=500)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from dataclasses import dataclass, asdict
 
 @dataclass
@@ -9,6 +9,18 @@ class Resume:
     file_name: str
     s3_key: str
     upload_status: str = "pending"
+    # SHA-256 of the file; set when the text lives on a shared ResumeContent
+    content_hash: Optional[str] = None
+    # Set while a multipart upload is in progress
+    upload_id: Optional[str] = None
+    content_length: Optional[int] = None
+    # Filled in by the S3-triggered extractor for uploads without a content hash
+    text: Optional[str] = None
+    text_stats: Optional[Dict[str, Any]] = None
+    sections: Optional[List[Dict[str, Any]]] = None
+    extraction_error: Optional[str] = None
+    # Bumped by every update; clients send it back in If-Match
+    version: int = 1
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -23,9 +35,60 @@ class Resume:
             data['updated_at'] = data['updated_at'].isoformat()
         return {k: v for k, v in data.items() if v is not None}
 
+    def to_summary_dict(self) -> Dict[str, Any]:
+        """Listing view: everything except the (large) extracted text."""
+        data = self.to_dynamo_dict()
+        data.pop('text', None)
+        return data
+
     @classmethod
     def from_dynamo_dict(cls, item: Dict[str, Any]) -> "Resume":
         """Reconstruct object from DynamoDB item."""
+        if 'version' in item:
+            item['version'] = int(item['version'])
+        if 'created_at' in item and isinstance(item['created_at'], str):
+            item['created_at'] = datetime.fromisoformat(item['created_at'])
+        if 'updated_at' in item and isinstance(item['updated_at'], str):
+            item['updated_at'] = datetime.fromisoformat(item['updated_at'])
+        return cls(**item)
+
+
+@dataclass
+class ResumeContent:
+    """
+    One stored file and its extracted text, shared by every Resume of the
+    same user whose upload had the same SHA-256.
+    """
+    user_id: str
+    sha256: str
+    s3_key: str
+    content_length: Optional[int] = None
+    # "pending" while the first upload of these bytes is in flight (see claim)
+    upload_status: str = "completed"
+    # The first upload's file name; the extractor uses its extension as the format hint
+    file_name: Optional[str] = None
+    text: Optional[str] = None
+    text_stats: Optional[Dict[str, Any]] = None
+    sections: Optional[List[Dict[str, Any]]] = None
+    extraction_error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    def to_dynamo_dict(self) -> Dict[str, Any]:
+        """Convert to DynamoDB compatible dict."""
+        data = asdict(self)
+        if isinstance(data.get('created_at'), datetime):
+            data['created_at'] = data['created_at'].isoformat()
+        if isinstance(data.get('updated_at'), datetime):
+            data['updated_at'] = data['updated_at'].isoformat()
+        return {k: v for k, v in data.items() if v is not None}
+
+    @classmethod
+    def from_dynamo_dict(cls, item: Dict[str, Any]) -> "ResumeContent":
+        """Reconstruct object from DynamoDB item."""
+        item = dict(item)
+        if 'content_length' in item:
+            item['content_length'] = int(item['content_length'])
         if 'created_at' in item and isinstance(item['created_at'], str):
             item['created_at'] = datetime.fromisoformat(item['created_at'])
         if 'updated_at' in item and isinstance(item['updated_at'], str):
@@ -0,0 +1,131 @@
+import re
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Largest resume or portfolio accepted; checked at presign time and again on completion
+MAX_RESUME_BYTES = 25 * 1024 * 1024
+# S3 requires every multipart part except the last to be at least 5 MiB
+PART_SIZE = 5 * 1024 * 1024
+PART_URL_EXPIRY = 3600
+CONTENT_PREFIX = "content"
+
+_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+
+def validate_content_length(content_length: Any) -> int:
+    """Declared upload size as an int, rejecting empty and oversized files."""
+    try:
+        content_length = int(content_length)
+    except (TypeError, ValueError):
+        raise ValueError("content_length must be an integer")
+    if content_length <= 0:
+        raise ValueError("content_length must be positive")
+    if content_length > MAX_RESUME_BYTES:
+        raise ValueError(f"Resumes can be at most {MAX_RESUME_BYTES // (1024 * 1024)} MB")
+    return content_length
+
+
+def validate_sha256(sha256: Any) -> str:
+    """Client-computed SHA-256 of the file as lowercase hex."""
+    sha256 = str(sha256 or "").strip().lower()
+    if not _SHA256.match(sha256):
+        raise ValueError("sha256 must be the file's SHA-256 as 64 hex characters")
+    return sha256
+
+
+def content_key(user_id: str, sha256: str) -> str:
+    """
+    S3 key for content-addressed uploads: one object per user and file hash,
+    whatever the file is called, so uploads of the same bytes overwrite
+    rather than duplicate each other.
+    """
+    return f"{user_id}/{CONTENT_PREFIX}/{sha256}"
+
+
+def plan_parts(content_length: int) -> List[Tuple[int, int]]:
+    """(part_number, size) for every part of an upload; only the last part is short."""
+    return [(number, min(PART_SIZE, content_length - offset))
+            for number, offset in enumerate(range(0, content_length, PART_SIZE), start=1)]
+
+
+def start_upload(s3, bucket: str, key: str, content_type: str) -> str:
+    response = s3.create_multipart_upload(Bucket=bucket, Key=key, ContentType=content_type)
+    return response['UploadId']
+
+
+def part_urls(s3, bucket: str, key: str, upload_id: str, parts: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+    """
+    Presigned upload_part URLs. Each part's exact size is signed into its URL,
+    so S3 rejects a part that doesn't match the declared content length.
+    """
+    return [{
+        'part_number': number,
+        'size': size,
+        'url': s3.generate_presigned_url(
+            'upload_part',
+            Params={'Bucket': bucket, 'Key': key, 'UploadId': upload_id,
+                    'PartNumber': number, 'ContentLength': size},
+            ExpiresIn=PART_URL_EXPIRY
+        )
+    } for number, size in parts]
+
+
+def uploaded_parts(s3, bucket: str, key: str, upload_id: str) -> Dict[int, Dict[str, Any]]:
+    """Parts S3 has received so far, by part number. S3 is the source of truth, not the client."""
+    parts = {}
+    params = {'Bucket': bucket, 'Key': key, 'UploadId': upload_id}
+    while True:
+        response = s3.list_parts(**params)
+        for part in response.get('Parts', []):
+            parts[part['PartNumber']] = {'size': part['Size'], 'etag': part['ETag']}
+        if not response.get('IsTruncated'):
+            return parts
+        params['PartNumberMarker'] = response['NextPartNumberMarker']
+
+
+def upload_progress(s3, bucket: str, key: str, upload_id: str, content_length: int) -> Dict[str, Any]:
+    """What has been uploaded, plus fresh URLs for only the parts still missing."""
+    received = uploaded_parts(s3, bucket, key, upload_id)
+    missing = [(number, size) for number, size in plan_parts(content_length)
+               if received.get(number, {}).get('size') != size]
+    return {
+        'part_size': PART_SIZE,
+        'uploaded_parts': [{'part_number': n, 'size': p['size']} for n, p in sorted(received.items())],
+        'uploaded_bytes': sum(p['size'] for p in received.values()),
+        'parts': part_urls(s3, bucket, key, upload_id, missing),
+    }
+
+
+def complete_upload(s3, bucket: str, key: str, upload_id: str, content_length: int) -> Optional[str]:
+    """
+    Complete the multipart upload from the parts S3 actually holds.
+
+    Returns an error message for an upload that can never be completed (its
+    parts don't add up to the declared size); the caller aborts it. Missing
+    parts raise ValueError so the client can upload them and retry.
+    """
+    received = uploaded_parts(s3, bucket, key, upload_id)
+    plan = plan_parts(content_length)
+    missing = [number for number, _ in plan if number not in received]
+    if missing:
+        raise ValueError(f"Upload is missing parts: {', '.join(str(n) for n in missing)}")
+    if any(received[number]['size'] != size for number, size in plan) or len(received) != len(plan):
+        return "Uploaded parts do not match the declared content length"
+    s3.complete_multipart_upload(
+        Bucket=bucket, Key=key, UploadId=upload_id,
+        MultipartUpload={'Parts': [{'PartNumber': n, 'ETag': received[n]['etag']} for n, _ in plan]}
+    )
+    logger.info(f"Completed multipart upload for {key} ({content_length} bytes in {len(plan)} parts)")
+    return None
+
+
+def abort_upload(s3, bucket: str, key: str, upload_id: str) -> None:
+    try:
+        s3.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+    except Exception as e:
+        # Already completed or aborted; the bucket lifecycle rule cleans up anything left
+        logger.warning(f"Could not abort multipart upload for {key}: {e}")
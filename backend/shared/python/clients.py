@@ -0,0 +1,49 @@
+import os
+import logging
+from typing import Dict, Any
+import boto3
+from botocore.config import Config
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Shared by every client so warm invocations reuse pooled, kept-alive connections
+CLIENT_CONFIG = Config(
+    connect_timeout=2,
+    read_timeout=5,
+    tcp_keepalive=True,
+    max_pool_connections=int(os.environ.get("AWS_MAX_POOL_CONNECTIONS", "10")),
+    retries={'max_attempts': 3, 'mode': 'standard'}
+)
+
+_registry: Dict[str, Any] = {}
+
+
+def _get_or_create(name: str, factory):
+    client = _registry.get(name)
+    if client is None:
+        logger.info(f"Initializing shared AWS client: {name}")
+        client = factory()
+        _registry[name] = client
+    return client
+
+
+def get_dynamodb_resource():
+    """Lazily create the process-wide DynamoDB resource."""
+    return _get_or_create('dynamodb', lambda: boto3.resource('dynamodb', config=CLIENT_CONFIG))
+
+
+def get_table(table_name: str):
+    """Return a cached Table handle backed by the shared DynamoDB resource."""
+    return _get_or_create(f"table:{table_name}", lambda: get_dynamodb_resource().Table(table_name))
+
+
+def get_s3_client():
+    """Lazily create the process-wide S3 client."""
+    return _get_or_create('s3', lambda: boto3.client('s3', config=CLIENT_CONFIG))
+
+
+def reset_clients() -> None:
+    """Drop every cached client; the next call rebuilds them (used by benchmarks)."""
+    _registry.clear()
@@ -0,0 +1,84 @@
+from typing import Any, Dict, Iterable, Optional
+from boto3.dynamodb.types import TypeDeserializer
+
+# Items written before versioning have no version attribute; they count as this
+INITIAL_VERSION = 1
+
+_deserializer = TypeDeserializer()
+
+
+class VersionConflict(Exception):
+    """The item exists and belongs to the caller, but is no longer at the version the caller expected."""
+
+    def __init__(self, current_version: int):
+        super().__init__(f"Item has been modified; current version is {current_version}")
+        self.current_version = current_version
+
+
+def build_condition(names: Dict[str, str], values: Dict[str, Any], owner: Optional[str] = None,
+                    expected_version: Optional[int] = None) -> str:
+    """
+    ConditionExpression requiring the item to exist and, when given, to belong
+    to `owner` and still be at `expected_version`. Placeholders are added to
+    `names` and `values`.
+    """
+    conditions = ["attribute_exists(id)"]
+    if owner is not None:
+        conditions.append("#owner = :owner")
+        names['#owner'] = 'user_id'
+        values[':owner'] = owner
+    if expected_version is not None:
+        names['#version'] = 'version'
+        values[':expected_version'] = expected_version
+        if expected_version == INITIAL_VERSION:
+            conditions.append("(attribute_not_exists(#version) OR #version = :expected_version)")
+        else:
+            conditions.append("#version = :expected_version")
+    return " AND ".join(conditions)
+
+
+def build_update(updates: Dict[str, Any], remove: Iterable[str] = (), owner: Optional[str] = None,
+                 expected_version: Optional[int] = None) -> Dict[str, Any]:
+    """
+    update_item arguments that SET `updates`, REMOVE `remove` and bump the
+    item's version in one conditional write (see build_condition).
+    Placeholders handle reserved keywords.
+    """
+    names: Dict[str, str] = {'#version': 'version'}
+    values: Dict[str, Any] = {':version_step': 1, ':initial_version': INITIAL_VERSION}
+    set_parts = ["#version = if_not_exists(#version, :initial_version) + :version_step"]
+    for i, (key, value) in enumerate(updates.items()):
+        set_parts.append(f"#k{i} = :v{i}")
+        names[f"#k{i}"] = key
+        values[f":v{i}"] = value
+    update_expression = "SET " + ", ".join(set_parts)
+    remove_parts = []
+    for i, key in enumerate(remove):
+        remove_parts.append(f"#r{i}")
+        names[f"#r{i}"] = key
+    if remove_parts:
+        update_expression += " REMOVE " + ", ".join(remove_parts)
+    return {
+        'UpdateExpression': update_expression,
+        'ConditionExpression': build_condition(names, values, owner, expected_version),
+        'ExpressionAttributeNames': names,
+        'ExpressionAttributeValues': values,
+        # On a failed condition DynamoDB returns the item, so the caller can
+        # tell "not found / not yours" from "stale version" without a read
+        'ReturnValuesOnConditionCheckFailure': 'ALL_OLD',
+    }
+
+
+def raise_for_conflict(item: Optional[Dict[str, Any]], owner: Optional[str] = None) -> None:
+    """
+    Interpret the item returned with a ConditionalCheckFailed error. Raises
+    VersionConflict when the item exists and belongs to `owner`; otherwise
+    returns so the caller reports the item as not found.
+    """
+    if not item:
+        return
+    # Returned in wire format, even through the resource API
+    item = {k: _deserializer.deserialize(v) for k, v in item.items()}
+    if owner is not None and item.get('user_id') != owner:
+        return
+    raise VersionConflict(int(item.get('version', INITIAL_VERSION)))
@@ -0,0 +1,50 @@
+import os
+import json
+import logging
+from typing import Dict, Any
+
+from db import StatsDynamoDB
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Initialize clients once per container so warm invocations reuse them
+db = StatsDynamoDB(os.environ.get("STATS_TABLE", "application_stats"))
+
+
+def success_response(data: Any, status_code: int = 200) -> Dict[str, Any]:
+    return {
+        'statusCode': status_code,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*',
+            'Access-Control-Allow-Headers': 'Content-Type',
+            'Access-Control-Allow-Methods': 'GET,OPTIONS'
+        },
+        'body': json.dumps(data)
+    }
+
+
+def error_response(message: str, status_code: int = 400) -> Dict[str, Any]:
+    return {
+        'statusCode': status_code,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*',
+            'Access-Control-Allow-Headers': 'Content-Type',
+            'Access-Control-Allow-Methods': 'GET,OPTIONS'
+        },
+        'body': json.dumps({'error': message})
+    }
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """GET /stats - the caller's precomputed application statistics (one item read)."""
+    try:
+        user_id = event['requestContext']['authorizer']['jwt']['claims']['sub']
+        logger.info(f"Routing to: GET /stats for user {user_id}")
+        return success_response(db.get(user_id).to_dict())
+    except Exception as e:
+        logger.error(f"Internal server error: {e}", exc_info=True)
+        return error_response('Internal server error', status_code=500)
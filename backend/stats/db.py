@@ -0,0 +1,119 @@
+import logging
+from datetime import datetime
+from typing import Optional, Dict, Any
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from clients import get_dynamodb_resource, get_table
+from models import Contribution, UserStats, SUMMARY_SK, counter_item_sk
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Stream sequence numbers are decimal strings of up to 40 digits, more than a
+# DynamoDB Number holds, so markers store them zero-padded and compare as strings
+SEQUENCE_WIDTH = 40
+# Optimistic retries when two stream batches race on the same application
+MAX_APPLY_ATTEMPTS = 5
+
+
+def _marker_sk(application_id: str) -> str:
+    return f"app#{application_id}"
+
+
+def _sequence_key(sequence: Any) -> str:
+    """Zero-padded form of a sequence number; also reads markers stored as Numbers."""
+    if not isinstance(sequence, str):
+        sequence = str(int(sequence))
+    return sequence.zfill(SEQUENCE_WIDTH)
+
+
+class StatsDynamoDB:
+    """
+    Per-user aggregates kept in one table: a `summary` item holding the
+    counters (with company and week counters sharded into `summary#...`
+    items), plus one marker item per application recording the last stream
+    sequence number applied and what that application currently contributes.
+    """
+
+    def __init__(self, table_name: str = "application_stats"):
+        self.dynamodb = get_dynamodb_resource()
+        self.table = get_table(table_name)
+        logger.info(f"Initialized StatsDynamoDB with table: {table_name}")
+
+    def get(self, user_id: str) -> UserStats:
+        logger.info(f"Getting stats for user: {user_id}")
+        params = {'KeyConditionExpression': Key('user_id').eq(user_id) & Key('sk').begins_with(SUMMARY_SK)}
+        items = []
+        while True:
+            response = self.table.query(**params)
+            items.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                break
+            params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        return UserStats.from_dynamo_items(user_id, items)
+
+    def apply(self, user_id: str, application_id: str, sequence: str, new: Contribution) -> bool:
+        """
+        Move an application's contribution to `new` as of stream `sequence`.
+
+        The delta is computed against the marker rather than the record's
+        OldImage, so replays and out-of-order records are harmless: anything at
+        or below the marker's sequence is skipped, and a newer record always
+        converges the counters to its image. Returns False when skipped.
+        """
+        key = {'user_id': user_id, 'sk': _marker_sk(application_id)}
+        sequence_number = _sequence_key(sequence)
+
+        for _ in range(MAX_APPLY_ATTEMPTS):
+            marker = self.table.get_item(Key=key, ConsistentRead=True).get('Item')
+            if marker and _sequence_key(marker['seq']) >= sequence_number:
+                logger.info(f"Skipping stale record {sequence} for application {application_id}")
+                return False
+
+            previous = Contribution.from_dynamo_dict(marker)
+            delta = previous.delta_to(new)
+            marker_condition = {
+                'ConditionExpression': "attribute_not_exists(seq)",
+            } if not marker else {
+                'ConditionExpression': "seq = :prev_seq",
+                'ExpressionAttributeValues': {':prev_seq': marker['seq']},
+            }
+            transact_items = [{'Put': {
+                'TableName': self.table.name,
+                'Item': {**key, **new.to_dynamo_dict(), 'seq': sequence_number},
+                **marker_condition,
+            }}]
+
+            # The summary's updated_at is the version readers cache against, so
+            # it is bumped even when only shard counters change
+            by_item: Dict[str, Dict[str, int]] = {SUMMARY_SK: {}} if delta else {}
+            for counter, change in delta.items():
+                by_item.setdefault(counter_item_sk(counter), {})[counter] = change
+            updated_at = datetime.utcnow().isoformat()
+            for sk, changes in by_item.items():
+                names = {f"#c{i}": k for i, k in enumerate(changes)}
+                values = {f":d{i}": v for i, v in enumerate(changes.values())}
+                values[':updated_at'] = updated_at
+                update = {
+                    'TableName': self.table.name,
+                    'Key': {'user_id': user_id, 'sk': sk},
+                    'UpdateExpression': "SET updated_at = :updated_at",
+                    'ExpressionAttributeValues': values,
+                }
+                if changes:
+                    update['UpdateExpression'] = ("ADD " + ", ".join(f"#c{i} :d{i}" for i in range(len(changes)))
+                                                  + " " + update['UpdateExpression'])
+                    update['ExpressionAttributeNames'] = names
+                transact_items.append({'Update': update})
+
+            try:
+                self.dynamodb.meta.client.transact_write_items(TransactItems=transact_items)
+                logger.info(f"Applied record {sequence} for application {application_id}: {delta}")
+                return True
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'TransactionCanceledException':
+                    raise
+                logger.warning(f"Marker for application {application_id} changed concurrently, retrying")
+
+        raise RuntimeError(f"Could not apply record {sequence} for application {application_id}")
@@ -0,0 +1,62 @@
+import os
+import json
+import logging
+from typing import Dict, Any, List
+from boto3.dynamodb.types import TypeDeserializer
+
+from db import StatsDynamoDB
+from models import Contribution
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Initialize clients once per container so warm invocations reuse them
+db = StatsDynamoDB(os.environ.get("STATS_TABLE", "application_stats"))
+deserializer = TypeDeserializer()
+
+
+def _deserialize(image: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: deserializer.deserialize(v) for k, v in image.items()}
+
+
+def process_record(record: Dict[str, Any]) -> bool:
+    """Fold one applications-table stream record into its owner's stats."""
+    change = record['dynamodb']
+    old_image = _deserialize(change['OldImage']) if 'OldImage' in change else None
+    new_image = _deserialize(change['NewImage']) if 'NewImage' in change else None
+    image = new_image or old_image
+    if not image or not image.get('user_id'):
+        logger.warning(f"Skipping record {record.get('eventID')} without a user_id")
+        return False
+
+    new = Contribution.from_image(new_image if record['eventName'] != 'REMOVE' else None)
+    return db.apply(image['user_id'], image['id'], change['SequenceNumber'], new)
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    DynamoDB Streams handler. Reports per-record failures so Lambda retries
+    only from the first failed record instead of replaying the whole batch.
+    """
+    records = event.get('Records', [])
+    logger.info(f"Received {len(records)} stream records")
+    failures: List[Dict[str, str]] = []
+    for record in records:
+        try:
+            process_record(record)
+        except Exception as e:
+            logger.error(f"Failed to process record {record.get('eventID')}: {e}", exc_info=True)
+            failures.append({'itemIdentifier': record['dynamodb']['SequenceNumber']})
+            # Later records for the same item must wait for this one
+            break
+    return {'batchItemFailures': failures}
+
+
+if __name__ == "__main__":
+    # Replay captured stream records locally:
+    #   PYTHONPATH=../shared/python python lambda_function.py records.json
+    import sys
+    logging.basicConfig()
+    with open(sys.argv[1]) as f:
+        print(json.dumps(lambda_handler(json.load(f), None)))
@@ -0,0 +1,148 @@
+import os
+import zlib
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+from dataclasses import dataclass, field, asdict
+from decimal import Decimal
+
+# Width of each pay histogram bucket, in the same units as Application.pay
+PAY_BUCKET_SIZE = int(os.environ.get("PAY_BUCKET_SIZE", "10000"))
+
+# Counter attribute prefixes on the summary item. Counters are stored as flat
+# top-level attributes because ADD cannot create nested map paths.
+COUNTER_PREFIXES = {
+    "status#": "by_status",
+    "company#": "by_company",
+    "week#": "by_week",
+    "pay#": "pay_histogram",
+    "transition#": "transitions",
+}
+
+SUMMARY_SK = "summary"
+# Company and week counters grow with the user's history, so they are kept out
+# of the summary item (and its 400 KB limit): weeks go to one item per year,
+# companies are hashed across a fixed number of shard items.
+COMPANY_SHARDS = int(os.environ.get("STATS_COMPANY_SHARDS", "16"))
+MAX_COMPANY_LENGTH = 100
+
+
+def counter_item_sk(counter: str) -> str:
+    """Sort key of the stats item that holds `counter`."""
+    if counter.startswith("week#"):
+        return f"{SUMMARY_SK}#week#{counter[len('week#'):len('week#') + 4]}"
+    if counter.startswith("company#"):
+        shard = zlib.crc32(counter.encode('utf-8')) % COMPANY_SHARDS
+        return f"{SUMMARY_SK}#company#{shard:02d}"
+    return SUMMARY_SK
+
+
+def _week_of(timestamp: Optional[str]) -> Optional[str]:
+    if not timestamp:
+        return None
+    year, week, _ = datetime.fromisoformat(timestamp).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+@dataclass
+class Contribution:
+    """What one application adds to its owner's aggregate counters."""
+    status: Optional[str] = None
+    company: Optional[str] = None
+    week: Optional[str] = None
+    pay_bucket: Optional[int] = None
+
+    @classmethod
+    def from_image(cls, image: Optional[Dict[str, Any]]) -> "Contribution":
+        """Build from a deserialized stream image; None means the item does not exist."""
+        if not image:
+            return cls()
+        pay = image.get('pay')
+        company = image.get('company')
+        return cls(
+            status=image.get('status'),
+            company=company[:MAX_COMPANY_LENGTH] if company else None,
+            week=_week_of(image.get('date_added') or image.get('created_at')),
+            pay_bucket=int(pay // PAY_BUCKET_SIZE * PAY_BUCKET_SIZE) if pay is not None else None,
+        )
+
+    @property
+    def exists(self) -> bool:
+        return self.status is not None
+
+    def counters(self) -> Dict[str, int]:
+        if not self.exists:
+            return {}
+        counters = {"total": 1, f"status#{self.status}": 1}
+        if self.company:
+            counters[f"company#{self.company}"] = 1
+        if self.week:
+            counters[f"week#{self.week}"] = 1
+        if self.pay_bucket is not None:
+            counters[f"pay#{self.pay_bucket}"] = 1
+        return counters
+
+    def delta_to(self, new: "Contribution") -> Dict[str, int]:
+        """Counter changes that take the aggregate from this contribution to `new`."""
+        delta: Dict[str, int] = {}
+        for key, value in self.counters().items():
+            delta[key] = delta.get(key, 0) - value
+        for key, value in new.counters().items():
+            delta[key] = delta.get(key, 0) + value
+        if self.exists and new.exists and self.status != new.status:
+            delta[f"transition#{self.status}>{new.status}"] = 1
+        return {k: v for k, v in delta.items() if v != 0}
+
+    def to_dynamo_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        if data.get('pay_bucket') is not None:
+            data['pay_bucket'] = Decimal(data['pay_bucket'])
+        return {k: v for k, v in data.items() if v is not None}
+
+    @classmethod
+    def from_dynamo_dict(cls, item: Optional[Dict[str, Any]]) -> "Contribution":
+        if not item:
+            return cls()
+        pay_bucket = item.get('pay_bucket')
+        return cls(
+            status=item.get('status'),
+            company=item.get('company'),
+            week=item.get('week'),
+            pay_bucket=int(pay_bucket) if pay_bucket is not None else None,
+        )
+
+
+@dataclass
+class UserStats:
+    user_id: str
+    total: int = 0
+    by_status: Dict[str, int] = field(default_factory=dict)
+    by_company: Dict[str, int] = field(default_factory=dict)
+    by_week: Dict[str, int] = field(default_factory=dict)
+    pay_histogram: Dict[str, int] = field(default_factory=dict)
+    transitions: Dict[str, int] = field(default_factory=dict)
+    updated_at: Optional[str] = None
+
+    @classmethod
+    def from_dynamo_items(cls, user_id: str, items: List[Dict[str, Any]]) -> "UserStats":
+        """
+        Regroup the flat counter attributes of a user's summary and shard
+        items. A counter present on several items (summaries written before
+        sharding) is summed.
+        """
+        stats = cls(user_id=user_id)
+        for item in items:
+            stats.total += int(item.get('total', 0))
+            if item.get('updated_at') and (stats.updated_at is None or item['updated_at'] > stats.updated_at):
+                stats.updated_at = item['updated_at']
+            for key, value in item.items():
+                for prefix, group in COUNTER_PREFIXES.items():
+                    if key.startswith(prefix):
+                        counters = getattr(stats, group)
+                        name = key[len(prefix):]
+                        counters[name] = counters.get(name, 0) + int(value)
+        for group in COUNTER_PREFIXES.values():
+            setattr(stats, group, {k: v for k, v in getattr(stats, group).items() if v != 0})
+        return stats
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
@@ -0,0 +1,126 @@
+"""
+Shared fixtures for the backend Lambda tests. AWS is replaced by moto's
+in-process stand-in:
+
+    pip install -r backend/requirements.txt moto pytest
+    python -m pytest backend/tests
+"""
+import os
+import sys
+import json
+import importlib
+from typing import Any, Dict
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Contents of the shared Lambda layer, found at /opt/python when deployed
+SHARED_DIR = os.path.join(BACKEND_DIR, "shared", "python")
+sys.path.append(SHARED_DIR)
+# Modules that several Lambdas define with the same name, plus the shared layer's
+LAMBDA_MODULES = ('lambda_function', 'api', 'db', 'models', 'clients', 'pagination', 'planner', 'batch', 'importer',
+                  'exporter', 'uploads', 'expressions', 'extractor')
+
+os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+os.environ.pop("AWS_PROFILE", None)
+os.environ["RESUMES_S3_BUCKET"] = "test-resumes"
+os.environ["CURSOR_SECRET"] = "test-cursor-secret-0123456789abcdef"
+
+
+def import_lambda(service: str, module: str = 'lambda_function'):
+    """Import one of a Lambda's modules from scratch, as a fresh container would."""
+    for name in LAMBDA_MODULES:
+        sys.modules.pop(name, None)
+    service_dir = os.path.join(BACKEND_DIR, service)
+    sys.path.insert(0, service_dir)
+    try:
+        return importlib.import_module(module)
+    finally:
+        sys.path.remove(service_dir)
+
+
+def api_event(user_id: str, method: str, path: str, body: Dict[str, Any] = None,
+              path_parameters: Dict[str, str] = None, headers: Dict[str, str] = None) -> Dict[str, Any]:
+    """Build a minimal HTTP API (payload v2) event."""
+    return {
+        'rawPath': path,
+        'requestContext': {
+            'http': {'method': method},
+            'authorizer': {'jwt': {'claims': {'sub': user_id}}}
+        },
+        'headers': headers or {},
+        'pathParameters': path_parameters,
+        'queryStringParameters': None,
+        'body': json.dumps(body) if body is not None else None
+    }
+
+
+@pytest.fixture
+def aws():
+    from moto import mock_aws
+    with mock_aws():
+        yield
+
+
+@pytest.fixture
+def applications_table(aws):
+    """The applications table with the same indexes as template.yaml."""
+    import boto3
+    index_keys = {
+        'UserIndex': 'user_id',
+        'StatusIndex': 'status',
+        'ResumeIndex': 'resume_used_id',
+        'UserStatusIndex': 'user_status',
+    }
+    boto3.client('dynamodb').create_table(
+        TableName='applications',
+        AttributeDefinitions=[{'AttributeName': name, 'AttributeType': 'S'} for name in
+                              ('id', 'user_id', 'status', 'date_added', 'resume_used_id', 'user_status')],
+        KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+        GlobalSecondaryIndexes=[{
+            'IndexName': index_name,
+            'KeySchema': [
+                {'AttributeName': hash_key, 'KeyType': 'HASH'},
+                {'AttributeName': 'date_added', 'KeyType': 'RANGE'},
+            ],
+            'Projection': {'ProjectionType': 'ALL'},
+        } for index_name, hash_key in index_keys.items()],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    return boto3.resource('dynamodb').Table('applications')
+
+
+@pytest.fixture
+def resume_tables(aws):
+    """The resumes and resume_contents tables plus the resumes bucket."""
+    import boto3
+    dynamodb = boto3.client('dynamodb')
+    dynamodb.create_table(
+        TableName='resumes',
+        AttributeDefinitions=[
+            {'AttributeName': 'id', 'AttributeType': 'S'},
+            {'AttributeName': 'user_id', 'AttributeType': 'S'},
+        ],
+        KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+        GlobalSecondaryIndexes=[{
+            'IndexName': 'UserIndex',
+            'KeySchema': [{'AttributeName': 'user_id', 'KeyType': 'HASH'}],
+            'Projection': {'ProjectionType': 'ALL'},
+        }],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    dynamodb.create_table(
+        TableName='resume_contents',
+        AttributeDefinitions=[
+            {'AttributeName': 'user_id', 'AttributeType': 'S'},
+            {'AttributeName': 'sha256', 'AttributeType': 'S'},
+        ],
+        KeySchema=[
+            {'AttributeName': 'user_id', 'KeyType': 'HASH'},
+            {'AttributeName': 'sha256', 'KeyType': 'RANGE'},
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    boto3.client('s3').create_bucket(Bucket=os.environ["RESUMES_S3_BUCKET"])
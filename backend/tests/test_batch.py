@@ -0,0 +1,143 @@
+import json
+import importlib
+
+import pytest
+from botocore.exceptions import ClientError
+
+from conftest import api_event, import_lambda
+
+USER_ID = "batch-user"
+OTHER_USER_ID = "other-batch-user"
+
+
+@pytest.fixture
+def api(applications_table, monkeypatch):
+    module = import_lambda('applications')
+    monkeypatch.setattr(importlib.import_module('db'), '_backoff', lambda attempt: None)
+    return module
+
+
+@pytest.fixture
+def client(api):
+    return api.db.dynamodb.meta.client
+
+
+def run_batch(api, operations, user_id=USER_ID):
+    response = api.lambda_handler(
+        api_event(user_id, 'POST', '/applications/batch', body={'operations': operations}), None)
+    assert response['statusCode'] == 200
+    return json.loads(response['body'])
+
+
+def record_calls(monkeypatch, client, name, respond=None):
+    """Record each call to a client method; `respond` may replace the real call."""
+    calls = []
+    real = getattr(client, name)
+
+    def call(**params):
+        calls.append(params)
+        return respond(real, params, len(calls)) if respond else real(**params)
+
+    monkeypatch.setattr(client, name, call)
+    return calls
+
+
+def creates(count):
+    return [{'op': 'create', 'data': {'job_title': f"Job {i}", 'company': "Acme"}} for i in range(count)]
+
+
+def put(applications_table, app_id, user_id=USER_ID, version=1):
+    applications_table.put_item(Item={'id': app_id, 'user_id': user_id, 'status': 'applied', 'version': version,
+                                      'created_at': "2025-01-01T00:00:00", 'date_added': "2025-01-01T00:00:00"})
+
+
+def test_creates_are_written_in_chunks_of_25(api, client, applications_table, monkeypatch):
+    calls = record_calls(monkeypatch, client, 'batch_write_item')
+
+    body = run_batch(api, creates(60))
+
+    assert [len(call['RequestItems']['applications']) for call in calls] == [25, 25, 10]
+    assert body['succeeded'] == 60
+    assert applications_table.scan(Select='COUNT')['Count'] == 60
+
+
+def test_unprocessed_items_are_retried(api, client, applications_table, monkeypatch):
+    def throttle_first_attempt(real, params, attempt):
+        requests = params['RequestItems']['applications']
+        if attempt > 1:
+            return real(**params)
+        real(RequestItems={'applications': requests[:-2]})
+        return {'UnprocessedItems': {'applications': requests[-2:]}}
+
+    calls = record_calls(monkeypatch, client, 'batch_write_item', throttle_first_attempt)
+
+    body = run_batch(api, creates(5))
+
+    assert [len(call['RequestItems']['applications']) for call in calls] == [5, 2]
+    assert body['succeeded'] == 5
+    assert applications_table.scan(Select='COUNT')['Count'] == 5
+
+
+def test_items_left_unprocessed_fail_after_the_retry_budget(api, client, monkeypatch):
+    def never_processed(real, params, attempt):
+        return {'UnprocessedItems': params['RequestItems']}
+
+    calls = record_calls(monkeypatch, client, 'batch_write_item', never_processed)
+
+    body = run_batch(api, creates(2))
+
+    assert len(calls) == importlib.import_module('db').BATCH_MAX_RETRIES + 1
+    assert body['failed'] == 2
+    assert {result['error'] for result in body['results']} == {'Throughput exceeded'}
+
+
+def test_mutations_are_transacted_in_chunks_of_25(api, client, applications_table, monkeypatch):
+    for i in range(30):
+        put(applications_table, f"app-{i}")
+    calls = record_calls(monkeypatch, client, 'transact_write_items')
+
+    body = run_batch(api, [{'op': 'update', 'id': f"app-{i}", 'data': {'status': 'offer'}} for i in range(30)])
+
+    assert [len(call['TransactItems']) for call in calls] == [25, 5]
+    assert body['succeeded'] == 30
+
+
+def test_cancelled_transaction_retries_the_items_that_did_not_fail(api, client, applications_table, monkeypatch):
+    put(applications_table, "mine")
+    put(applications_table, "stale", version=3)
+    put(applications_table, "theirs", user_id=OTHER_USER_ID)
+    calls = record_calls(monkeypatch, client, 'transact_write_items')
+
+    body = run_batch(api, [
+        {'op': 'update', 'id': "mine", 'data': {'status': 'offer'}},
+        {'op': 'update', 'id': "stale", 'data': {'status': 'offer'}, 'version': 2},
+        {'op': 'delete', 'id': "theirs"},
+        {'op': 'delete', 'id': "missing"},
+    ])
+
+    assert [len(call['TransactItems']) for call in calls] == [4, 1]
+    assert [result['status'] for result in body['results']] == ['ok', 'error', 'error', 'error']
+    assert body['results'][1]['error'] == "Item has been modified; current version is 3"
+    assert body['results'][2]['error'] == body['results'][3]['error'] == "Application not found"
+    assert applications_table.get_item(Key={'id': "mine"})['Item']['status'] == 'offer'
+    assert applications_table.get_item(Key={'id': "theirs"}).get('Item')
+
+
+def test_transaction_conflicts_are_retried(api, client, applications_table, monkeypatch):
+    put(applications_table, "app-1")
+    put(applications_table, "app-2")
+
+    def conflict_first_attempt(real, params, attempt):
+        if attempt > 1:
+            return real(**params)
+        raise ClientError({
+            'Error': {'Code': 'TransactionCanceledException', 'Message': "Transaction cancelled"},
+            'CancellationReasons': [{'Code': 'TransactionConflict'}, {'Code': 'None'}],
+        }, 'TransactWriteItems')
+
+    calls = record_calls(monkeypatch, client, 'transact_write_items', conflict_first_attempt)
+
+    body = run_batch(api, [{'op': 'update', 'id': f"app-{i}", 'data': {'status': 'offer'}} for i in (1, 2)])
+
+    assert [len(call['TransactItems']) for call in calls] == [2, 2]
+    assert body['succeeded'] == 2
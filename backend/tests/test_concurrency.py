@@ -0,0 +1,99 @@
+import json
+
+import boto3
+import pytest
+
+from conftest import api_event, import_lambda
+
+USER_ID = "etag-user"
+OTHER_USER_ID = "other-etag-user"
+
+
+@pytest.fixture
+def api(applications_table):
+    return import_lambda('applications')
+
+
+@pytest.fixture
+def resumes_api(resume_tables):
+    return import_lambda('resumes')
+
+
+def create(api, user_id=USER_ID):
+    response = api.lambda_handler(api_event(user_id, 'POST', '/applications', body={'job_title': "Engineer"}), None)
+    return json.loads(response['body'])['id'], response['headers']['ETag']
+
+
+def patch(api, app_id, body, etag=None, user_id=USER_ID):
+    headers = {'if-match': etag} if etag else None
+    return api.lambda_handler(api_event(user_id, 'PATCH', f"/applications/{app_id}", body=body,
+                                        path_parameters={'id': app_id}, headers=headers), None)
+
+
+def delete(api, app_id, etag=None, user_id=USER_ID):
+    headers = {'if-match': etag} if etag else None
+    return api.lambda_handler(api_event(user_id, 'DELETE', f"/applications/{app_id}",
+                                        path_parameters={'id': app_id}, headers=headers), None)
+
+
+def test_update_with_current_etag_bumps_the_version(api):
+    app_id, etag = create(api)
+
+    response = patch(api, app_id, {'status': 'offer'}, etag=etag)
+
+    assert response['statusCode'] == 200
+    assert etag == '"1"'
+    assert response['headers']['ETag'] == '"2"'
+
+
+def test_stale_etag_is_a_conflict(api):
+    app_id, etag = create(api)
+    patch(api, app_id, {'status': 'interviewing'}, etag=etag)
+
+    updated = patch(api, app_id, {'status': 'offer'}, etag=etag)
+    deleted = delete(api, app_id, etag=f"W/{etag}")
+
+    assert updated['statusCode'] == deleted['statusCode'] == 412
+    assert json.loads(updated['body']) == {'error': "Item has been modified; current version is 2"}
+    assert json.loads(api.lambda_handler(api_event(USER_ID, 'GET', f"/applications/{app_id}",
+                                                   path_parameters={'id': app_id}), None)['body'])['status'] == 'interviewing'
+
+
+def test_missing_etag_or_wildcard_overwrites(api):
+    app_id, _ = create(api)
+    patch(api, app_id, {'status': 'interviewing'})
+
+    assert patch(api, app_id, {'status': 'offer'}, etag='*')['statusCode'] == 200
+    assert delete(api, app_id)['statusCode'] == 200
+
+
+def test_malformed_etag_is_a_bad_request(api):
+    app_id, _ = create(api)
+
+    assert patch(api, app_id, {'status': 'offer'}, etag='"latest"')['statusCode'] == 400
+
+
+@pytest.mark.parametrize("etag", [None, '"1"', '"7"'])
+def test_missing_or_foreign_item_is_not_found(api, etag):
+    app_id, _ = create(api, user_id=OTHER_USER_ID)
+
+    # A stale version on someone else's item must not reveal that it exists
+    for response in (patch(api, app_id, {'status': 'offer'}, etag=etag), delete(api, app_id, etag=etag),
+                     patch(api, "missing", {'status': 'offer'}, etag=etag), delete(api, "missing", etag=etag)):
+        assert response['statusCode'] == 404
+
+
+def test_resume_rename_checks_if_match(resumes_api, resume_tables):
+    boto3.resource('dynamodb').Table('resumes').put_item(Item={
+        'id': "resume-1", 'user_id': USER_ID, 'file_name': "cv.pdf", 's3_key': f"resumes/{USER_ID}/cv.pdf",
+        'version': 2, 'upload_status': 'completed'})
+
+    def rename(etag, user_id=USER_ID):
+        return resumes_api.lambda_handler(api_event(user_id, 'PATCH', "/resumes/resume-1", body={'file_name': "new.pdf"},
+                                                    path_parameters={'id': "resume-1"}, headers={'if-match': etag}), None)
+
+    assert rename('"1"')['statusCode'] == 412
+    assert rename('"2"', user_id=OTHER_USER_ID)['statusCode'] == 404
+    response = rename('"2"')
+    assert response['statusCode'] == 200
+    assert response['headers']['ETag'] == '"3"'
@@ -0,0 +1,83 @@
+import json
+import threading
+import importlib
+
+import boto3
+import pytest
+
+from conftest import import_lambda
+
+USER_ID = "export-user"
+BUCKET = "export-bucket"
+
+
+@pytest.fixture
+def exporter(applications_table):
+    boto3.client('s3').create_bucket(Bucket=BUCKET)
+    return import_lambda('applications', 'exporter')
+
+
+@pytest.fixture
+def db(exporter):
+    return importlib.import_module('db').ApplicationDynamoDB('applications')
+
+
+def put_application(table, app_id, status="applied", user_id=USER_ID, user_status=True):
+    item = {'id': app_id, 'user_id': user_id, 'job_title': f"Job {app_id}", 'company': "Acme",
+            'status': status, 'version': 1, 'created_at': f"2025-01-01T00:00:{len(app_id):02d}",
+            'date_added': f"2025-01-01T00:00:{len(app_id):02d}"}
+    if user_status:
+        item['user_status'] = f"{user_id}#{status}"
+    table.put_item(Item=item)
+
+
+def reader_threads():
+    return [t for t in threading.enumerate() if t.name.startswith('export-reader')]
+
+
+def test_export_covers_every_status_and_unindexed_rows(exporter, db, applications_table):
+    for i, status in enumerate(sorted(exporter.Application.VALID_STATUSES)):
+        put_application(applications_table, f"app-{i}", status)
+    put_application(applications_table, "legacy", user_status=False)
+    put_application(applications_table, "archived", status="archived")
+    put_application(applications_table, "other-user", user_id="someone-else")
+
+    ids = sorted(item['id'] for item in exporter.iter_user_items(db, USER_ID))
+
+    assert ids == sorted([f"app-{i}" for i in range(len(exporter.Application.VALID_STATUSES))]
+                         + ["legacy", "archived"])
+    assert not reader_threads()
+
+
+def test_export_writes_ndjson_to_s3(exporter, db, applications_table):
+    put_application(applications_table, "app-1")
+
+    result = exporter.export_applications(db, USER_ID, BUCKET, "exports/test.ndjson")
+
+    body = boto3.client('s3').get_object(Bucket=BUCKET, Key="exports/test.ndjson")['Body'].read()
+    assert result['count'] == 1
+    assert [json.loads(line)['id'] for line in body.decode().splitlines()] == ["app-1"]
+
+
+def test_closing_early_stops_readers(exporter, db, applications_table, monkeypatch):
+    monkeypatch.setattr(exporter, 'MAX_BUFFERED_PAGES', 1)
+    pages = [[{'id': f"app-{i}"}] for i in range(50)]
+    monkeypatch.setattr(db, 'iter_pages', lambda plan: iter(pages))
+
+    items = exporter.iter_user_items(db, USER_ID)
+    next(items)
+    items.close()
+
+    assert not reader_threads()
+
+
+def test_reader_error_is_raised_and_readers_stop(exporter, db, monkeypatch):
+    def failing_pages(plan):
+        yield [{'id': "app-1"}]
+        raise RuntimeError("query failed")
+
+    monkeypatch.setattr(db, 'iter_pages', failing_pages)
+
+    with pytest.raises(RuntimeError, match="query failed"):
+        list(exporter.iter_user_items(db, USER_ID))
+    assert not reader_threads()
@@ -0,0 +1,55 @@
+import importlib
+
+import boto3
+import pytest
+
+from conftest import import_lambda
+
+USER_ID = "extract-user"
+BUCKET = "test-resumes"
+
+
+@pytest.fixture
+def extractor(resume_tables):
+    return import_lambda('resumes', 'extractor')
+
+
+def upload(extractor, file_name, data):
+    resume_model = importlib.import_module('models').Resume
+    resume = extractor.db.create(resume_model(id="resume-1", user_id=USER_ID, file_name=file_name,
+                                              s3_key=f"{USER_ID}/resume-1/{file_name}"))
+    boto3.client('s3').put_object(Bucket=BUCKET, Key=resume.s3_key, Body=data)
+    extractor.process_upload(BUCKET, resume.s3_key)
+    return boto3.resource('dynamodb').Table('resumes').get_item(Key={'id': resume.id})['Item']
+
+
+def test_short_resume_is_stored_whole(extractor):
+    item = upload(extractor, "resume.txt", b"Jane Doe\n\nSkills\nPython, SQL\n")
+
+    assert item['upload_status'] == "completed"
+    assert item['text'] == "Jane Doe\n\nSkills\nPython, SQL"
+    assert item['text_stats']['truncated'] is False
+    assert [s['name'] for s in item['sections']] == ["skills"]
+
+
+def test_multibyte_text_is_capped_by_encoded_item_size(extractor):
+    # 150k characters of 3-byte UTF-8 is ~450 KB, over the item limit despite being few characters
+    lines = ["経験" * 20 for _ in range(3500)]
+    data = ("Experience\n" + "\n".join(lines)).encode("utf-8")
+
+    item = upload(extractor, "resume.txt", data)
+
+    assert item['upload_status'] == "completed"
+    assert item['text_stats']['truncated'] is True
+    assert extractor.attribute_size(item) <= extractor.MAX_ITEM_BYTES
+    assert item['text'].encode("utf-8").decode("utf-8") == item['text']
+
+
+def test_extraction_fits_the_budget_it_is_given(extractor):
+    text = "\n".join(f"Skills\n{'é' * 50}" for _ in range(2000)).encode("utf-8")
+
+    extraction = extractor.extract_resume("resume.txt", text, 20_000)
+
+    assert extractor.attribute_size(extraction) <= 20_000
+    assert extraction['text_stats']['truncated'] is True
+    assert len(extraction['sections']) > 1
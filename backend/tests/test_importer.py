@@ -0,0 +1,85 @@
+import io
+import importlib
+from datetime import datetime
+
+import boto3
+import pytest
+
+from conftest import import_lambda
+
+USER_ID = "import-user"
+JOB_ID = "job-1"
+
+
+@pytest.fixture
+def importer(applications_table):
+    boto3.client('dynamodb').create_table(
+        TableName='application_imports',
+        AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}],
+        KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    module = import_lambda('applications', 'importer')
+    import_job = importlib.import_module('models').ImportJob
+    module.jobs.create(import_job(id=JOB_ID, user_id=USER_ID, s3_key=module.import_key(USER_ID, JOB_ID, 'csv')))
+    return module
+
+
+def run_csv(importer, text):
+    importer.import_rows(USER_ID, JOB_ID, importer.read_csv_rows(io.BytesIO(text.encode('utf-8'))))
+    return importer.jobs.get_by_id(JOB_ID)
+
+
+def imported(applications_table):
+    return {item['job_title']: item for item in applications_table.scan()['Items']}
+
+
+def test_csv_creation_date_is_kept(importer, applications_table):
+    job = run_csv(importer, "Job Title,Company,Date Applied\n"
+                            "Engineer,Acme,2024-05-01\n"
+                            "Analyst,Initech,2024-06-02T09:30:00+02:00\n"
+                            "Designer,Globex,\n")
+
+    items = imported(applications_table)
+    assert job.rows_imported == 3
+    assert items['Engineer']['created_at'] == "2024-05-01T00:00:00"
+    assert items['Engineer']['date_added'] == "2024-05-01T00:00:00"
+    assert items['Analyst']['created_at'] == "2024-06-02T07:30:00"
+    assert datetime.fromisoformat(items['Designer']['created_at']).year >= 2025
+
+
+def test_invalid_creation_date_fails_the_row(importer, applications_table):
+    job = run_csv(importer, "job_title,company,created_at\nEngineer,Acme,yesterday\nAnalyst,Initech,2024-01-01\n")
+
+    assert job.rows_imported == 1
+    assert job.rows_failed == 1
+    assert job.errors == ["Row 1: invalid date 'yesterday'. Use ISO 8601, e.g. 2024-05-01"]
+
+
+@pytest.fixture
+def serial_importer(importer, monkeypatch):
+    # moto's in-process table is not safe for concurrent list_append updates
+    monkeypatch.setattr(importer, 'MAX_CHUNKS_IN_FLIGHT', 1)
+    return importer
+
+
+def test_recorded_errors_are_capped_across_the_job(serial_importer):
+    importer = serial_importer
+    rows = "".join(f"Job {i},Acme,unknown\n" for i in range(importer.MAX_RECORDED_ERRORS * 3))
+    job = run_csv(importer, "job_title,company,status\n" + rows)
+
+    assert job.rows_failed == importer.MAX_RECORDED_ERRORS * 3
+    assert len(job.errors) == importer.MAX_RECORDED_ERRORS
+
+
+def test_write_errors_count_towards_the_cap(serial_importer, monkeypatch):
+    importer = serial_importer
+    def failing_batch_write(user_id, operations):
+        return [{'op': 'create', 'id': None, 'status': 'error', 'error': 'Throughput exceeded'} for _ in operations]
+
+    monkeypatch.setattr(importer.db, 'batch_write', failing_batch_write)
+    rows = "".join(f"Job {i},Acme\n" for i in range(importer.MAX_RECORDED_ERRORS * 2))
+    job = run_csv(importer, "job_title,company\n" + rows)
+
+    assert job.rows_failed == importer.MAX_RECORDED_ERRORS * 2
+    assert len(job.errors) == importer.MAX_RECORDED_ERRORS
@@ -0,0 +1,112 @@
+import json
+import importlib
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import api_event, import_lambda
+
+USER_ID = "page-user"
+OTHER_USER_ID = "other-page-user"
+
+
+@pytest.fixture
+def api(applications_table):
+    return import_lambda('applications')
+
+
+def put_applications(applications_table, count, user_id=USER_ID, **fields):
+    """Write `count` applications a day apart; every third one is at Acme unless overridden."""
+    start = datetime(2025, 1, 1)
+    for i in range(count):
+        created_at = (start + timedelta(days=i)).isoformat()
+        item = {'id': f"{user_id}-{i:02d}", 'user_id': user_id, 'job_title': f"Job {i}",
+                'company': "Acme" if i % 3 == 0 else "Initech", 'status': 'applied',
+                'created_at': created_at, 'date_added': created_at,
+                'user_status': f"{user_id}#applied", **fields}
+        applications_table.put_item(Item=item)
+
+
+def list_page(api, user_id=USER_ID, **query):
+    event = api_event(user_id, 'GET', '/applications')
+    event['queryStringParameters'] = {k: str(v) for k, v in query.items()}
+    return api.lambda_handler(event, None)
+
+
+def test_filtered_page_is_filled_across_several_reads(api, applications_table, monkeypatch):
+    put_applications(applications_table, 12)
+    db_module = importlib.import_module('db')
+    # Read three rows per request so one page of Acme matches needs several
+    monkeypatch.setattr(db_module, 'FILTERED_PAGE_SIZE', 3)
+    reads = []
+    query = api.db.table.query
+    monkeypatch.setattr(api.db.table, 'query', lambda **params: reads.append(params) or query(**params))
+
+    response = list_page(api, company="Acme", limit=3)
+
+    body = json.loads(response['body'])
+    assert response['statusCode'] == 200
+    assert [app['job_title'] for app in body['applications']] == ["Job 9", "Job 6", "Job 3"]
+    assert len(reads) > 1
+    assert all(params['Limit'] == 3 for params in reads)
+    assert body['next_cursor']
+
+
+def test_cursor_resumes_after_the_last_returned_match(api, applications_table, monkeypatch):
+    put_applications(applications_table, 12)
+    monkeypatch.setattr(importlib.import_module('db'), 'FILTERED_PAGE_SIZE', 4)
+
+    titles = []
+    cursor = None
+    while True:
+        query = {'company': "Acme", 'limit': 2}
+        if cursor:
+            query['cursor'] = cursor
+        body = json.loads(list_page(api, **query)['body'])
+        titles.extend(app['job_title'] for app in body['applications'])
+        cursor = body['next_cursor']
+        if not cursor:
+            break
+
+    assert titles == ["Job 9", "Job 6", "Job 3", "Job 0"]
+
+
+def first_cursor(api, **query):
+    return json.loads(list_page(api, limit=1, **query)['body'])['next_cursor']
+
+
+def test_tampered_cursor_is_rejected(api, applications_table):
+    put_applications(applications_table, 3)
+    payload, signature = first_cursor(api).split('.')
+    forged = payload[:-2] + ("AA" if payload[-2:] != "AA" else "BB")
+
+    for cursor in (f"{forged}.{signature}", f"{payload}.{signature[::-1]}", "not-a-cursor"):
+        response = list_page(api, limit=1, cursor=cursor)
+        assert response['statusCode'] == 400
+        assert json.loads(response['body']) == {'error': "Invalid cursor"}
+
+
+def test_cursor_from_another_user_is_rejected(api, applications_table):
+    put_applications(applications_table, 3)
+    put_applications(applications_table, 3, user_id=OTHER_USER_ID)
+
+    response = list_page(api, user_id=OTHER_USER_ID, limit=1, cursor=first_cursor(api))
+
+    assert response['statusCode'] == 400
+
+
+def test_cursor_from_another_index_is_rejected(api, applications_table):
+    put_applications(applications_table, 3)
+    user_index_cursor = first_cursor(api)
+
+    response = list_page(api, limit=1, status="applied", cursor=user_index_cursor)
+
+    assert response['statusCode'] == 400
+    assert list_page(api, limit=1, cursor=user_index_cursor)['statusCode'] == 200
+
+
+def test_missing_cursor_secret_fails_at_import(aws, monkeypatch):
+    monkeypatch.delenv("CURSOR_SECRET")
+
+    with pytest.raises(RuntimeError, match="CURSOR_SECRET"):
+        import_lambda('applications', 'pagination')
@@ -0,0 +1,74 @@
+import pytest
+
+from conftest import import_lambda
+
+USER_ID = "plan-user"
+OTHER_USER_ID = "other-plan-user"
+
+
+@pytest.fixture
+def planner():
+    return import_lambda('applications', 'planner')
+
+
+@pytest.fixture
+def db(applications_table):
+    return import_lambda('applications', 'db').ApplicationDynamoDB('applications')
+
+
+@pytest.mark.parametrize("filters, index_name, has_filter", [
+    ({}, 'UserIndex', False),
+    ({'date_from': "2025-01-01", 'date_to': "2025-02-01"}, 'UserIndex', False),
+    ({'company': "Acme"}, 'UserIndex', True),
+    ({'min_pay': 100000, 'max_pay': 150000}, 'UserIndex', True),
+    ({'status': "offer"}, 'UserStatusIndex', False),
+    ({'status': "offer", 'date_from': "2025-01-01"}, 'UserStatusIndex', False),
+    ({'status': "offer", 'job_title': "Engineer"}, 'UserStatusIndex', True),
+    # Resume ids are the narrowest key, but reads through them are always checked for ownership
+    ({'resume_id': "resume-1"}, 'ResumeIndex', True),
+    ({'resume_id': "resume-1", 'status': "offer"}, 'ResumeIndex', True),
+])
+def test_index_choice(planner, filters, index_name, has_filter):
+    plan = planner.plan_query(user_id=USER_ID, **filters)
+
+    assert plan.index_name == index_name
+    assert plan.key_attributes == planner.INDEX_KEY_ATTRIBUTES[index_name]
+    assert plan.explain()['has_filter'] is has_filter
+
+
+def test_date_range_is_a_key_condition(planner):
+    plan = planner.plan_query(user_id=USER_ID, status="applied", date_from="2025-01-01", date_to="2025-02-01")
+
+    assert plan.steps == [
+        f"key: UserStatusIndex user_status = {USER_ID}#applied",
+        "key: date_added between 2025-01-01 and 2025-02-01",
+    ]
+
+
+def put(applications_table, app_id, user_id=USER_ID, status="applied", resume_id=None, created_at="2025-01-10"):
+    item = {'id': app_id, 'user_id': user_id, 'status': status, 'created_at': created_at, 'date_added': created_at,
+            'user_status': f"{user_id}#{status}"}
+    if resume_id:
+        item['resume_id'] = item['resume_used_id'] = resume_id
+    applications_table.put_item(Item=item)
+
+
+def matching_ids(planner, db, **filters):
+    apps, _ = db.query_page(planner.plan_query(user_id=USER_ID, **filters), limit=50)
+    return sorted(app.id for app in apps)
+
+
+def test_plans_return_only_matching_rows(planner, db, applications_table):
+    put(applications_table, "a1")
+    put(applications_table, "a2", status="offer")
+    put(applications_table, "a3", status="offer", created_at="2025-03-01")
+    put(applications_table, "a4", resume_id="resume-1")
+    put(applications_table, "b1", user_id=OTHER_USER_ID, status="offer")
+    # Another user's row pointing at the same resume id
+    put(applications_table, "b2", user_id=OTHER_USER_ID, resume_id="resume-1")
+
+    assert matching_ids(planner, db) == ["a1", "a2", "a3", "a4"]
+    assert matching_ids(planner, db, status="offer") == ["a2", "a3"]
+    assert matching_ids(planner, db, status="offer", date_to="2025-02-01") == ["a2"]
+    assert matching_ids(planner, db, resume_id="resume-1") == ["a4"]
+    assert matching_ids(planner, db, resume_id="resume-1", status="offer") == []
@@ -0,0 +1,60 @@
+import json
+import importlib
+import hashlib
+
+import boto3
+import pytest
+
+from conftest import api_event, import_lambda
+
+USER_ID = "cache-user"
+OTHER_USER_ID = "other-user"
+BUCKET = "test-resumes"
+DATA = b"Jane Doe\nSkills\nPython\n"
+SHA256 = hashlib.sha256(DATA).hexdigest()
+
+
+@pytest.fixture
+def answers(resume_tables, monkeypatch):
+    boto3.client('dynamodb').create_table(
+        TableName='analysis_cache',
+        AttributeDefinitions=[{'AttributeName': 'tag', 'AttributeType': 'S'},
+                              {'AttributeName': 'key', 'AttributeType': 'S'}],
+        KeySchema=[{'AttributeName': 'tag', 'KeyType': 'HASH'}, {'AttributeName': 'key', 'KeyType': 'RANGE'}],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    monkeypatch.setenv('ANALYSIS_CACHE_TABLE', 'analysis_cache')
+    table = boto3.resource('dynamodb').Table('analysis_cache')
+    for user_id in (USER_ID, OTHER_USER_ID):
+        for key in ("answer-1", "answer-2"):
+            table.put_item(Item={'tag': f"resume_assistant#{user_id}", 'key': key, 'value': '"cached"'})
+    return table
+
+
+def cached_users(table):
+    return sorted({item['tag'].split('#', 1)[1] for item in table.scan()['Items']})
+
+
+def test_extracted_upload_drops_the_users_cached_answers(answers):
+    api = import_lambda('resumes')
+    extractor = import_lambda('resumes', 'extractor')
+    response = api.lambda_handler(api_event(USER_ID, 'POST', '/resumes/upload-url', body={
+        'file_name': "resume.txt", 'content_length': len(DATA), 'sha256': SHA256}), None)
+    key = api.db.get_by_id(json.loads(response['body'])['resume_id']).s3_key
+    boto3.client('s3').put_object(Bucket=BUCKET, Key=key, Body=DATA)
+
+    extractor.process_content_upload(BUCKET, key)
+
+    assert cached_users(answers) == [OTHER_USER_ID]
+
+
+def test_rename_drops_the_users_cached_answers(answers):
+    api = import_lambda('resumes')
+    resume_model = importlib.import_module('models').Resume
+    api.db.create(resume_model(id="resume-1", user_id=USER_ID, file_name="old.pdf", s3_key="k"))
+
+    response = api.lambda_handler(api_event(USER_ID, 'PATCH', '/resumes/resume-1', body={'file_name': "new.pdf"},
+                                            path_parameters={'id': "resume-1"}), None)
+
+    assert response['statusCode'] == 200
+    assert cached_users(answers) == [OTHER_USER_ID]
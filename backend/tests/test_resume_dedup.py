@@ -0,0 +1,141 @@
+import json
+import hashlib
+from datetime import datetime, timedelta
+
+import boto3
+import pytest
+
+from conftest import api_event, import_lambda
+
+USER_ID = "dedup-user"
+BUCKET = "test-resumes"
+DATA = b"Jane Doe\nExperience\nEngineer at Acme\n"
+SHA256 = hashlib.sha256(DATA).hexdigest()
+
+
+@pytest.fixture
+def api(resume_tables):
+    return import_lambda('resumes')
+
+
+@pytest.fixture
+def extractor(api):
+    return import_lambda('resumes', 'extractor')
+
+
+def request_upload(api, file_name="resume.txt", sha256=SHA256):
+    response = api.lambda_handler(api_event(USER_ID, 'POST', '/resumes/upload-url', body={
+        'file_name': file_name, 'content_length': len(DATA), 'sha256': sha256}), None)
+    assert response['statusCode'] == 200
+    return json.loads(response['body'])
+
+
+def resume(api, resume_id):
+    return api.db.get_by_id(resume_id)
+
+
+def content(api):
+    return api.contents.get(USER_ID, SHA256)
+
+
+def test_content_key_has_no_file_name(api):
+    upload = request_upload(api)
+
+    assert resume(api, upload['resume_id']).s3_key == f"{USER_ID}/content/{SHA256}"
+    assert content(api).file_name == "resume.txt"
+    assert content(api).upload_status == "pending"
+
+
+def test_second_upload_references_the_pending_claim(api, extractor):
+    first = request_upload(api, "resume.txt")
+    second = request_upload(api, "resume-copy.txt")
+
+    assert first['duplicate'] is False and first['presigned_url']
+    assert second['duplicate'] is True and second['presigned_url'] is None
+    assert resume(api, second['resume_id']).upload_status == "pending"
+
+    key = resume(api, first['resume_id']).s3_key
+    boto3.client('s3').put_object(Bucket=BUCKET, Key=key, Body=DATA)
+    extractor.process_content_upload(BUCKET, key)
+
+    assert content(api).upload_status == "completed"
+    assert "Engineer at Acme" in content(api).text
+    assert resume(api, first['resume_id']).upload_status == "completed"
+    assert resume(api, second['resume_id']).upload_status == "completed"
+
+
+def test_duplicate_object_is_deleted_on_dedup_hit(api, extractor):
+    upload = request_upload(api)
+    key = resume(api, upload['resume_id']).s3_key
+    s3 = boto3.client('s3')
+    s3.put_object(Bucket=BUCKET, Key=key, Body=DATA)
+    extractor.process_content_upload(BUCKET, key)
+
+    # An upload that raced past the claim under the old per-file-name key
+    legacy_key = f"{key}/resume-copy.txt"
+    s3.put_object(Bucket=BUCKET, Key=legacy_key, Body=DATA)
+    extractor.process_content_upload(BUCKET, legacy_key)
+
+    keys = [obj['Key'] for obj in s3.list_objects_v2(Bucket=BUCKET)['Contents']]
+    assert keys == [key]
+
+
+def test_hash_mismatch_releases_the_claim(api, extractor):
+    upload = request_upload(api)
+    key = resume(api, upload['resume_id']).s3_key
+    boto3.client('s3').put_object(Bucket=BUCKET, Key=key, Body=b"something else")
+    extractor.process_content_upload(BUCKET, key)
+
+    assert content(api).upload_status == "failed"
+    assert resume(api, upload['resume_id']).upload_status == "failed"
+    assert request_upload(api)['duplicate'] is False
+
+
+
+def test_overwritten_verified_object_is_deleted_and_can_be_uploaded_again(api, extractor):
+    upload = request_upload(api)
+    key = resume(api, upload['resume_id']).s3_key
+    s3 = boto3.client('s3')
+    s3.put_object(Bucket=BUCKET, Key=key, Body=DATA)
+    extractor.process_content_upload(BUCKET, key)
+
+    # A second PUT to the canonical key replaces the verified bytes
+    s3.put_object(Bucket=BUCKET, Key=key, Body=b"something else")
+    extractor.process_content_upload(BUCKET, key)
+
+    assert s3.list_objects_v2(Bucket=BUCKET).get('KeyCount') == 0
+    assert content(api).upload_status == "failed"
+    # The already extracted resume keeps its text
+    assert resume(api, upload['resume_id']).upload_status == "completed"
+
+    again = request_upload(api)
+    assert again['duplicate'] is False
+    s3.put_object(Bucket=BUCKET, Key=key, Body=DATA)
+    extractor.process_content_upload(BUCKET, key)
+    assert content(api).upload_status == "completed"
+    assert [obj['Key'] for obj in s3.list_objects_v2(Bucket=BUCKET)['Contents']] == [key]
+
+def test_aborted_multipart_upload_releases_the_claim(api):
+    started = api.lambda_handler(api_event(USER_ID, 'POST', '/resumes/uploads', body={
+        'file_name': "resume.txt", 'content_length': len(DATA), 'sha256': SHA256}), None)
+    resume_id = json.loads(started['body'])['resume_id']
+    waiting = request_upload(api)
+
+    aborted = api.lambda_handler(api_event(USER_ID, 'DELETE', f"/resumes/uploads/{resume_id}",
+                                           path_parameters={'id': resume_id}), None)
+
+    assert aborted['statusCode'] == 200
+    assert content(api).upload_status == "failed"
+    assert resume(api, waiting['resume_id']).upload_status == "failed"
+    assert request_upload(api)['duplicate'] is False
+
+
+def test_stale_pending_claim_is_taken_over(api):
+    request_upload(api)
+    stale = (datetime.utcnow() - timedelta(days=2)).isoformat()
+    boto3.resource('dynamodb').Table('resume_contents').update_item(
+        Key={'user_id': USER_ID, 'sha256': SHA256},
+        UpdateExpression="SET updated_at = :stale",
+        ExpressionAttributeValues={':stale': stale})
+
+    assert request_upload(api)['duplicate'] is False
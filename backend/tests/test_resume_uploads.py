@@ -0,0 +1,111 @@
+import json
+import hashlib
+
+import boto3
+import pytest
+
+from conftest import api_event, import_lambda
+
+USER_ID = "upload-user"
+BUCKET = "test-resumes"
+MIB = 1024 * 1024
+DATA = bytes(range(256)) * (6 * MIB // 256)
+SHA256 = hashlib.sha256(DATA).hexdigest()
+
+
+@pytest.fixture
+def api(resume_tables):
+    return import_lambda('resumes')
+
+
+def call(api, method, path, body=None, resume_id=None):
+    response = api.lambda_handler(api_event(USER_ID, method, path, body=body,
+                                            path_parameters={'id': resume_id} if resume_id else None), None)
+    return response['statusCode'], json.loads(response['body'])
+
+
+def start(api, content_length=len(DATA)):
+    return call(api, 'POST', '/resumes/uploads', body={
+        'file_name': "portfolio.pdf", 'content_length': content_length, 'sha256': SHA256})
+
+
+def upload_parts(api, resume_id, parts):
+    resume = api.db.get_by_id(resume_id)
+    s3 = boto3.client('s3')
+    for number, body in parts:
+        s3.upload_part(Bucket=BUCKET, Key=resume.s3_key, UploadId=resume.upload_id, PartNumber=number, Body=body)
+
+
+def complete(api, resume_id):
+    return call(api, 'POST', f"/resumes/uploads/{resume_id}/complete", resume_id=resume_id)
+
+
+def open_uploads():
+    return boto3.client('s3').list_multipart_uploads(Bucket=BUCKET).get('Uploads', [])
+
+
+def test_upload_completes_from_parts_s3_holds(api):
+    status, started = start(api)
+    assert status == 201
+    assert [(p['part_number'], p['size']) for p in started['parts']] == [(1, 5 * MIB), (2, MIB)]
+
+    upload_parts(api, started['resume_id'], [(1, DATA[:5 * MIB]), (2, DATA[5 * MIB:])])
+    status, resume = complete(api, started['resume_id'])
+
+    assert status == 200
+    assert 'upload_id' not in resume
+    obj = boto3.client('s3').head_object(Bucket=BUCKET, Key=resume['s3_key'])
+    assert obj['ContentLength'] == len(DATA)
+    assert not open_uploads()
+
+
+def test_oversize_upload_is_rejected_before_starting(api):
+    status, body = start(api, content_length=26 * MIB)
+
+    assert status == 400
+    assert "at most 25 MB" in body['error']
+    assert not open_uploads()
+    assert api.db.get_by_user_id(USER_ID) == []
+
+
+def test_missing_parts_keep_the_upload_resumable(api):
+    _, started = start(api)
+    upload_parts(api, started['resume_id'], [(1, DATA[:5 * MIB])])
+
+    status, body = complete(api, started['resume_id'])
+    assert status == 400
+    assert body['error'] == "Upload is missing parts: 2"
+
+    status, progress = call(api, 'GET', f"/resumes/uploads/{started['resume_id']}", resume_id=started['resume_id'])
+    assert status == 200
+    assert progress['uploaded_bytes'] == 5 * MIB
+    assert [p['part_number'] for p in progress['parts']] == [2]
+    assert len(open_uploads()) == 1
+
+
+def test_part_size_mismatch_fails_and_aborts_the_upload(api):
+    _, started = start(api)
+    upload_parts(api, started['resume_id'], [(1, DATA[:5 * MIB]), (2, DATA[5 * MIB:] + b"extra")])
+
+    status, body = complete(api, started['resume_id'])
+
+    assert status == 400
+    assert body['error'] == "Uploaded parts do not match the declared content length"
+    resume = api.db.get_by_id(started['resume_id'])
+    assert resume.upload_status == "failed"
+    assert resume.upload_id is None
+    assert api.contents.get(USER_ID, SHA256).upload_status == "failed"
+    assert not open_uploads()
+
+
+def test_cancelled_upload_leaves_nothing_open(api):
+    _, started = start(api)
+    upload_parts(api, started['resume_id'], [(1, DATA[:5 * MIB])])
+
+    status, resume = call(api, 'DELETE', f"/resumes/uploads/{started['resume_id']}", resume_id=started['resume_id'])
+
+    assert status == 200
+    assert resume['upload_status'] == "failed"
+    assert not open_uploads()
+    status, _ = complete(api, started['resume_id'])
+    assert status == 409
@@ -0,0 +1,156 @@
+from decimal import Decimal
+
+import boto3
+import pytest
+from boto3.dynamodb.types import TypeSerializer
+
+from conftest import import_lambda
+
+USER_ID = "stats-user"
+serializer = TypeSerializer()
+
+
+@pytest.fixture
+def stream(aws):
+    boto3.client('dynamodb').create_table(
+        TableName='application_stats',
+        AttributeDefinitions=[
+            {'AttributeName': 'user_id', 'AttributeType': 'S'},
+            {'AttributeName': 'sk', 'AttributeType': 'S'},
+        ],
+        KeySchema=[
+            {'AttributeName': 'user_id', 'KeyType': 'HASH'},
+            {'AttributeName': 'sk', 'KeyType': 'RANGE'},
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    return import_lambda('stats')
+
+
+def image(app_id="app-1", status="applied", company="Acme", created_at="2025-03-04T10:00:00", pay=None):
+    item = {'id': app_id, 'user_id': USER_ID, 'status': status, 'company': company,
+            'created_at': created_at, 'date_added': created_at}
+    if pay is not None:
+        item['pay'] = Decimal(pay)
+    return {k: serializer.serialize(v) for k, v in item.items()}
+
+
+def record(event_name, sequence, new=None, old=None):
+    change = {'SequenceNumber': sequence}
+    if new is not None:
+        change['NewImage'] = new
+    if old is not None:
+        change['OldImage'] = old
+    return {'eventID': f"event-{sequence}", 'eventName': event_name, 'dynamodb': change}
+
+
+def replay(stream, *records):
+    return stream.lambda_handler({'Records': list(records)}, None)
+
+
+def stats(stream):
+    return stream.db.get(USER_ID)
+
+
+def test_insert_counts_application(stream):
+    assert replay(stream, record('INSERT', '100', new=image(pay=123000))) == {'batchItemFailures': []}
+
+    result = stats(stream)
+    assert result.total == 1
+    assert result.by_status == {'applied': 1}
+    assert result.by_company == {'Acme': 1}
+    assert result.by_week == {'2025-W10': 1}
+    assert result.pay_histogram == {'120000': 1}
+    assert result.transitions == {}
+
+
+def test_modify_moves_status_and_records_transition(stream):
+    replay(stream,
+           record('INSERT', '100', new=image()),
+           record('MODIFY', '200', new=image(status='interviewing'), old=image()))
+
+    result = stats(stream)
+    assert result.total == 1
+    assert result.by_status == {'interviewing': 1}
+    assert result.transitions == {'applied>interviewing': 1}
+
+
+def test_remove_drops_contribution(stream):
+    replay(stream,
+           record('INSERT', '100', new=image()),
+           record('REMOVE', '200', old=image()))
+
+    result = stats(stream)
+    assert result.total == 0
+    assert result.by_status == {}
+    assert result.by_company == {}
+    assert result.by_week == {}
+
+
+def test_duplicate_record_is_skipped(stream):
+    insert = record('INSERT', '100', new=image())
+    replay(stream, insert)
+
+    assert stream.process_record(insert) is False
+    assert stats(stream).total == 1
+
+
+def test_out_of_order_record_does_not_regress(stream):
+    replay(stream, record('MODIFY', '300', new=image(status='offer'), old=image()))
+
+    assert stream.process_record(record('INSERT', '100', new=image())) is False
+    result = stats(stream)
+    assert result.total == 1
+    assert result.by_status == {'offer': 1}
+
+
+def test_sequence_numbers_compare_numerically_beyond_number_precision(stream):
+    # 40-digit sequence numbers exceed DynamoDB's 38 digits of Number precision
+    first = '9' * 39
+    second = '1' + '0' * 39
+    replay(stream,
+           record('INSERT', first, new=image()),
+           record('MODIFY', second, new=image(status='rejected'), old=image()))
+
+    assert stream.process_record(record('MODIFY', first, new=image(status='offer'))) is False
+    assert stats(stream).by_status == {'rejected': 1}
+
+
+def test_marker_written_as_number_is_still_compared(stream):
+    table = boto3.resource('dynamodb').Table('application_stats')
+    table.put_item(Item={'user_id': USER_ID, 'sk': 'app#app-1', 'status': 'applied', 'seq': Decimal(500)})
+
+    assert stream.process_record(record('MODIFY', '400', new=image(status='offer'))) is False
+    assert stream.process_record(record('MODIFY', '600', new=image(status='offer'))) is True
+
+
+def test_company_and_week_counters_stay_off_summary_item(stream):
+    replay(stream, *[
+        record('INSERT', str(100 + i), new=image(app_id=f"app-{i}", company=f"Company {i}",
+                                                 created_at=f"20{20 + i % 5}-0{1 + i % 9}-10T00:00:00"))
+        for i in range(60)
+    ])
+
+    table = boto3.resource('dynamodb').Table('application_stats')
+    summary = table.get_item(Key={'user_id': USER_ID, 'sk': 'summary'})['Item']
+    assert not any(k.startswith(('company#', 'week#')) for k in summary)
+
+    result = stats(stream)
+    assert result.total == 60
+    assert len(result.by_company) == 60
+    assert sum(result.by_week.values()) == 60
+
+
+def test_summary_written_before_sharding_is_merged(stream):
+    table = boto3.resource('dynamodb').Table('application_stats')
+    table.put_item(Item={'user_id': USER_ID, 'sk': 'summary', 'total': 1,
+                         'status#applied': 1, 'company#Acme': 1, 'updated_at': '2025-01-01T00:00:00'})
+    table.put_item(Item={'user_id': USER_ID, 'sk': 'app#app-1', 'status': 'applied', 'company': 'Acme',
+                         'seq': '1'.zfill(40)})
+
+    replay(stream, record('REMOVE', '200', old=image()))
+
+    result = stats(stream)
+    assert result.total == 0
+    assert result.by_company == {}
+    assert result.updated_at > '2025-01-01T00:00:00'
@@ -9,7 +9,7 @@ interface Message {
 }
 
 function AgentChat() {
-  const { user } = useAuth0();
+  const { user, getAccessTokenSilently } = useAuth0();
   const [messages, setMessages] = useState<Message[]>([]);
   const [input, setInput] = useState('');
   const [isLoading, setIsLoading] = useState(false);
@@ -24,6 +24,29 @@ function AgentChat() {
     scrollToBottom();
   }, [messages]);
 
+  useEffect(() => {
+    const loadHistory = async () => {
+      try {
+        const token = await getAccessTokenSilently();
+        const response = await fetch(
+          `http://localhost:8000/conversations?session_id=${encodeURIComponent(sessionId.current)}&limit=50`,
+          { headers: { 'Authorization': `Bearer ${token}` } }
+        );
+        if (!response.ok) return;
+        const data: { messages: { role: 'user' | 'assistant'; content: string }[] } = await response.json();
+        setMessages((prev) =>
+          prev.length
+            ? prev
+            : data.messages.map((m) => ({ role: m.role, content: m.content, timestamp: new Date() }))
+        );
+      } catch (error) {
+        console.error('Error loading conversation history:', error);
+      }
+    };
+
+    loadHistory();
+  }, []);
+
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
     if (!input.trim() || isLoading) return;
@@ -39,10 +62,12 @@ function AgentChat() {
     setIsLoading(true);
 
     try {
+      const token = await getAccessTokenSilently();
       const response = await fetch('http://localhost:8000/agent-streaming', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'Authorization': `Bearer ${token}`,
         },
         body: JSON.stringify({
           prompt: userMessage.content,
@@ -9,10 +9,48 @@ interface Resume {
   created_at?: string;
 }
 
+interface UploadPart {
+  part_number: number;
+  size: number;
+  url: string;
+}
+
+interface UploadPlan {
+  resume_id: string;
+  duplicate?: boolean;
+  part_size: number;
+  parts: UploadPart[];
+}
+
 interface ResumeUploadProps {
   onUploadComplete: () => void;
 }
 
+const UPLOADS_URL = 'https://htnpjvh1wh.execute-api.us-east-1.amazonaws.com/resumes/uploads';
+const PART_ATTEMPTS = 3;
+const MAX_UPLOAD_ROUNDS = 5;
+
+// Lets the server store a file the user already uploaded only once
+async function sha256Hex(file: File): Promise<string> {
+  const digest = await crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+  return Array.from(new Uint8Array(digest), byte => byte.toString(16).padStart(2, '0')).join('');
+}
+
+// A failed part is retried with backoff; it is left for the next round if it never succeeds
+async function uploadPart(url: string, body: Blob): Promise<void> {
+  for (let attempt = 0; attempt < PART_ATTEMPTS; attempt++) {
+    try {
+      const response = await fetch(url, { method: 'PUT', body });
+      if (response.ok) {
+        return;
+      }
+    } catch (error) {
+      console.warn('Part upload failed, retrying:', error);
+    }
+    await new Promise(resolve => setTimeout(resolve, 1000 * 2 ** attempt));
+  }
+}
+
 function ResumeUpload({ onUploadComplete }: ResumeUploadProps) {
   const { getAccessTokenSilently } = useAuth0();
   const [uploading, setUploading] = useState(false);
@@ -20,58 +58,93 @@ function ResumeUpload({ onUploadComplete }: ResumeUploadProps) {
   const [uploadProgress, setUploadProgress] = useState<string>('');
 
   const uploadResume = async (file: File) => {
+    // Lets a re-selected file continue an interrupted upload after a reload
+    const uploadKey = `resume-upload:${file.name}:${file.size}:${file.lastModified}`;
     try {
       setUploading(true);
-      setUploadProgress('Getting upload URL...');
+      setUploadProgress('Preparing upload...');
 
       const token = await getAccessTokenSilently();
-
-      // Step 1: Get pre-signed URL
-      const uploadUrlResponse = await fetch('https://htnpjvh1wh.execute-api.us-east-1.amazonaws.com/resumes/upload-url', {
-        method: 'POST',
-        headers: {
-          'Authorization': `Bearer ${token}`,
-          'Content-Type': 'application/json'
-        },
-        body: JSON.stringify({
-          file_name: file.name,
-          content_type: file.type
-        })
-      });
-
-      if (!uploadUrlResponse.ok) {
-        throw new Error('Failed to get upload URL');
+      const headers = {
+        'Authorization': `Bearer ${token}`,
+        'Content-Type': 'application/json'
+      };
+
+      // Step 1: Start a multipart upload, or pick up the missing parts of an earlier one
+      let upload: UploadPlan | null = null;
+      const previousId = localStorage.getItem(uploadKey);
+      if (previousId) {
+        const progressResponse = await fetch(`${UPLOADS_URL}/${previousId}`, { headers });
+        if (progressResponse.ok) {
+          upload = await progressResponse.json();
+        } else {
+          localStorage.removeItem(uploadKey);
+        }
       }
-
-      const { presigned_url, resume_id } = await uploadUrlResponse.json();
-
-      // Step 2: Upload file to S3
-      setUploadProgress('Uploading file...');
-      const s3Response = await fetch(presigned_url, {
-        method: 'PUT',
-        body: file,
-        headers: {
-          'Content-Type': file.type
+      if (!upload) {
+        const sha256 = await sha256Hex(file);
+        const startResponse = await fetch(UPLOADS_URL, {
+          method: 'POST',
+          headers,
+          body: JSON.stringify({
+            file_name: file.name,
+            content_type: file.type,
+            content_length: file.size,
+            sha256
+          })
+        });
+        if (!startResponse.ok) {
+          const { error } = await startResponse.json();
+          throw new Error(error || 'Failed to start upload');
+        }
+        upload = await startResponse.json();
+        localStorage.setItem(uploadKey, upload!.resume_id);
+      }
+      const { resume_id, part_size } = upload!;
+
+      // Step 2: Upload the missing parts, asking the server again for whatever
+      // is still missing (with fresh URLs) when a part keeps failing
+      let parts = upload!.parts;
+      for (let round = 0; parts.length > 0; round++) {
+        if (round >= MAX_UPLOAD_ROUNDS) {
+          throw new Error('Failed to upload file to S3');
         }
-      });
+        for (const part of parts) {
+          setUploadProgress(`Uploading part ${part.part_number} of ${Math.ceil(file.size / part_size)}...`);
+          const start = (part.part_number - 1) * part_size;
+          await uploadPart(part.url, file.slice(start, start + part.size));
+        }
+        const progressResponse = await fetch(`${UPLOADS_URL}/${resume_id}`, { headers });
+        if (!progressResponse.ok) {
+          throw new Error('Failed to check upload progress');
+        }
+        parts = (await progressResponse.json()).parts;
+      }
 
-      if (!s3Response.ok) {
-        throw new Error('Failed to upload file to S3');
+      // Nothing was sent for a file that is already stored
+      if (!upload!.duplicate) {
+        const completeResponse = await fetch(`${UPLOADS_URL}/${resume_id}/complete`, { method: 'POST', headers });
+        if (!completeResponse.ok) {
+          throw new Error('Failed to complete upload');
+        }
+      }
+      localStorage.removeItem(uploadKey);
+
+      // Step 3: Wait for the server to extract the resume's text
+      setUploadProgress('Processing resume...');
+      let status = 'pending';
+      for (let attempt = 0; attempt < 15 && status === 'pending'; attempt++) {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const statusResponse = await fetch(`https://htnpjvh1wh.execute-api.us-east-1.amazonaws.com/resumes/${resume_id}`, {
+          headers: { 'Authorization': `Bearer ${token}` }
+        });
+        if (statusResponse.ok) {
+          status = (await statusResponse.json()).upload_status;
+        }
       }
 
-      // Step 3: Confirm upload
-      setUploadProgress('Confirming upload...');
-      const confirmResponse = await fetch('https://htnpjvh1wh.execute-api.us-east-1.amazonaws.com/resumes', {
-        method: 'POST',
-        headers: {
-          'Authorization': `Bearer ${token}`,
-          'Content-Type': 'application/json'
-        },
-        body: JSON.stringify({ resume_id })
-      });
-
-      if (!confirmResponse.ok) {
-        throw new Error('Failed to confirm upload');
+      if (status === 'failed') {
+        throw new Error('Could not read the resume file');
       }
 
       setUploadProgress('Upload complete!');